@@ -1,78 +1,64 @@
 import streamlit as st
+import threading
 import warnings
 import logging
 import json
+import os
 
-from latest_ai_development.crew import LatestAiDevelopment
+from latest_ai_development import agent_stack, deadlines
+from latest_ai_development.events import EventStream
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging: run timings go to the trace file (see tracing.py), not the log
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Suppress specific warnings
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
-def parse_professors(raw_text):
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
     """
-    Parses the raw text to extract professors' information.
+    Start loading the agent stack in the background as soon as the app is
+    first opened; once per server process, not on every rerun.
     """
-    import re
-    professors_section = re.search(r"\*\*Professors in Mechanical Engineering at UTD:\*\*(.*?)\*\*Labs", raw_text, re.DOTALL)
-    if professors_section:
-        professors_text = professors_section.group(1).strip()
-        professors = re.findall(
-            r"\d+\.\s\*\*(.*?)\*\*\s+- Research Interests: (.*?)\s+- Email: (.*?)\s+- Phone: (.*?)\s+- URL: \[Profile\]\((.*?)\)",
-            professors_text
-        )
-        return professors
-    return []
-
-def parse_labs(raw_text):
+    agent_stack.warm_up()
+
+@st.cache_resource(show_spinner="Loading the agents...")
+def load_pipeline():
     """
-    Parses the raw text to extract labs' information.
+    The pipeline module (crewai, the crew and its tools), loaded once per
+    server process and shared by every rerun and session.
     """
-    import re
-    labs_section = re.search(r"\*\*Labs associated with Mechanical Engineering at UTD:\*\*(.*?)\*\*Additional Relevant Links", raw_text, re.DOTALL)
-    if labs_section:
-        labs_text = labs_section.group(1).strip()
-        labs = re.findall(
-            r"\d+\.\s\*\*(.*?)\*\*\s+- Focus: (.*?)\s+- URL: \[LAB\]\((.*?)\)",
-            labs_text
-        )
-        return labs
-    return []
-
-def display_professors(professors):
+    return agent_stack.pipeline()
+
+def display_parse_errors(errors):
     """
-    Displays professors' information in a structured format.
+    Lists the fields of a task's JSON that were dropped because they did not validate.
     """
-    if not professors:
-        st.info("No professor information available.")
-        return
-    
-    st.subheader("Professors in Mechanical Engineering at UTD")
-    for prof in professors:
-        name, research, email, phone, url = prof
-        with st.expander(name):
-            st.markdown(f"**Research Interests:** {research}")
-            st.markdown(f"**Email:** [mailto:{email}](mailto:{email})")
-            st.markdown(f"**Phone:** {phone}")
-            st.markdown(f"**Profile:** [Link]({url})")
-
-def display_labs(labs):
+    if errors:
+        st.warning("Some of the agent's output could not be used:\n" + "\n".join(
+            f"- `{error['loc'] or 'output'}`: {error['msg']}" for error in errors
+        ))
+
+def display_research_info(research_info):
     """
-    Displays labs' information in a structured format.
+    Displays the professors/labs of a parsed ResearchInfo payload.
     """
-    if not labs:
-        st.info("No lab information available.")
-        return
-    
-    st.subheader("Labs Associated with Mechanical Engineering at UTD")
-    for lab in labs:
-        name, focus, url = lab
-        with st.expander(name):
-            st.markdown(f"**Focus:** {focus}")
-            st.markdown(f"**Lab URL:** [Link]({url})")
+    professors = research_info.get("professors", [])
+    labs = research_info.get("labs", [])
+    if professors:
+        st.subheader("Professors")
+        for prof in professors:
+            with st.expander(prof.get("name", "")):
+                st.markdown(f"**Research Interests:** {prof.get('research_interests', '')}")
+                st.markdown(f"**Email:** {prof.get('contact_email', '')}")
+                st.markdown(f"**Profile:** [Link]({prof.get('url', '')})")
+    if labs:
+        st.subheader("Labs")
+        for lab in labs:
+            with st.expander(lab.get("name", "")):
+                st.markdown(f"**Focus:** {lab.get('focus', '')}")
+                st.markdown(f"**Lab URL:** [Link]({lab.get('url', '')})")
 
 def display_tasks(tasks_output):
     """
@@ -84,17 +70,73 @@ def display_tasks(tasks_output):
     
     st.subheader("Task Outputs")
     for task in tasks_output:
-        with st.expander(task.name):
-            st.markdown(f"**Description:** {task.description}")
-            st.markdown(f"**Expected Output:** {task.expected_output}")
-            st.markdown(f"**Summary:** {task.summary}")
-            st.markdown(f"**Agent:** {task.agent}")
+        with st.expander(task["name"]):
+            st.markdown(f"**Agent:** {task['agent']}")
             st.markdown("**Raw Output:**")
-            st.write(task.raw)
+            st.write(task["raw"])
+
+def run_with_live_updates(inputs):
+    """
+    Runs the crew in a background thread and renders its events as they
+    arrive: task progress, tool calls and each task's JSON as soon as it exists.
+    The run gets RUN_DEADLINE seconds, and is cancelled if the script run
+    stops first (Stop, or a new input). Returns the pipeline result dict.
+    """
+    pipeline = load_pipeline()
+    events = EventStream()
+    outcome = {}
+    deadline = deadlines.run_deadline()
+
+    def worker():
+        try:
+            with deadlines.scope(deadline):
+                outcome["result"] = pipeline.run_crew(inputs, events=events)
+        except (Exception, deadlines.Interrupted) as e:
+            outcome["error"] = e
+        finally:
+            events.close()
+
+    threading.Thread(target=worker, daemon=True).start()
+
+    status = st.status("Processing...", expanded=True)
+    partial_area = st.container()
+    try:
+        _render_events(events, status, partial_area)
+    finally:
+        # Nobody is watching a run whose script run has stopped
+        deadline.cancel()
+
+    if "error" in outcome:
+        status.update(label="Failed", state="error")
+        raise outcome["error"]
+    if outcome["result"].get("status") == "truncated":
+        status.update(label="Stopped early, showing what completed", state="error", expanded=False)
+    else:
+        status.update(label="Done", state="complete", expanded=False)
+    return outcome["result"]
+
+def _render_events(events, status, partial_area):
+    for event in events.follow():
+        if event["type"] == "task_started":
+            status.write(f"Started **{event['task']}** ({event['agent'].strip()})")
+        elif event["type"] == "tool_call":
+            status.write(f"Tool `{event['tool']}`: {event['input']}")
+        elif event["type"] == "task_finished":
+            tokens = event["tokens"].get("total_tokens", 0)
+            status.write(f"Finished **{event['task']}** in {event['duration']:.1f}s ({tokens} tokens)")
+        elif event["type"] == "partial_result":
+            with partial_area:
+                if event["key"] == "research_info":
+                    display_research_info(event["payload"])
+                else:
+                    with st.expander(event["task"]):
+                        st.json(event["payload"])
+                display_parse_errors(event.get("errors"))
 
 def main():
     st.set_page_config(page_title="Latest AI Development Web App", layout="wide")
     st.title("Latest AI Development Web App")
+    start_warm_up()
     
     # User inputs
     topic = st.text_input("Enter the topic")
@@ -114,14 +156,9 @@ def main():
             'resume': resume,
         }
         
-        # Kick off your AI dev crew with a spinner
+        # Kick off your AI dev crew, streaming progress as it runs
         try:
-            with st.spinner("Processing..."):
-                logger.debug(f"Inputs received: {inputs}")
-                crew_instance = LatestAiDevelopment()
-                crew = crew_instance.crew()
-                result = crew.kickoff(inputs=inputs)
-                logger.debug(f"Result received: {result}")
+            result = run_with_live_updates(inputs)
             
             # Display success message and results
             st.success("Crew kicked off successfully!")
@@ -129,29 +166,28 @@ def main():
             # Display Raw Output
             with st.expander("Raw Output"):
                 # Assuming 'raw' is a string
-                st.text(result.raw)
-            
-            # Parse professors and labs
-            professors = parse_professors(result.raw)
-            labs = parse_labs(result.raw)
+                st.text(result["raw_result"])
             
-            # Display professors and labs
-            display_professors(professors)
-            display_labs(labs)
+            # Professors and labs were already shown from research_task's JSON
+            # (repaired and validated by output_parser, with errors listed)
+            research_info = result.get("research_info") or {}
+            if not research_info.get("professors") and not research_info.get("labs"):
+                st.info("No professor or lab information available.")
             
             # Display tasks output
-            tasks_output = result.tasks_output
+            tasks_output = result["tasks"]
             display_tasks(tasks_output)
             
             # Display Token Usage
-            if hasattr(result, 'token_usage') and result.token_usage:
+            token_usage = result.get("token_usage")
+            if token_usage:
                 st.subheader("Token Usage")
                 st.json({
-                    "Total Tokens": result.token_usage.total_tokens,
-                    "Prompt Tokens": result.token_usage.prompt_tokens,
-                    "Completion Tokens": result.token_usage.completion_tokens,
-                    "Cached Prompt Tokens": result.token_usage.cached_prompt_tokens,
-                    "Successful Requests": result.token_usage.successful_requests
+                    "Total Tokens": token_usage["total_tokens"],
+                    "Prompt Tokens": token_usage["prompt_tokens"],
+                    "Completion Tokens": token_usage["completion_tokens"],
+                    "Cached Prompt Tokens": token_usage["cached_prompt_tokens"],
+                    "Successful Requests": token_usage["successful_requests"]
                 })
         
         except Exception as e:
@@ -0,0 +1,83 @@
+# agent_stack.py
+
+"""
+Deferred loading of the agent stack for the web front-ends.
+
+Importing pipeline.py pulls in crewai, litellm and the crew with its tools
+(crew.py builds the search, knowledge and page tools at import): seconds of
+start-up and a few hundred MiB before anything can be served. The web apps
+import this module instead and call `pipeline()` where they need it; the
+first call imports the stack (once, whichever thread gets there first) and
+later calls return it at once.
+
+`warm_up()` does that in a background thread right after start-up, and also
+builds the crew prototype (crew_factory.warm_up), so the first request does
+not pay for it while health checks are answered immediately. `status()`
+reports the progress, for readiness checks:
+
+    {"state": "cold" | "loading" | "ready" | "failed", "seconds": ..., "error": ...}
+
+Configured from the environment:
+  - WARMUP: "0" skips the background warm-up; the stack then loads on the
+    first request that needs it (default: "1")
+"""
+import importlib
+import logging
+import os
+import threading
+import time
+from types import ModuleType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pipeline: Optional[ModuleType] = None
+_warm_up_thread: Optional[threading.Thread] = None
+_status = {"state": "cold", "seconds": None, "error": None}
+
+
+def pipeline() -> ModuleType:
+    """The latest_ai_development.pipeline module, imported on first use."""
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+    with _lock:
+        if _pipeline is None:
+            _status.update(state="loading", error=None)
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module("latest_ai_development.pipeline")
+                module.crew_factory.warm_up()
+            except Exception as e:
+                _status.update(state="failed", error=str(e))
+                raise
+            _status.update(state="ready", seconds=round(time.perf_counter() - started, 3))
+            _pipeline = module
+    return _pipeline
+
+
+def warm_up() -> Optional[threading.Thread]:
+    """
+    Load the stack in a background thread, unless WARMUP=0, it is loaded,
+    or a warm-up is already running (that thread is returned then).
+    """
+    global _warm_up_thread
+    if _pipeline is not None or os.getenv("WARMUP", "1") == "0":
+        return None
+    if _warm_up_thread is not None and _warm_up_thread.is_alive():
+        return _warm_up_thread
+
+    def load():
+        try:
+            pipeline()
+        except Exception:
+            logger.exception("Agent stack warm-up failed")
+
+    _warm_up_thread = threading.Thread(target=load, name="agent-stack-warmup", daemon=True)
+    _warm_up_thread.start()
+    return _warm_up_thread
+
+
+def status() -> dict:
+    return dict(_status)
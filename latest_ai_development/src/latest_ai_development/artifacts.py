@@ -0,0 +1,251 @@
+# artifacts.py
+
+"""
+Run artifacts: the results of each pipeline run, stored per run.
+
+Every run (a full crew run, or a single phase such as deep research on one
+professor) gets its own directory, `<root>/<run id>/`, with one JSON file per
+payload (research_info.json, specific_info.json, cover_letter.json, ...) and
+run.json with the rest of the result (raw output, status, tasks, timings,
+token usage). Files are written to a temporary name and renamed into place,
+so readers never see half of one, and concurrent runs never share a file.
+
+An SQLite index next to the run directories records each run's kind, a hash
+of its inputs, its status, when it was stored and its size, for:
+  - `find`: the latest complete run of the same kind with the same inputs,
+    which the web app serves instead of running the agents again. Runs with
+    parse errors or an empty payload are indexed as "partial", and truncated
+    ones as "truncated", so they are run again rather than served
+  - `cleanup`: removing runs older than the retention period (also done
+    every few minutes as runs are saved)
+
+Inputs are only stored as that hash: a resume never lands in the index.
+
+Configured from the environment:
+  - ARTIFACTS: "0" turns the store off (default: on)
+  - ARTIFACTS_PATH: directory of the run directories and the index (default: <LAD_DATA_DIR>/runs)
+  - ARTIFACTS_COMPRESS: "1" gzips the artifact files (default: off)
+  - ARTIFACTS_RETENTION: seconds runs are kept (default: 604800, a week)
+  - ARTIFACTS_REUSE: seconds a stored run is served again for the same inputs
+    by the web app (default: 86400; "0" always runs the agents)
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from latest_ai_development.storage import connect, data_dir
+
+# Result keys stored as artifacts of their own; everything else goes into run.json
+PAYLOAD_KEYS = ("research_info", "specific_info", "candidate_profile", "cover_letter", "cover_letters", "fanout")
+MANIFEST = "run"
+# Seconds between cleanups triggered by `save`
+CLEANUP_INTERVAL = 600
+
+
+def inputs_hash(kind: str, inputs: dict) -> str:
+    encoded = json.dumps({"kind": kind, "inputs": inputs}, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def run_status(result: dict) -> str:
+    """
+    Status a run is indexed under: its own "status" ("complete" when it has
+    none, as single phases do), or "partial" if it only partly validated
+    ("parse_errors") or has no payload, or an empty one.
+    """
+    status = result.get("status", "complete")
+    payloads = [result[key] for key in PAYLOAD_KEYS if key in result]
+    if status == "complete" and (result.get("parse_errors") or not payloads or not all(payloads)):
+        return "partial"
+    return status
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ArtifactStore:
+    """
+    Run directories under `root` and their SQLite index. Artifacts are
+    gzipped when `compress` is set; runs older than `retention_seconds` are
+    removed by `cleanup`.
+    """
+
+    def __init__(self, root=None, compress: bool = False, retention_seconds: float = 7 * 86400):
+        self.root = Path(root) if root else data_dir() / "runs"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compress = compress
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._cleaned_at = 0.0
+        self._conn = connect(self.root / "index.sqlite3")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    inputs_hash TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    artifacts TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS runs_by_inputs ON runs (kind, inputs_hash, created_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS runs_by_age ON runs (created_at)")
+
+    def _path(self, run_id: str, name: str, compressed: bool) -> Path:
+        return self.root / run_id / (f"{name}.json.gz" if compressed else f"{name}.json")
+
+    def _write(self, run_dir: Path, name: str, payload) -> int:
+        """Write one artifact atomically (temporary file, fsync, rename); returns its size."""
+        data = json.dumps(payload, default=str).encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data, compresslevel=6)
+        fd, tmp = tempfile.mkstemp(dir=run_dir, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path(run_dir.name, name, self.compress))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return len(data)
+
+    def _read(self, run_id: str, name: str):
+        for compressed in (self.compress, not self.compress):
+            path = self._path(run_id, name, compressed)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            return json.loads(gzip.decompress(data) if compressed else data)
+        return None
+
+    def save(self, kind: str, inputs: dict, result: dict, run_id: Optional[str] = None) -> str:
+        """
+        Store `result`, the result of a `kind` run on `inputs`, as run
+        `run_id` (a new id by default). Returns the run id.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        run_dir = self.root / run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        created_at = time.time()
+        names, size = [], 0
+        for key in PAYLOAD_KEYS:
+            if key in result:
+                size += self._write(run_dir, key, result[key])
+                names.append(key)
+        manifest = {key: value for key, value in result.items() if key not in PAYLOAD_KEYS}
+        manifest.update(run_id=run_id, kind=kind, created_at=created_at)
+        size += self._write(run_dir, MANIFEST, manifest)
+        _fsync_dir(run_dir)
+        # Indexed once every file is in place
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, kind, inputs_hash, status, created_at, bytes, artifacts)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, kind, inputs_hash(kind, inputs), run_status(result), created_at, size,
+                 json.dumps(names)),
+            )
+        if created_at - self._cleaned_at > CLEANUP_INTERVAL:
+            self._cleaned_at = created_at
+            self.cleanup()
+        return run_id
+
+    def find(self, kind: str, inputs: dict, max_age: Optional[float] = None) -> Optional[str]:
+        """Id of the latest complete `kind` run on `inputs`, no older than `max_age` seconds."""
+        cutoff = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE kind = ? AND inputs_hash = ? AND status = 'complete'"
+                " AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (kind, inputs_hash(kind, inputs), cutoff),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get(self, run_id: str, name: str):
+        """One artifact of a run (e.g. "research_info"), or None."""
+        return self._read(run_id, name)
+
+    def load(self, run_id: str) -> Optional[dict]:
+        """A stored run as the result dict it was saved from, or None if it is gone."""
+        with self._lock:
+            row = self._conn.execute("SELECT artifacts FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        manifest = self._read(run_id, MANIFEST)
+        if manifest is None:
+            return None
+        result = dict(manifest)
+        for name in json.loads(row[0]):
+            payload = self._read(run_id, name)
+            if payload is None:
+                return None
+            result[name] = payload
+        return result
+
+    def runs(self, kind: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Index entries of the latest runs, newest first."""
+        query = "SELECT run_id, kind, inputs_hash, status, created_at, bytes FROM runs"
+        params = ()
+        if kind is not None:
+            query += " WHERE kind = ?"
+            params = (kind,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at DESC LIMIT ?", params + (limit,)).fetchall()
+        keys = ("run_id", "kind", "inputs_hash", "status", "created_at", "bytes")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def cleanup(self, retention_seconds: Optional[float] = None) -> int:
+        """Remove the runs older than the retention period; returns how many."""
+        retention = self.retention_seconds if retention_seconds is None else retention_seconds
+        cutoff = time.time() - retention
+        with self._lock, self._conn:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT run_id FROM runs WHERE created_at < ?", (cutoff,)
+            ).fetchall()]
+            self._conn.executemany("DELETE FROM runs WHERE run_id = ?", [(run_id,) for run_id in expired])
+        # Unindexed first, so `load` no longer finds them while they are removed
+        for run_id in expired:
+            shutil.rmtree(self.root / run_id, ignore_errors=True)
+        return len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            runs, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM runs").fetchone()
+        return {"runs": runs, "bytes": size}
+
+
+def reuse_seconds() -> float:
+    """How old a stored run the web app serves instead of running the agents (ARTIFACTS_REUSE)."""
+    return float(os.getenv("ARTIFACTS_REUSE", "86400"))
+
+
+def create_artifact_store() -> Optional[ArtifactStore]:
+    if os.getenv("ARTIFACTS", "1") == "0":
+        return None
+    return ArtifactStore(
+        root=os.getenv("ARTIFACTS_PATH") or None,
+        compress=os.getenv("ARTIFACTS_COMPRESS", "0") == "1",
+        retention_seconds=float(os.getenv("ARTIFACTS_RETENTION", str(7 * 86400))),
+    )
+
+
+artifact_store = create_artifact_store()
@@ -0,0 +1,224 @@
+# batch.py
+
+"""
+Batch runs of the crew over a JSONL file of intake forms, one student per line:
+
+    {"id": "s-001", "topic": "...", "university": "...", "resume": "..."}
+
+("id" is optional; records without one are identified by a hash of their
+content.) Crews run concurrently on a bounded number of workers, under the
+process-wide LLM and search rate limits (see ratelimit.py). Each result is
+appended to the output JSONL as soon as it finishes:
+
+    {"id": ..., "status": "ok", "result": {...}, "duration": ...}
+    {"id": ..., "status": "truncated", "result": {...}, "duration": ...}
+    {"id": ..., "status": "error", "error": "...", "duration": ...}
+
+Each record gets RUN_DEADLINE seconds (see deadlines.py); a record that ran
+out of time gets what completed, marked "truncated". Re-running with the
+same output file resumes: records that already have an "ok" line are
+skipped, truncated and failed ones are tried again (the last line of an id
+wins), truncated ones from the checkpoints of their completed tasks.
+
+    batch students.jsonl results.jsonl --workers 8 --llm-rpm 300 --search-rpm 100
+
+With --mode cover_letters, each line is a student's resume and the
+professors/labs they apply to, and only their cover letters are written
+(concurrently, from one candidate profile, see pipeline.run_cover_letters):
+
+    {"id": "s-001", "resume": "...", "professors": [{"name": "...", "url": "..."}, ...]}
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Set, Tuple
+
+from latest_ai_development import deadlines
+from latest_ai_development.pipeline import run_cover_letters, run_crew
+from latest_ai_development.ratelimit import llm_limiter, search_limiter
+
+logger = logging.getLogger(__name__)
+
+INPUT_FIELDS = ("topic", "university", "resume")
+COVER_LETTER_FIELDS = ("resume", "professors")
+# Payloads of run_crew kept in the output (the rest is repeated raw text)
+RESULT_FIELDS = ("status", "interrupted", "run_id", "research_info", "specific_info", "cover_letter", "parse_errors",
+                 "token_usage", "timings")
+
+
+def record_id(record: dict, fields=INPUT_FIELDS) -> str:
+    if record.get("id") not in (None, ""):
+        return str(record["id"])
+    canonical = json.dumps({field: record.get(field, "") for field in fields}, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def read_records(path: str) -> Iterator[Tuple[int, dict]]:
+    """Stream (line number, record) pairs, skipping blank and invalid lines."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("Skipping line %d of %s: %s", line_number, path, e)
+                continue
+            if not isinstance(record, dict):
+                logger.warning("Skipping line %d of %s: not a JSON object", line_number, path)
+                continue
+            yield line_number, record
+
+
+def completed_ids(path: str) -> Set[str]:
+    """
+    Ids whose latest line in an existing output file is "ok". A line cut short
+    by a crash is ignored, so that record runs again.
+    """
+    status = {}
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                status[entry["id"]] = entry.get("status")
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+    return {record_id for record_id, record_status in status.items() if record_status == "ok"}
+
+
+class ResultWriter:
+    """
+    Appends one JSON line per finished record, flushed and fsynced so a crash
+    loses at most the record being written.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        # Terminate a partial last line left by a crash before appending
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+
+    def write(self, entry: dict) -> None:
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _run_crew(record: dict) -> dict:
+    result = run_crew({field: str(record.get(field) or "") for field in INPUT_FIELDS})
+    return {field: result.get(field) for field in RESULT_FIELDS}
+
+
+def _run_cover_letters(record: dict) -> dict:
+    professors = [entity for entity in record.get("professors") or [] if isinstance(entity, dict)]
+    return run_cover_letters(professors, str(record.get("resume") or ""))
+
+
+# --mode -> (fields identifying a record without an id, record -> result)
+MODES = {
+    "crew": (INPUT_FIELDS, _run_crew),
+    "cover_letters": (COVER_LETTER_FIELDS, _run_cover_letters),
+}
+
+
+def _process(record: dict, rid: str, run=_run_crew) -> dict:
+    started = time.perf_counter()
+    try:
+        with deadlines.scope(deadlines.run_deadline()):
+            result = run(record)
+    except (Exception, deadlines.Interrupted) as e:
+        logger.warning("Record %s failed: %s", rid, e)
+        return {"id": rid, "status": "error", "error": str(e), "duration": time.perf_counter() - started}
+    return {
+        "id": rid,
+        "status": "truncated" if result.get("status") == "truncated" else "ok",
+        "result": result,
+        "duration": time.perf_counter() - started,
+    }
+
+
+def run_batch(input_path: str, output_path: str, workers: int = 4, llm_rpm: Optional[float] = None,
+              search_rpm: Optional[float] = None, mode: str = "crew") -> dict:
+    """
+    Process every pending record of `input_path` and return counts
+    (ok, truncated, error, skipped). At most `workers` records run at once, and at most
+    twice that many records are read ahead of them. `mode` is "crew" or
+    "cover_letters" (see MODES).
+    """
+    fields, run = MODES[mode]
+    if llm_rpm is not None:
+        llm_limiter.configure_per_minute(llm_rpm)
+    if search_rpm is not None:
+        search_limiter.configure_per_minute(search_rpm)
+
+    done = completed_ids(output_path)
+    counts = {"ok": 0, "truncated": 0, "error": 0, "skipped": 0}
+    counts_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(workers * 2)
+    writer = ResultWriter(output_path)
+    seen = set()
+
+    def finish(future):
+        entry = future.result()
+        try:
+            writer.write(entry)
+        finally:
+            slots.release()
+        with counts_lock:
+            counts[entry["status"]] += 1
+            finished = counts["ok"] + counts["truncated"] + counts["error"]
+        logger.info("Record %s: %s (%d finished)", entry["id"], entry["status"], finished)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+            for line_number, record in read_records(input_path):
+                rid = record_id(record, fields)
+                if rid in done or rid in seen:
+                    counts["skipped"] += 1
+                    continue
+                seen.add(rid)
+                slots.acquire()
+                executor.submit(_process, record, rid, run).add_done_callback(finish)
+    finally:
+        writer.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of {topic, university, resume} records (see --mode)")
+    parser.add_argument("output", help="JSONL file results are appended to (and resumed from)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BATCH_WORKERS", "4")))
+    parser.add_argument("--mode", choices=sorted(MODES), default="crew",
+                        help="run the whole crew, or only write cover letters for {resume, professors} records")
+    parser.add_argument("--llm-rpm", type=float, help="LLM requests per minute, all workers together (default: LLM_RPM)")
+    parser.add_argument("--search-rpm", type=float, help="search requests per minute (default: SEARCH_RPM)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    counts = run_batch(args.input, args.output, workers=args.workers,
+                       llm_rpm=args.llm_rpm, search_rpm=args.search_rpm, mode=args.mode)
+    print(f"{counts['ok']} ok, {counts['truncated']} truncated, {counts['error']} failed, {counts['skipped']} skipped")
+    return counts
+
+
+if __name__ == "__main__":
+    main()
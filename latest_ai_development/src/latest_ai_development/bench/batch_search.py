@@ -0,0 +1,108 @@
+"""
+Benchmark: the researcher listing professors with one search per agent turn
+(before, SEARCH_BATCH=0) versus all its queries in one call to the batched
+search tool (after, tools/batch_search_tool.py).
+
+The fake LLM makes the researcher search `--searches` queries either way,
+and both the LLM and the search API answer with their configured latency.
+Reports wall time, LLM requests and search API requests per run. The crew
+reads SEARCH_BATCH when it is built, so each scenario runs in a fresh
+interpreter.
+
+    python -m latest_ai_development.bench.batch_search --searches 6 --latency 0.2 [--json out.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# src/, the directory holding the package
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+SCENARIOS = {"before": "0", "after": "1"}
+
+
+def _sample(searches: int, latency: float, search_latency: float, runs: int) -> dict:
+    """One scenario, in this interpreter (SEARCH_BATCH is already set)."""
+    from latest_ai_development.bench.fake_llm import start_fake_llm
+    from latest_ai_development.bench.fake_serper import start_fake_serper
+    from latest_ai_development.bench.suite import configure_environment
+
+    llm_server = start_fake_llm(latency=latency, searches=searches)
+    search_server = start_fake_serper(latency=search_latency)
+    configure_environment(llm_server.url, search_server.url, tempfile.mkdtemp(prefix="lad-batch-"), False)
+    os.environ.setdefault("CREW_VERBOSE", "0")
+
+    from latest_ai_development import pipeline
+
+    walls = []
+    try:
+        for _ in range(runs):
+            started = time.perf_counter()
+            # A new topic every run, so nothing is served from the search cache
+            pipeline.run_researcher(f"machine learning {uuid.uuid4().hex[:8]}", "Example University")
+            walls.append(time.perf_counter() - started)
+    finally:
+        llm_server.stop()
+        search_server.stop()
+    return {
+        "wall_s": sum(walls) / runs,
+        "llm_requests": llm_server.request_count / runs,
+        "search_requests": search_server.request_count / runs,
+    }
+
+
+def _run_scenario(batch: str, searches: int, latency: float, search_latency: float, runs: int) -> dict:
+    env = dict(os.environ, SEARCH_BATCH=batch,
+               PYTHONPATH=os.pathsep.join(filter(None, [str(SRC_DIR), os.getenv("PYTHONPATH")])))
+    completed = subprocess.run(
+        [sys.executable, "-m", "latest_ai_development.bench.batch_search", "--sample",
+         "--searches", str(searches), "--latency", str(latency), "--search-latency", str(search_latency),
+         "--runs", str(runs)],
+        capture_output=True, text=True, env=env,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"SEARCH_BATCH={batch} failed:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(searches: int = 6, latency: float = 0.2, search_latency: float = 0.1, runs: int = 3) -> dict:
+    results = {
+        name: _run_scenario(batch, searches, latency, search_latency, runs)
+        for name, batch in SCENARIOS.items()
+    }
+    return {"searches": searches, "latency": latency, "search_latency": search_latency, "runs": runs,
+            "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=6, help="queries the researcher searches per run")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency per request (s)")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="fake search API latency per request (s)")
+    parser.add_argument("--runs", type=int, default=3, help="researcher runs per scenario")
+    parser.add_argument("--sample", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    if args.sample:
+        print(json.dumps(_sample(args.searches, args.latency, args.search_latency, args.runs)))
+        return
+
+    report = run(args.searches, args.latency, args.search_latency, args.runs)
+    print(f"{'scenario':<10}{'wall (s)':>10}{'llm req':>9}{'search req':>12}")
+    for name in SCENARIOS:
+        result = report["results"][name]
+        print(f"{name:<10}{result['wall_s']:>10.3f}{result['llm_requests']:>9.1f}{result['search_requests']:>12.1f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: cover letters for N professors, one request per professor with
+the full resume in every prompt (before) versus one batch written
+concurrently from a candidate profile extracted once (after,
+pipeline.run_cover_letters).
+
+Runs against the fake LLM with provider-style prompt caching simulated, and
+reports wall time, LLM requests, prompt tokens and how many of them the
+provider would have served from its prompt cache.
+
+    python -m latest_ai_development.bench.cover_letters --professors 8 --latency 0.2 [--json out.json]
+"""
+import argparse
+import json
+import tempfile
+import time
+import uuid
+
+from latest_ai_development.bench.fake_llm import start_fake_llm
+from latest_ai_development.bench.fake_serper import start_fake_serper
+from latest_ai_development.bench.suite import configure_environment
+
+_RESUME_SECTION = (
+    "Research assistant, Machine Learning Group ({n}): built data pipelines for large-scale "
+    "graph learning experiments, co-authored a workshop paper on robust optimisation, and "
+    "mentored two undergraduate students on reproducibility of benchmark results.\n"
+)
+
+
+def _resume(chars: int) -> str:
+    lines = ["Jane Doe, BSc Computer Science, MSc Artificial Intelligence.\n"]
+    while sum(len(line) for line in lines) < chars:
+        lines.append(_RESUME_SECTION.format(n=len(lines)))
+    return "".join(lines)
+
+
+def _tokens(events) -> dict:
+    totals = {"prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0}
+    for event in events.events():
+        if event["type"] == "task_finished":
+            for key in totals:
+                totals[key] += event.get("tokens", {}).get(key, 0)
+    return totals
+
+
+def _measure(server, fn) -> dict:
+    from latest_ai_development.events import EventStream
+
+    events = EventStream()
+    requests_before = server.request_count
+    started = time.perf_counter()
+    fn(events)
+    return {
+        "wall_s": time.perf_counter() - started,
+        "llm_requests": server.request_count - requests_before,
+        **_tokens(events),
+    }
+
+
+def run(professors: int = 8, latency: float = 0.2, resume_chars: int = 8000) -> dict:
+    llm_server = start_fake_llm(latency=latency, prompt_cache=True)
+    search_server = start_fake_serper()
+    configure_environment(llm_server.url, search_server.url, tempfile.mkdtemp(prefix="lad-letters-"), False)
+
+    from latest_ai_development import pipeline
+
+    resume = _resume(resume_chars)
+
+    def entities():
+        tag = uuid.uuid4().hex[:8]
+        return [{"name": f"Professor {i + 1} ({tag})", "url": f"https://example.edu/{tag}/{i + 1}"}
+                for i in range(professors)]
+
+    def before(events):
+        for entity in entities():
+            pipeline._cover_letter(entity["name"], entity["url"], resume, events=events)
+
+    def after(events):
+        pipeline.run_cover_letters(entities(), resume, events=events)
+
+    try:
+        results = {"before": _measure(llm_server, before), "after": _measure(llm_server, after)}
+    finally:
+        llm_server.stop()
+        search_server.stop()
+    return {"professors": professors, "latency": latency, "resume_chars": len(resume), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--professors", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency per request (s)")
+    parser.add_argument("--resume-chars", type=int, default=8000)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    report = run(args.professors, args.latency, args.resume_chars)
+    print(f"{'scenario':<10}{'wall (s)':>10}{'llm req':>9}{'prompt tok':>12}{'cached tok':>12}{'uncached':>10}")
+    for name in ("before", "after"):
+        result = report["results"][name]
+        uncached = result["prompt_tokens"] - result["cached_prompt_tokens"]
+        print(f"{name:<10}{result['wall_s']:>10.3f}{result['llm_requests']:>9}{result['prompt_tokens']:>12}"
+              f"{result['cached_prompt_tokens']:>12}{uncached:>10}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
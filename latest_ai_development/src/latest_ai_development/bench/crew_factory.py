@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: per-request construction cost of crews and agents,
+rebuilding LatestAiDevelopment() every time (before) versus taking copies
+from the shared CrewFactory (after). No LLM or network calls are made.
+
+    python -m latest_ai_development.bench.crew_factory --iterations 50 [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from latest_ai_development.crew import LatestAiDevelopment
+from latest_ai_development.crew_factory import CrewFactory
+
+
+def _measure(fn, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": statistics.mean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def run(iterations: int = 50) -> dict:
+    factory = CrewFactory()
+    factory.warm_up()
+
+    scenarios = {
+        "crew": (
+            lambda: LatestAiDevelopment().crew(),
+            factory.crew,
+        ),
+        "researcher_agent": (
+            lambda: LatestAiDevelopment().researcher(),
+            lambda: factory.agent("researcher"),
+        ),
+        "research_task": (
+            lambda: (lambda c: (c.research_task(), c.researcher()))(LatestAiDevelopment()),
+            lambda: factory.task("research_task"),
+        ),
+    }
+
+    results = {}
+    for name, (before, after) in scenarios.items():
+        results[name] = {
+            "before": _measure(before, iterations),
+            "after": _measure(after, iterations),
+        }
+        results[name]["speedup"] = results[name]["before"]["mean_ms"] / results[name]["after"]["mean_ms"]
+    return {"iterations": iterations, "factory_builds": factory.builds, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    report = run(args.iterations)
+    print(f"{'scenario':<18}{'before (ms)':>14}{'after (ms)':>14}{'speedup':>10}")
+    for name, result in report["results"].items():
+        print(f"{name:<18}{result['before']['mean_ms']:>14.2f}{result['after']['mean_ms']:>14.2f}"
+              f"{result['speedup']:>9.1f}x")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
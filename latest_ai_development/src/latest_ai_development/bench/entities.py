@@ -0,0 +1,140 @@
+"""
+Benchmark: entity resolution of professor listings.
+
+  - index: merging the duplicates of a large synthetic listing through the
+    blocking index (entities.resolve_research_info) versus comparing every
+    pair of entries; the listing includes entries with malformed URLs, which
+    must resolve (unkeyed by URL) rather than fail the listing
+  - fanout: deep research on a listing where every professor appears in
+    several spellings and URL variants, with ENTITY_RESOLUTION=0 (each
+    variant researched on its own) and =1, against the fake LLM
+
+    python -m latest_ai_development.bench.entities --entries 1000 --professors 4 [--json out.json]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from latest_ai_development.bench.fake_llm import start_fake_llm
+from latest_ai_development.bench.fake_serper import start_fake_serper
+from latest_ai_development.bench.suite import configure_environment
+
+
+def _variants(i: int, tag: str = "") -> list:
+    first, last = f"Alex{tag}{i}", f"Rivera{tag}{i}"
+    page = f"example.edu/people/{tag}{i}"
+    return [
+        {"name": f"{first} {last}", "research_interests": "program synthesis",
+         "contact_email": "", "url": f"https://www.{page}/"},
+        {"name": f"{last}, {first}", "research_interests": "machine learning",
+         "contact_email": f"{last.lower()}@example.edu", "url": f"http://{page}/index.html"},
+        {"name": f"Dr. {first[0]}. {last}", "research_interests": "program synthesis",
+         "contact_email": f"{last.lower()}@example.edu", "url": f"https://{page}?utm_source=listing"},
+    ]
+
+
+# URLs as an LLM might mangle them: urlsplit rejects these
+_MALFORMED_URLS = ("https://[lab page]", "http://[oops", "https://[::1")
+
+
+def _malformed() -> list:
+    return [{"name": f"Ann Lee{i}", "research_interests": "robotics", "contact_email": "", "url": url}
+            for i, url in enumerate(_MALFORMED_URLS)]
+
+
+def _pairwise(records: list) -> list:
+    from latest_ai_development.entities import merge_records, same_entity
+
+    merged = []
+    for record in records:
+        for position, known in enumerate(merged):
+            if same_entity("professor", record, known):
+                merged[position] = merge_records(known, record)
+                break
+        else:
+            merged.append(dict(record))
+    return merged
+
+
+def run_index(entries: int = 1000) -> dict:
+    from latest_ai_development.entities import resolve_research_info
+
+    records = []
+    i = 0
+    while len(records) < entries:
+        records += _variants(i)[: 1 + i % 3]
+        i += 1
+    records = records[:entries] + _malformed()
+
+    started = time.perf_counter()
+    resolved = resolve_research_info({"professors": records, "labs": []})
+    indexed_s = time.perf_counter() - started
+    started = time.perf_counter()
+    pairwise = _pairwise(records)
+    pairwise_s = time.perf_counter() - started
+    return {
+        "entries": len(records),
+        "entities": i + len(_MALFORMED_URLS),
+        "indexed": {"wall_s": indexed_s, "merged_to": len(resolved["professors"])},
+        "pairwise": {"wall_s": pairwise_s, "merged_to": len(pairwise)},
+    }
+
+
+def run_fanout(professors: int = 4, latency: float = 0.1) -> dict:
+    llm_server = start_fake_llm(latency=latency)
+    search_server = start_fake_serper()
+    configure_environment(llm_server.url, search_server.url, tempfile.mkdtemp(prefix="lad-entities-"), False)
+
+    from latest_ai_development import pipeline
+
+    results = {}
+    try:
+        for name, setting in (("unresolved", "0"), ("resolved", "1")):
+            os.environ["ENTITY_RESOLUTION"] = setting
+            tag = uuid.uuid4().hex[:6]
+            listing = {"professors": [v for i in range(professors) for v in _variants(i, tag)], "labs": []}
+            requests_before = llm_server.request_count
+            started = time.perf_counter()
+            fanout = pipeline.run_fanout(listing, include_labs=False)["fanout"]
+            results[name] = {
+                "wall_s": time.perf_counter() - started,
+                "llm_requests": llm_server.request_count - requests_before,
+                "researched": len(fanout["results"]),
+            }
+    finally:
+        os.environ.pop("ENTITY_RESOLUTION", None)
+        llm_server.stop()
+        search_server.stop()
+    return {"professors": professors, "entries": professors * 3, "latency": latency, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1000, help="listing size for the index benchmark")
+    parser.add_argument("--professors", type=int, default=4, help="distinct professors for the fan-out benchmark")
+    parser.add_argument("--latency", type=float, default=0.1, help="fake LLM latency per request (s)")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    # The fan-out configures the data directory, before anything opens the registry
+    report = {"fanout": run_fanout(args.professors, args.latency)}
+    report["index"] = run_index(args.entries)
+    index = report["index"]
+    print(f"index: {index['entries']} entries of {index['entities']} professors")
+    for name in ("indexed", "pairwise"):
+        print(f"  {name:<10}{index[name]['wall_s']:>10.3f} s  -> {index[name]['merged_to']} entries")
+    fanout = report["fanout"]
+    print(f"fanout: {fanout['entries']} entries of {fanout['professors']} professors")
+    for name, result in fanout["results"].items():
+        print(f"  {name:<12}{result['wall_s']:>8.3f} s{result['llm_requests']:>6} LLM requests"
+              f"{result['researched']:>4} researched")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
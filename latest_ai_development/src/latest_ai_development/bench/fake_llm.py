@@ -0,0 +1,249 @@
+"""
+Local, deterministic stand-in for the OpenAI chat completions endpoint.
+
+Agents talk to it through litellm like to the real API, so prompts, ReAct
+parsing, tool calls and token accounting all run unchanged. Each agent first
+searches (if it has tools), then answers with JSON matching its task:
+ResearchInfo, SpecificProfessorInfo or CoverLetterOutput. It makes `searches`
+searches (default 1): all in one call when it has the batched search tool
+(tools/batch_search_tool.py), otherwise one per turn, like a real researcher
+looking up each page, lab and professor in turn.
+
+Point the crew at it with:
+    OPENAI_API_BASE=http://127.0.0.1:<port>/v1 OPENAI_API_KEY=test
+
+`failing_models` ({model: HTTP status}) makes requests for those models
+fail, e.g. {"gpt-4o": 429} to exercise the model routing fallback (llm.py).
+With `prompt_cache`, usage reports cached prompt tokens the way OpenAI's
+automatic prompt caching does: the longest prefix (in 128-token blocks, from
+1024 tokens on) that an earlier request already sent.
+
+Run standalone:
+    python -m latest_ai_development.bench.fake_llm --port 8766 --latency 0.2 --professors 8
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+_TOOL_NAME = re.compile(r"^Tool Name: (.+)$", re.MULTILINE)
+_BATCH_TOOL = "Search the internet for several queries"
+_CACHE_BLOCK_TOKENS = 128
+_CACHE_MIN_TOKENS = 1024
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def fake_answer(prompt: str, professors: int = 3, labs: int = 1) -> dict:
+    """The JSON final answer for the task described in `prompt`."""
+    digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:6]
+    if "email_subject" in prompt:
+        return {
+            "email_subject": "Prospective student interested in your research",
+            "email_body": f"Dear Professor, I am writing about your work ({digest}).",
+            "cover_letter": "I am excited to apply to your group. " * 20,
+        }
+    if "'skills'" in prompt:
+        return {
+            "name": "Student",
+            "education": ["BSc Computer Science"],
+            "research_interests": ["machine learning"],
+            "skills": ["Python", "PyTorch"],
+            "experience": [f"Research assistant ({digest})"],
+            "publications": [],
+            "summary": "A student interested in machine learning research.",
+        }
+    if "publications" in prompt:
+        return {
+            "publications": [{"title": f"Paper {i + 1}", "summary": f"Summary {i + 1} ({digest})"} for i in range(3)],
+            "projects": [{"name": f"Project {i + 1}", "description": "A research project."} for i in range(2)],
+            "courses": ["Machine Learning", "Algorithms"],
+        }
+    return {
+        "professors": [
+            {
+                "name": f"Professor {i + 1}",
+                "research_interests": "machine learning",
+                "contact_email": f"prof{i + 1}@example.edu",
+                "url": f"https://example.edu/people/{i + 1}",
+            }
+            for i in range(professors)
+        ],
+        "labs": [
+            {"name": f"Lab {i + 1}", "focus": "artificial intelligence", "url": f"https://example.edu/labs/{i + 1}"}
+            for i in range(labs)
+        ],
+    }
+
+
+def fake_completion(messages: list, professors: int = 3, labs: int = 1, searches: int = 1) -> str:
+    """
+    ReAct-style reply: search actions on the agent's first turns when it has
+    tools (`searches` of them, or one batched call), then the final answer.
+    """
+    prompt = "\n".join(str(message.get("content") or "") for message in messages)
+    tools = [name.strip() for name in _TOOL_NAME.findall(prompt)]
+    turns = sum(message.get("role") == "assistant" for message in messages)
+    batched = _BATCH_TOOL in tools
+    if tools and turns < (1 if batched else searches):
+        user_prompt = next((str(m.get("content") or "") for m in messages if m.get("role") == "user"), prompt)
+        query = "research " + hashlib.sha1(user_prompt.encode("utf-8")).hexdigest()[:10]
+        queries = [query] + [f"{query} {i + 1}" for i in range(1, searches)]
+        if batched:
+            action, action_input = _BATCH_TOOL, {"search_queries": queries}
+        else:
+            action, action_input = tools[0], {"search_query": queries[turns]}
+        return (
+            "Thought: I should search for this first.\n"
+            f"Action: {action}\n"
+            f"Action Input: {json.dumps(action_input)}"
+        )
+    answer = fake_answer(prompt, professors=professors, labs=labs)
+    return "Thought: I now know the final answer\nFinal Answer: " + json.dumps(answer)
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    `prompt_tokens` / `completion_tokens` fix the reported usage per request;
+    when None, they are estimated from the text (4 characters per token).
+    """
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency: float = 0.0, professors: int = 3, labs: int = 1,
+                 prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None,
+                 failing_models: Optional[Dict[str, int]] = None, prompt_cache: bool = False, searches: int = 1):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.professors = professors
+        self.labs = labs
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.failing_models = dict(failing_models or {})
+        self.prompt_cache = prompt_cache
+        self.searches = searches
+        self._prefixes = set()
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def cached_tokens(self, prompt: str) -> int:
+        """Tokens of `prompt` a provider-side prompt cache would have served."""
+        block = _CACHE_BLOCK_TOKENS * 4
+        digest = hashlib.sha1()
+        cached = 0
+        with self._lock:
+            for end in range(block, len(prompt) + 1, block):
+                digest.update(prompt[end - block:end].encode("utf-8"))
+                key = digest.copy().hexdigest()
+                if key in self._prefixes and cached == end - block:
+                    cached = end
+                self._prefixes.add(key)
+        tokens = cached // 4
+        return tokens if tokens >= _CACHE_MIN_TOKENS else 0
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeLLMServer
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.server._lock:
+            self.server.request_count += 1
+            number = self.server.request_count
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        status = self.server.failing_models.get(body.get("model"))
+        if status:
+            data = json.dumps({"error": {"message": f"Fake failure ({status})", "type": "fake_error"}}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        messages = body.get("messages", [])
+        content = fake_completion(messages, professors=self.server.professors, labs=self.server.labs,
+                                  searches=self.server.searches)
+        prompt_tokens = self.server.prompt_tokens or _estimate_tokens(
+            "".join(str(message.get("content") or "") for message in messages)
+        )
+        completion_tokens = self.server.completion_tokens or _estimate_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        if self.server.prompt_cache:
+            prompt = "".join(f"{message.get('role')}:{message.get('content') or ''}" for message in messages)
+            usage["prompt_tokens_details"] = {"cached_tokens": min(prompt_tokens, self.server.cached_tokens(prompt))}
+        payload = {
+            "id": f"chatcmpl-fake-{number}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_llm(port: int = 0, latency: float = 0.0, **options) -> FakeLLMServer:
+    return FakeLLMServer(("127.0.0.1", port), latency=latency, **options).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--professors", type=int, default=3)
+    parser.add_argument("--labs", type=int, default=1)
+    parser.add_argument("--prompt-tokens", type=int)
+    parser.add_argument("--completion-tokens", type=int)
+    parser.add_argument("--fail-model", action="append", default=[], metavar="MODEL=STATUS",
+                        help="answer requests for MODEL with HTTP STATUS (repeatable)")
+    parser.add_argument("--prompt-cache", action="store_true", help="report cached prompt tokens")
+    parser.add_argument("--searches", type=int, default=1, help="searches each agent with tools makes")
+    args = parser.parse_args()
+    server = FakeLLMServer(
+        ("127.0.0.1", args.port), latency=args.latency, professors=args.professors, labs=args.labs,
+        prompt_tokens=args.prompt_tokens, completion_tokens=args.completion_tokens,
+        failing_models={model: int(status) for model, status in (item.split("=", 1) for item in args.fail_model)},
+        prompt_cache=args.prompt_cache, searches=args.searches,
+    )
+    print(f"Fake LLM listening on {server.url}")
+    server.serve_forever()
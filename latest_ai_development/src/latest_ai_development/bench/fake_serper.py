@@ -0,0 +1,107 @@
+"""
+Local stand-in for the google.serper.dev search endpoint.
+
+Point the crew at it with:
+    SERPER_SEARCH_URL=http://127.0.0.1:<port>/search SERPER_API_KEY=test
+
+Run standalone:
+    python -m latest_ai_development.bench.fake_serper --port 8765
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_results(query: str, num: int = 10) -> dict:
+    """Deterministic organic results for `query`."""
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+    organic = [
+        {
+            "title": f"{query} - result {i + 1}",
+            "link": f"https://example.edu/{digest}/{i + 1}",
+            "snippet": f"Snippet {i + 1} about {query}.",
+            "position": i + 1,
+        }
+        for i in range(num)
+    ]
+    return {"searchParameters": {"q": query, "num": num}, "organic": organic}
+
+
+class FakeSerperServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    """
+    `status` is the answer to every request; with `flaky` > 0, only the first
+    `flaky` requests get it and the rest succeed (to exercise retries).
+    """
+    def __init__(self, address=("127.0.0.1", 0), latency: float = 0.0, status: int = 200, flaky: int = 0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.status = status
+        self.flaky = flaky
+        self.request_count = 0
+        self.queries = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def start(self) -> "FakeSerperServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeSerperServer
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.server._lock:
+            self.server.request_count += 1
+            self.server.queries.append(body.get("q", ""))
+            number = self.server.request_count
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        status = self.server.status
+        if self.server.flaky and number > self.server.flaky:
+            status = 200
+        if status != 200:
+            payload = {"message": "fake error", "statusCode": status}
+        else:
+            payload = fake_results(body.get("q", ""), int(body.get("num", 10)))
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_serper(port: int = 0, latency: float = 0.0) -> FakeSerperServer:
+    return FakeSerperServer(("127.0.0.1", port), latency=latency).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeSerperServer(("127.0.0.1", args.port), latency=args.latency)
+    print(f"Fake Serper listening on {server.url}")
+    server.serve_forever()
@@ -0,0 +1,130 @@
+"""
+Local HTTP fixture server of faculty pages, to test and benchmark the page
+fetch cache (page_cache.py) without touching real university sites.
+
+Every page has a strong ETag and a Last-Modified date and answers matching
+conditional requests with 304. Pages are generated on demand for any path
+(/faculty/<n> looks like a professor profile padded with navigation,
+scripts and styles) unless set explicitly with `set_page`.
+
+Run standalone:
+    python -m latest_ai_development.bench.fixture_server --port 8766
+"""
+import argparse
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_NAV = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(60))
+_SCRIPT = "var analytics = {" + ",".join(f'"k{i}": {i}' for i in range(400)) + "};"
+_STYLE = "".join(f".c{i} {{ margin: {i}px; color: #{i:06x}; }}\n" for i in range(300))
+
+
+def faculty_page(path: str) -> str:
+    """A deterministic professor profile page for `path`, mostly boilerplate."""
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+    publications = "".join(
+        f"<li><b>Paper {i} on soft robotics {digest}</b> (20{10 + i}). Controllers for compliant grippers.</li>"
+        for i in range(8)
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>Prof. {digest} | Mechanical Engineering</title>"
+        f"<style>{_STYLE}</style><script>{_SCRIPT}</script></head><body>"
+        f"<nav><ul>{_NAV}</ul></nav>"
+        f"<main><h1>Professor {digest}</h1>"
+        f"<p>Research interests: robotics, control, and soft actuators. Contact: {digest}@example.edu</p>"
+        f"<h2>Publications</h2><ul>{publications}</ul>"
+        f"<h2>Courses</h2><ul><li>MECH 6300 Robotics</li><li>MECH 6310 Nonlinear Control</li></ul>"
+        f"</main><footer>{_NAV}</footer></body></html>"
+    )
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency: float = 0.0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.pages = {}
+        self.request_count = 0
+        self.full_responses = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_page(self, path: str, html: str, status: int = 200) -> None:
+        """Serve `html` at `path` from now on (a new ETag and Last-Modified)."""
+        with self._lock:
+            self.pages[path] = (status, html, formatdate(time.time(), usegmt=True))
+
+    def page(self, path: str):
+        with self._lock:
+            if path not in self.pages:
+                self.pages[path] = (200, faculty_page(path), formatdate(0, usegmt=True))
+            return self.pages[path]
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FixtureServer
+
+    def do_GET(self):
+        with self.server._lock:
+            self.server.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        status, html, last_modified = self.server.page(self.path)
+        body = html.encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if status == 200 and (
+            self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == last_modified
+        ):
+            with self.server._lock:
+                self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        with self.server._lock:
+            self.server.full_responses += 1
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(port: int = 0, latency: float = 0.0) -> FixtureServer:
+    return FixtureServer(("127.0.0.1", port), latency=latency).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FixtureServer(("127.0.0.1", args.port), latency=args.latency)
+    print(f"Fixture pages served at {server.url}/faculty/<n>")
+    server.serve_forever()
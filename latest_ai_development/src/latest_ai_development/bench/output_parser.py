@@ -0,0 +1,137 @@
+"""
+Benchmark: how many realistic agent answers yield usable ResearchInfo JSON,
+parsed the old way (json.loads of the raw text) versus output_parser.parse_output.
+
+The corpus mixes clean JSON with the failure modes seen from models: Markdown
+fences, prose around the JSON, trailing commas, smart quotes, answers cut off
+mid-array, and an item with a missing field. Reports, per variant, the share
+of answers that validate fully, the share of professors/labs recovered, and
+parsing throughput. No LLM or network calls are made.
+
+    python -m latest_ai_development.bench.output_parser --documents 2000 [--json out.json]
+"""
+import argparse
+import json
+import random
+import time
+
+from pydantic import ValidationError
+
+from latest_ai_development.models import ResearchInfo
+from latest_ai_development.output_parser import parse_output
+
+
+def _payload(rng: random.Random) -> dict:
+    professors = [
+        {
+            "name": f"Dr. Professor {i}",
+            "research_interests": "robotics, control theory and soft actuators",
+            "contact_email": f"prof{i}@example.edu",
+            "url": f"https://example.edu/faculty/{i}",
+        }
+        for i in range(rng.randint(3, 10))
+    ]
+    labs = [
+        {"name": f"Lab {i}", "focus": "autonomous systems", "url": f"https://example.edu/labs/{i}"}
+        for i in range(rng.randint(1, 4))
+    ]
+    return {"professors": professors, "labs": labs}
+
+
+def _trailing_commas(text: str) -> str:
+    return text.replace("}", ",}").replace("]", ",]")
+
+
+VARIANTS = {
+    "clean": lambda text, rng: text,
+    "fenced": lambda text, rng: f"```json\n{text}\n```",
+    "prose": lambda text, rng: f"Here is the information I found:\n\n{text}\n\nLet me know if you need more.",
+    "trailing_comma": lambda text, rng: _trailing_commas(text),
+    "smart_quotes": lambda text, rng: text.replace('"', "“", 1).replace('"', "”", 1),
+    "truncated": lambda text, rng: text[:int(len(text) * rng.uniform(0.4, 0.95))],
+    "missing_field": lambda text, rng: text.replace('"contact_email": "prof1@example.edu", ', "", 1),
+}
+
+
+def corpus(documents: int, seed: int = 0) -> list:
+    """[(variant, text, expected item count)], cycling through VARIANTS."""
+    rng = random.Random(seed)
+    names = list(VARIANTS)
+    docs = []
+    for i in range(documents):
+        payload = _payload(rng)
+        variant = names[i % len(names)]
+        text = VARIANTS[variant](json.dumps(payload), rng)
+        docs.append((variant, text, len(payload["professors"]) + len(payload["labs"])))
+    return docs
+
+
+def _baseline(text: str) -> tuple:
+    try:
+        data = json.loads(text)
+        ResearchInfo.model_validate(data)
+    except (json.JSONDecodeError, ValidationError):
+        return False, 0
+    return True, len(data["professors"]) + len(data["labs"])
+
+
+def _tolerant(text: str) -> tuple:
+    parsed = parse_output(text, ResearchInfo)
+    return parsed.valid, len(parsed.data.get("professors", [])) + len(parsed.data.get("labs", []))
+
+
+def _measure(parse, docs: list) -> dict:
+    per_variant = {}
+    start = time.perf_counter()
+    outcomes = [parse(text) for _, text, _ in docs]
+    elapsed = time.perf_counter() - start
+    for (variant, _, expected), (valid, recovered) in zip(docs, outcomes):
+        stats = per_variant.setdefault(variant, {"documents": 0, "valid": 0, "items": 0, "recovered": 0})
+        stats["documents"] += 1
+        stats["valid"] += valid
+        stats["items"] += expected
+        stats["recovered"] += recovered
+    for stats in per_variant.values():
+        stats["valid_rate"] = stats["valid"] / stats["documents"]
+        stats["recovered_rate"] = stats["recovered"] / stats["items"]
+    return {
+        "valid_rate": sum(valid for valid, _ in outcomes) / len(docs),
+        "recovered_rate": sum(recovered for _, recovered in outcomes) / sum(expected for _, _, expected in docs),
+        "docs_per_s": len(docs) / elapsed,
+        "variants": per_variant,
+    }
+
+
+def run(documents: int = 2000, seed: int = 0) -> dict:
+    docs = corpus(documents, seed)
+    return {
+        "documents": documents,
+        "before": _measure(_baseline, docs),
+        "after": _measure(_tolerant, docs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    report = run(args.documents, args.seed)
+    print(f"{'variant':<16}{'valid before':>14}{'valid after':>13}{'items before':>14}{'items after':>13}")
+    for variant in VARIANTS:
+        before, after = report["before"]["variants"][variant], report["after"]["variants"][variant]
+        print(f"{variant:<16}{before['valid_rate']:>14.0%}{after['valid_rate']:>13.0%}"
+              f"{before['recovered_rate']:>14.0%}{after['recovered_rate']:>13.0%}")
+    print(f"{'all':<16}{report['before']['valid_rate']:>14.0%}{report['after']['valid_rate']:>13.0%}"
+          f"{report['before']['recovered_rate']:>14.0%}{report['after']['recovered_rate']:>13.0%}")
+    print(f"throughput: {report['before']['docs_per_s']:.0f} docs/s before, "
+          f"{report['after']['docs_per_s']:.0f} docs/s after")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: reading N faculty pages from the local fixture server
+(bench/fixture_server.py) with plain GETs of the raw HTML (before) versus
+the page cache (after): a cold fetch, a warm one within the TTL, and one
+where every entry has expired and is revalidated with a conditional GET.
+
+Reports wall time, HTTP requests and full responses, bytes downloaded, and
+the characters (and approximate tokens, chars / 4) an agent would read.
+
+    python -m latest_ai_development.bench.page_cache --pages 20 --latency 0.05 [--json out.json]
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+from latest_ai_development.bench.fixture_server import start_fixture_server
+from latest_ai_development.page_cache import DomainThrottle, PageCache, PageFetcher
+
+
+def _measure(server, urls, read) -> dict:
+    requests_before, full_before = server.request_count, server.full_responses
+    started = time.perf_counter()
+    downloaded = chars = 0
+    for url in urls:
+        size, text = read(url)
+        downloaded += size
+        chars += len(text)
+    return {
+        "wall_s": time.perf_counter() - started,
+        "requests": server.request_count - requests_before,
+        "full_responses": server.full_responses - full_before,
+        "bytes_downloaded": downloaded,
+        "chars_to_agent": chars,
+        "approx_tokens": chars // 4,
+    }
+
+
+def run(pages: int = 20, latency: float = 0.05) -> dict:
+    server = start_fixture_server(latency=latency)
+    urls = [f"{server.url}/faculty/{i}" for i in range(pages)]
+    session = requests.Session()
+
+    def raw(url):
+        response = session.get(url, timeout=10)
+        return len(response.content), response.text
+
+    def cached(fetcher):
+        def read(url):
+            before = fetcher.cache.stats()["body_bytes"]
+            page = fetcher.fetch(url)
+            return fetcher.cache.stats()["body_bytes"] - before, page["text"]
+        return read
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="lad-pages-") as tmp:
+            cache = PageCache(Path(tmp) / "pages.sqlite3")
+            throttle = DomainThrottle(min_interval=0.0, max_concurrency=2)
+            fresh = PageFetcher(cache, throttle, ttl_seconds=3600)
+            expired = PageFetcher(cache, throttle, ttl_seconds=0)
+            results = {
+                "before": _measure(server, urls, raw),
+                "cold": _measure(server, urls, cached(fresh)),
+                "warm": _measure(server, urls, cached(fresh)),
+                "revalidate": _measure(server, urls, cached(expired)),
+            }
+            results["cache"] = cache.stats()
+    finally:
+        server.stop()
+    return {"pages": pages, "latency": latency, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="fixture server latency per request (s)")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    report = run(args.pages, args.latency)
+    print(f"{'scenario':<12}{'wall (s)':>10}{'requests':>10}{'full':>6}{'KiB down':>10}{'tokens':>10}")
+    for name in ("before", "cold", "warm", "revalidate"):
+        result = report["results"][name]
+        print(f"{name:<12}{result['wall_s']:>10.3f}{result['requests']:>10}{result['full_responses']:>6}"
+              f"{result['bytes_downloaded'] / 1024:>10.1f}{result['approx_tokens']:>10}")
+    cache = report["results"]["cache"]
+    print(f"cache: {cache['pages']} pages, {cache['body_bytes'] / 1024:.1f} KiB of bodies stored in "
+          f"{cache['stored_bytes'] / 1024:.1f} KiB")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
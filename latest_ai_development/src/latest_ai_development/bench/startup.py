@@ -0,0 +1,105 @@
+"""
+Benchmark: cold start of each entry point, in a fresh interpreter per sample.
+
+Reports the time to import the entry point (and, for the web app, to answer
+its first health check), the process's total wall time including interpreter
+start-up, its peak resident memory, and whether the agent stack (crewai) got
+loaded on the way. The web app's background warm-up is turned off
+(WARMUP=0) so only what the entry point itself loads is measured.
+
+    python -m latest_ai_development.bench.startup [--repeat 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# src/, where webapp.py and app_streamlit.py live
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+# Entry point -> (module to import, path to GET once it is imported, or None)
+ENTRY_POINTS = {
+    "webapp": ("webapp", None),
+    "webapp_first_health_check": ("webapp", "/healthz"),
+    "streamlit_app": ("app_streamlit", None),
+    "cli": ("latest_ai_development.main", None),
+    "pipeline": ("latest_ai_development.pipeline", None),
+}
+
+_PROBE = """
+import importlib, json, resource, sys, time
+started = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter() - started
+status = None
+if {path!r}:
+    status = module.app.test_client().get({path!r}).status_code
+ready = time.perf_counter() - started
+print(json.dumps({{
+    "import_s": imported,
+    "ready_s": ready,
+    "status": status,
+    "max_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "crewai_loaded": "crewai" in sys.modules,
+}}))
+"""
+
+
+def _sample(module: str, path) -> dict:
+    env = dict(os.environ, WARMUP="0", PYTHONPATH=os.pathsep.join(filter(None, [str(SRC_DIR), os.getenv("PYTHONPATH")])))
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, path=path)],
+        capture_output=True, text=True, cwd=SRC_DIR, env=env,
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        return {"error": (completed.stderr.strip().splitlines() or ["failed"])[-1]}
+    return {**json.loads(completed.stdout.strip().splitlines()[-1]), "process_s": wall}
+
+
+def run(repeat: int = 3, entry_points=tuple(ENTRY_POINTS)) -> dict:
+    results = {}
+    for name in entry_points:
+        module, path = ENTRY_POINTS[name]
+        samples = [_sample(module, path) for _ in range(repeat)]
+        errors = [sample["error"] for sample in samples if "error" in sample]
+        if errors:
+            results[name] = {"error": errors[0]}
+            continue
+        results[name] = {
+            key: statistics.median(sample[key] for sample in samples)
+            for key in ("import_s", "ready_s", "process_s", "max_rss_mib", "modules")
+        }
+        results[name]["status"] = samples[0]["status"]
+        results[name]["crewai_loaded"] = samples[0]["crewai_loaded"]
+    return {"repeat": repeat, "python": sys.version.split()[0], "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="samples per entry point (the median is reported)")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    report = run(args.repeat)
+    print(f"{'entry point':<28}{'import (s)':>11}{'ready (s)':>10}{'process (s)':>12}{'RSS MiB':>9}"
+          f"{'modules':>9}  crewai")
+    for name, result in report["results"].items():
+        if "error" in result:
+            print(f"{name:<28}  skipped: {result['error']}")
+            continue
+        print(f"{name:<28}{result['import_s']:>11.3f}{result['ready_s']:>10.3f}{result['process_s']:>12.3f}"
+              f"{result['max_rss_mib']:>9.1f}{result['modules']:>9.0f}  {'yes' if result['crewai_loaded'] else 'no'}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Offline end-to-end benchmark suite: the real pipeline, web routes and
+background jobs, run against a local fake LLM (bench/fake_llm.py) and a local
+Serper stand-in (bench/fake_serper.py). No OpenAI or Serper calls are made.
+
+Scenarios:
+  - crew:    the full sequential crew (pipeline.run_crew)
+  - webapp:  every route of src/webapp.py through the Flask test client,
+             waiting for the background job each POST starts, including
+             paginated, gzipped and conditional (ETag) JSON API requests
+  - fanout:  professor_research_task fanned out over N entities, per --fanout-sizes
+
+Each scenario reports wall time, per-task latency, LLM/search/tool-call counts,
+token usage and the tracemalloc memory peak. Results can be written as JSON
+and compared with a previous run (e.g. from another commit):
+
+    python -m latest_ai_development.bench.suite --llm-latency 0.05 --json bench.json
+    python -m latest_ai_development.bench.suite --compare bench.json
+
+The environment is configured before the crew modules are imported, so run
+the suite in its own process (it is also the `test` script of the project).
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from latest_ai_development.bench.fake_llm import start_fake_llm
+from latest_ai_development.bench.fake_serper import start_fake_serper
+
+SCENARIOS = ("crew", "webapp", "fanout")
+
+# Web routes in the order a user goes through them, as (method, path, JSON
+# body, headers); POSTs start background jobs. In paths and headers, {job} is
+# the id of the last job started, {cursor} the last listing page's
+# next_cursor and {etag} the last ETag received.
+WEBAPP_ROUTES = (
+    ("GET", "/healthz", None, None),
+    ("GET", "/readyz", None, None),
+    ("GET", "/", None, None),
+    ("POST", "/", {"topic": "machine learning", "university": "Example University", "resume": "Resume text"}, None),
+    ("POST", "/researcher_phase", {"topic": "robotics", "university": "Example University", "resume": "Resume text"},
+     None),
+    ("GET", "/jobs/{job}", None, {"Accept-Encoding": "gzip"}),
+    ("GET", "/jobs/{job}/events", None, None),
+    ("POST", "/run_deeper_research", {"prof_name": "Professor 1", "prof_url": "https://example.edu/people/1"}, None),
+    ("POST", "/run_cover_letter", {"prof_name": "Professor 1", "prof_url": "https://example.edu/people/1"}, None),
+    ("POST", "/run_cover_letters", {"entities": [
+        {"name": f"Professor {i}", "url": f"https://example.edu/people/{i}"} for i in (1, 2, 3)
+    ], "max_concurrency": 2}, None),
+    ("POST", "/run_fanout_research", {"max_concurrency": 4}, None),
+    ("POST", "/select", None, None),
+    ("GET", "/app", None, None),
+    ("GET", "/api/session", None, None),
+    ("GET", "/api/session/professors?limit=2", None, {"Accept-Encoding": "gzip"}),
+    ("GET", "/api/session/professors?limit=2", None, {"Accept-Encoding": "gzip", "If-None-Match": "{etag}"}),
+    ("GET", "/api/session/professors?limit=2&cursor={cursor}", None, {"Accept-Encoding": "gzip"}),
+    ("GET", "/api/session/raw_result", None, {"Accept-Encoding": "gzip"}),
+    ("GET", "/jobs", None, {"Accept-Encoding": "gzip"}),
+    # The last job is over by now: measures the 409 answer
+    ("POST", "/jobs/{job}/cancel", None, {"Accept": "application/json"}),
+    ("GET", "/metrics", None, None),
+)
+
+
+def configure_environment(llm_url: str, search_url: str, data_dir: str, checkpoints: bool) -> None:
+    os.environ["OPENAI_API_BASE"] = llm_url
+    os.environ["SERPER_SEARCH_URL"] = search_url
+    os.environ["LAD_DATA_DIR"] = data_dir
+    os.environ["CHECKPOINTS"] = "1" if checkpoints else "0"
+    # Measured runs execute, rather than being served from earlier stored runs
+    os.environ["ARTIFACTS_REUSE"] = "0"
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    os.environ.setdefault("SERPER_API_KEY", "fake")
+    os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+
+def _summarize_events(events: list) -> dict:
+    tasks = {}
+    for event in events:
+        if event["type"] == "task_finished":
+            tasks.setdefault(event["task"], []).append(event["duration"])
+    return {
+        "tasks": {
+            name: {"count": len(durations), "mean_s": statistics.mean(durations), "max_s": max(durations)}
+            for name, durations in tasks.items()
+        },
+        "tool_calls": sum(1 for event in events if event["type"] == "tool_call"),
+        "tokens": sum(
+            event.get("tokens", {}).get("total_tokens", 0)
+            for event in events if event["type"] == "task_finished"
+        ),
+    }
+
+
+class _Measurement:
+    """Wall time, memory peak and fake-server request counts around a block."""
+
+    def __init__(self, llm_server, search_server):
+        self.llm_server = llm_server
+        self.search_server = search_server
+
+    def __enter__(self):
+        self._llm_before = self.llm_server.request_count
+        self._search_before = self.search_server.request_count
+        tracemalloc.reset_peak()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.result = {
+            "wall_s": time.perf_counter() - self._started,
+            "memory_peak_mib": tracemalloc.get_traced_memory()[1] / (1024 * 1024),
+            "llm_requests": self.llm_server.request_count - self._llm_before,
+            "search_requests": self.search_server.request_count - self._search_before,
+        }
+        return False
+
+
+def bench_crew(llm_server, search_server) -> dict:
+    from latest_ai_development.events import EventStream
+    from latest_ai_development.pipeline import run_crew
+
+    events = EventStream()
+    # A fresh topic per run so the search cache and checkpoints start cold
+    inputs = {"topic": f"machine learning {uuid.uuid4().hex[:8]}", "university": "Example University",
+              "resume": "Resume text"}
+    with _Measurement(llm_server, search_server) as measurement:
+        run_crew(inputs, events=events)
+    return {**measurement.result, **_summarize_events(events.events())}
+
+
+def _import_webapp():
+    # webapp.py lives next to the package in src/, not inside it
+    src = Path(__file__).resolve().parents[2]
+    if (src / "webapp.py").exists() and str(src) not in sys.path:
+        sys.path.insert(0, str(src))
+    import webapp
+    return webapp
+
+
+def bench_webapp(llm_server, search_server) -> dict:
+    from latest_ai_development.jobs import job_manager
+
+    webapp = _import_webapp()
+    client = webapp.app.test_client()
+    routes = {}
+    state = {"job": "", "cursor": "", "etag": ""}
+    with _Measurement(llm_server, search_server) as measurement:
+        for method, path, body, headers in WEBAPP_ROUTES:
+            url = path.format(**state)
+            request_headers = {name: value.format(**state) for name, value in (headers or {}).items()}
+            started = time.perf_counter()
+            if method == "GET":
+                response = client.get(url, headers=request_headers)
+            elif body is None:
+                response = client.post(url, data={}, headers=request_headers)
+            else:
+                response = client.post(url, json=body, headers=request_headers)
+            # Streamed responses (job events) are read to the end
+            data = response.get_data()
+            entry = {"status": response.status_code, "response_s": time.perf_counter() - started,
+                     "bytes": len(data), "encoding": response.headers.get("Content-Encoding", "identity")}
+            state["etag"] = response.headers.get("ETag") or state["etag"]
+
+            payload = json.loads(gzip.decompress(data)) if entry["encoding"] == "gzip" else \
+                response.get_json(silent=True)
+            response.close()
+            if isinstance(payload, dict) and payload.get("next_cursor"):
+                state["cursor"] = payload["next_cursor"]
+            job = job_manager.get(payload.get("id", "")) if isinstance(payload, dict) and method == "POST" else None
+            if job is not None:
+                state["job"] = job.id
+                for _ in job.events.follow():
+                    pass
+                entry["job_status"] = job.status
+                entry["job_s"] = time.perf_counter() - started
+                entry.update(_summarize_events(job.events.events()))
+            label = f"{method} {path}"
+            if "If-None-Match" in (headers or {}):
+                label += " (If-None-Match)"
+            routes[label] = entry
+    return {
+        **measurement.result,
+        "routes": routes,
+        "tool_calls": sum(entry.get("tool_calls", 0) for entry in routes.values()),
+    }
+
+
+def bench_fanout(llm_server, search_server, size: int) -> dict:
+    from latest_ai_development.events import EventStream
+    from latest_ai_development.pipeline import run_fanout
+
+    run = uuid.uuid4().hex[:8]
+    research_info = {
+        "professors": [
+            {"name": f"Professor {i + 1} ({run})", "research_interests": "machine learning",
+             "contact_email": f"prof{i + 1}@example.edu", "url": f"https://example.edu/{run}/{i + 1}"}
+            for i in range(size)
+        ],
+        "labs": [],
+    }
+    events = EventStream()
+    with _Measurement(llm_server, search_server) as measurement:
+        result = run_fanout(research_info, events=events)
+    failed = sum(1 for entity in result["fanout"]["results"] if entity.get("error"))
+    return {**measurement.result, **_summarize_events(events.events()), "size": size, "failed": failed}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _aggregate(samples: list) -> dict:
+    """Median of the numeric fields over the iterations, plus the raw samples."""
+    walls = sorted(sample["wall_s"] for sample in samples)
+    return {
+        "wall_s": statistics.median(walls),
+        "wall_s_min": walls[0],
+        "wall_s_max": walls[-1],
+        "memory_peak_mib": max(sample["memory_peak_mib"] for sample in samples),
+        "samples": samples,
+    }
+
+
+def run(scenarios=SCENARIOS, iterations: int = 1, fanout_sizes=(1, 4, 8), llm_latency: float = 0.0,
+        search_latency: float = 0.0, prompt_tokens=None, completion_tokens=None, checkpoints: bool = False) -> dict:
+    llm_server = start_fake_llm(latency=llm_latency, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    search_server = start_fake_serper(latency=search_latency)
+    data_dir = tempfile.mkdtemp(prefix="lad-bench-")
+    configure_environment(llm_server.url, search_server.url, data_dir, checkpoints)
+
+    from latest_ai_development.crew_factory import crew_factory
+
+    tracemalloc.start()
+    results = {}
+    try:
+        crew_factory.warm_up()
+        for scenario in scenarios:
+            if scenario == "crew":
+                results["crew"] = _aggregate([bench_crew(llm_server, search_server) for _ in range(iterations)])
+            elif scenario == "webapp":
+                results["webapp"] = _aggregate([bench_webapp(llm_server, search_server) for _ in range(iterations)])
+            elif scenario == "fanout":
+                for size in fanout_sizes:
+                    results[f"fanout_{size}"] = _aggregate(
+                        [bench_fanout(llm_server, search_server, size) for _ in range(iterations)]
+                    )
+            else:
+                raise ValueError(f"Unknown scenario '{scenario}', expected one of {', '.join(SCENARIOS)}")
+    finally:
+        tracemalloc.stop()
+        llm_server.stop()
+        search_server.stop()
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "config": {
+            "iterations": iterations,
+            "llm_latency": llm_latency,
+            "search_latency": search_latency,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "checkpoints": checkpoints,
+        },
+        "results": results,
+    }
+
+
+def _print_report(report: dict, baseline: dict = None) -> None:
+    print(f"commit {report['commit']}  python {report['python']}  {report['config']}")
+    header = f"{'scenario':<14}{'wall (s)':>10}{'llm req':>9}{'search':>8}{'tools':>7}{'peak MiB':>10}"
+    if baseline:
+        header += f"{'baseline':>10}{'change':>9}"
+    print(header)
+    for name, result in report["results"].items():
+        last = result["samples"][-1]
+        line = (f"{name:<14}{result['wall_s']:>10.3f}{last['llm_requests']:>9}{last['search_requests']:>8}"
+                f"{last.get('tool_calls', 0):>7}{result['memory_peak_mib']:>10.1f}")
+        base = (baseline or {}).get("results", {}).get(name)
+        if base:
+            line += f"{base['wall_s']:>10.3f}{(result['wall_s'] / base['wall_s'] - 1) * 100:>+8.1f}%"
+        print(line)
+        for task, stats in last.get("tasks", {}).items():
+            print(f"    {task:<28} x{stats['count']:<4} mean {stats['mean_s']:.3f}s  max {stats['max_s']:.3f}s")
+        for route, stats in last.get("routes", {}).items():
+            job = f"  job {stats['job_s']:.3f}s ({stats['job_status']})" if "job_s" in stats else ""
+            print(f"    {route:<52} {stats['status']}  {stats['response_s'] * 1000:.1f} ms{job}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--fanout-sizes", default="1,4,8")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per fake LLM request")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="seconds per fake search request")
+    parser.add_argument("--prompt-tokens", type=int, help="fixed prompt tokens per LLM request")
+    parser.add_argument("--completion-tokens", type=int, help="fixed completion tokens per LLM request")
+    parser.add_argument("--checkpoints", action="store_true", help="keep task checkpoints enabled")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(
+        scenarios=[name.strip() for name in args.scenarios.split(",") if name.strip()],
+        iterations=args.iterations,
+        fanout_sizes=[int(size) for size in args.fanout_sizes.split(",") if size.strip()],
+        llm_latency=args.llm_latency,
+        search_latency=args.search_latency,
+        prompt_tokens=args.prompt_tokens,
+        completion_tokens=args.completion_tokens,
+        checkpoints=args.checkpoints,
+    )
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    _print_report(report, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: cost of tracing, and of crewai's verbose console output.
+
+  - spans: time per span with tracing off, with the trace sampled out, and
+    traced and exported to a file (three levels of nesting, a few attributes)
+  - crew: full crew runs against the fake LLM, in a fresh interpreter per
+    setting, with CREW_VERBOSE=1 and =0 (tracing on in both); reports the run
+    time and how much the run printed
+
+    python -m latest_ai_development.bench.tracing [--spans 20000] [--runs 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# src/, the import root of the package
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+_PROBE = """
+import json, sys, tempfile, time
+from latest_ai_development.bench.fake_llm import start_fake_llm
+from latest_ai_development.bench.fake_serper import start_fake_serper
+from latest_ai_development.bench.suite import configure_environment
+llm, search = start_fake_llm(), start_fake_serper()
+configure_environment(llm.url, search.url, tempfile.mkdtemp(prefix="lad-tracing-"), False)
+from latest_ai_development import pipeline, tracing
+walls = []
+for i in range({runs}):
+    started = time.perf_counter()
+    pipeline.run_crew({{"topic": f"topic {{i}}", "university": "Example University", "resume": "A resume."}})
+    walls.append(time.perf_counter() - started)
+tracing.tracer.flush()
+llm.stop()
+search.stop()
+print("RESULT " + json.dumps({{"walls": walls}}))
+"""
+
+
+def _span_cost(tracer, count: int) -> float:
+    started = time.perf_counter()
+    for i in range(count // 3):
+        with tracer.span("run", "run", topic="machine learning", resume="x" * 2000):
+            with tracer.span("task", "task", agent="researcher") as task:
+                with tracer.span("llm_call", "llm", model="gpt-4o-mini", messages=2) as call:
+                    call.set(completion_chars=i)
+                task.set(outcome="executed")
+    return (time.perf_counter() - started) / (count // 3 * 3)
+
+
+def run_spans(count: int = 20000) -> dict:
+    from latest_ai_development.tracing import SpanExporter, Tracer
+
+    path = Path(tempfile.mkdtemp(prefix="lad-tracing-")) / "traces.jsonl"
+    # A long flush interval: the export thread does not compete with the loop
+    exporter = SpanExporter(path, buffer=count + 1, flush_interval=3600)
+    settings = {
+        "off": Tracer(None),
+        "sampled_out": Tracer(exporter, sample_rate=0.0),
+        "traced": Tracer(exporter),
+    }
+    results = {name: {"us_per_span": _span_cost(tracer, count) * 1e6} for name, tracer in settings.items()}
+    started = time.perf_counter()
+    exporter.flush()
+    results["traced"]["export_us_per_span"] = (time.perf_counter() - started) / (count // 3 * 3) * 1e6
+    results["traced"]["file_bytes"] = path.stat().st_size
+    return {"spans": count // 3 * 3, "results": results}
+
+
+def _crew_sample(verbose: str, runs: int) -> dict:
+    env = dict(os.environ, CREW_VERBOSE=verbose, TRACING="1",
+               PYTHONPATH=os.pathsep.join(filter(None, [str(SRC_DIR), os.getenv("PYTHONPATH")])))
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(runs=runs)],
+        capture_output=True, text=True, cwd=SRC_DIR, env=env,
+    )
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("RESULT ")]
+    if completed.returncode != 0 or not lines:
+        return {"error": (completed.stderr.strip().splitlines() or ["failed"])[-1]}
+    walls = json.loads(lines[-1][len("RESULT "):])["walls"]
+    return {
+        # The first run also loads the crew
+        "first_run_s": walls[0],
+        "run_s": sum(walls[1:]) / max(1, len(walls) - 1),
+        "printed_bytes": len(completed.stdout) - len(lines[-1]) - 1,
+    }
+
+
+def run_crew(runs: int = 5) -> dict:
+    return {"runs": runs, "results": {f"verbose={verbose}": _crew_sample(verbose, runs) for verbose in ("1", "0")}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spans", type=int, default=20000, help="spans timed per setting")
+    parser.add_argument("--runs", type=int, default=5, help="crew runs per verbose setting")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    report = {"spans": run_spans(args.spans), "crew": run_crew(args.runs)}
+    print(f"spans: {report['spans']['spans']} per setting")
+    for name, result in report["spans"]["results"].items():
+        export = f"  + {result['export_us_per_span']:.1f} us export" if "export_us_per_span" in result else ""
+        print(f"  {name:<12}{result['us_per_span']:>8.1f} us/span{export}")
+    print(f"crew: {report['crew']['runs']} runs per setting")
+    for name, result in report["crew"]["results"].items():
+        if "error" in result:
+            print(f"  {name:<12}  skipped: {result['error']}")
+            continue
+        print(f"  {name:<12}{result['run_s']:>8.3f} s/run  (first {result['first_run_s']:.3f} s)"
+              f"{result['printed_bytes']:>10} bytes printed")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# checkpoints.py
+
+"""
+Per-task checkpoints: validated task outputs stored by a hash of everything
+that determines them.
+
+A task's key covers its interpolated description and expected output, its
+output model, its agent's interpolated role/goal/backstory and model, and the
+context it receives from upstream tasks. Re-running with only a new resume
+therefore reuses research_task and professor_research_task and executes only
+cover_letter_task, whose description contains {resume}.
+
+Runs (inputs + task keys) are recorded too, so `replay <task_id>` can resume
+the last run from any task.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+from latest_ai_development.storage import connect, data_dir
+
+
+def task_key(task, agent, context: Optional[str] = None) -> str:
+    """
+    Hash of an (already interpolated) task, its agent and its upstream context.
+    """
+    output_model = task.output_json or task.output_pydantic
+    payload = {
+        "task": {
+            "name": task.name,
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "output_model": output_model.model_json_schema() if output_model else None,
+        },
+        "agent": {
+            "role": agent.role,
+            "goal": agent.goal,
+            "backstory": agent.backstory,
+            "llm": getattr(agent.llm, "model", str(agent.llm)),
+            "tools": sorted(tool.name for tool in agent.tools or []),
+        },
+        "context": context or "",
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class CheckpointStore:
+    """
+    SQLite store of task outputs (by task key) and of crew runs.
+    Checkpoints older than `ttl_seconds` are ignored.
+    """
+
+    def __init__(self, path=None, ttl_seconds: float = 86400):
+        self.path = path or data_dir() / "checkpoints.sqlite3"
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    key TEXT PRIMARY KEY,
+                    task_name TEXT NOT NULL,
+                    raw TEXT NOT NULL,
+                    json TEXT,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    inputs TEXT NOT NULL,
+                    tasks TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT task_name, raw, json, created_at FROM checkpoints WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[3] > self.ttl_seconds:
+            return None
+        task_name, raw, json_dict, _ = row
+        return {"task": task_name, "raw": raw, "json_dict": json.loads(json_dict) if json_dict else None}
+
+    def put(self, key: str, task_name: str, raw: str, json_dict: Optional[dict]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, task_name, raw, json, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, task_name, raw, json.dumps(json_dict) if json_dict is not None else None, time.time()),
+            )
+
+    def record_run(self, inputs: dict, tasks: List[dict], run_id: Optional[str] = None) -> str:
+        """
+        Remember a crew run: its inputs and [{"task": name, "key": key, ...}, ...].
+        """
+        run_id = run_id or uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, inputs, tasks, created_at) VALUES (?, ?, ?, ?)",
+                (run_id, json.dumps(inputs), json.dumps(tasks), time.time()),
+            )
+        return run_id
+
+    def get_run(self, run_id: Optional[str] = None) -> Optional[dict]:
+        """
+        A recorded run by id, or the most recent one when run_id is None.
+        """
+        with self._lock:
+            if run_id:
+                row = self._conn.execute(
+                    "SELECT run_id, inputs, tasks, created_at FROM runs WHERE run_id = ?", (run_id,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT run_id, inputs, tasks, created_at FROM runs ORDER BY created_at DESC LIMIT 1"
+                ).fetchone()
+        if row is None:
+            return None
+        return {
+            "run_id": row[0],
+            "inputs": json.loads(row[1]),
+            "tasks": json.loads(row[2]),
+            "created_at": row[3],
+        }
+
+
+def create_checkpoint_store() -> Optional[CheckpointStore]:
+    """
+    Configured by CHECKPOINTS ("1" by default, "0" disables),
+    CHECKPOINT_TTL (seconds, default one day) and CHECKPOINT_PATH.
+    """
+    if os.getenv("CHECKPOINTS", "1") == "0":
+        return None
+    return CheckpointStore(
+        path=os.getenv("CHECKPOINT_PATH") or None,
+        ttl_seconds=float(os.getenv("CHECKPOINT_TTL", "86400")),
+    )
+
+
+checkpoint_store = create_checkpoint_store()
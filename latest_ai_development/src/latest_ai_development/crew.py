@@ -3,62 +3,59 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from dotenv import load_dotenv
-from crewai_tools import SerperDevTool
-from pydantic import BaseModel
-from typing import List
+import os
 import yaml
 import json
 
+from latest_ai_development.llm import agent_llm
+# Task output models live in models.py; re-exported for existing imports
+from latest_ai_development.models import (  # noqa: F401
+    Professor,
+    Lab,
+    ResearchInfo,
+    Publication,
+    Project,
+    SpecificProfessorInfo,
+    CoverLetterOutput,
+    CandidateProfile,
+    CoverLetterResult,
+    CoverLetterBatch,
+    EntityResearch,
+    FanOutResearchInfo,
+)
+from latest_ai_development.output_parser import TolerantConverter
+from latest_ai_development.tools.batch_search_tool import batch_search
+from latest_ai_development.tools.cached_search_tool import cached_search
+from latest_ai_development.tools.custom_tool import CustomSerperDevTool
+from latest_ai_development.tools.fetch_tool import fetch_page
+from latest_ai_development.tools.knowledge_tool import knowledge_search
+from latest_ai_development.tracing import verbose
+
 # Load environment variables
 load_dotenv()
 
-# Initialize the search tool
-search = SerperDevTool(
-    search_url="https://google.serper.dev/search",
+# Initialize the search tool: pooled keep-alive connections, bounded
+# concurrency and retries (SERPER_SEARCH_URL can point at a local
+# stand-in, see bench/fake_serper.py)
+serper = CustomSerperDevTool(
+    search_url=os.getenv("SERPER_SEARCH_URL", "https://google.serper.dev/search"),
     n_results=2,
 )
 
-# Existing Pydantic models for the main listing
-class Professor(BaseModel):
-    name: str
-    research_interests: str
-    contact_email: str
-    url: str
-
-class Lab(BaseModel):
-    name: str
-    focus: str
-    url: str
-
-class ResearchInfo(BaseModel):
-    professors: List[Professor]
-    labs: List[Lab]
-
-# --- NEW MODELS BELOW ---
-
-class Publication(BaseModel):
-    title: str
-    summary: str
-
-class Project(BaseModel):
-    name: str
-    description: str
-
-class SpecificProfessorInfo(BaseModel):
-    """
-    For deeper professor/lab research.
-    """
-    publications: List[Publication]
-    projects: List[Project]
-    courses: List[str]
-
-class CoverLetterOutput(BaseModel):
-    """
-    For email subject/body + cover letter.
-    """
-    email_subject: str
-    email_body: str
-    cover_letter: str
+# Repeated queries across runs and users are served from an on-disk cache
+search = cached_search(serper)
+
+# Several queries in one tool call, searched concurrently and merged by URL,
+# so listing professors takes fewer agent turns (SEARCH_BATCH=0 leaves it out)
+listing_tools = [batch_search(search), search] if os.getenv("SEARCH_BATCH", "1") != "0" else [search]
+
+# Local BM25 index over knowledge/ and the cached search results, checked
+# before going to the web for deeper research
+knowledge = knowledge_search(search.cache)
+
+# Professor/lab pages come from an on-disk page cache as extracted text, and
+# are added to the knowledge index once read
+fetch = fetch_page(index=knowledge.index)
 
 # Paths to YAML configs
 agents_config = 'config/agents.yaml'
@@ -72,23 +69,26 @@ class LatestAiDevelopment():
     def researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['researcher'],
-            verbose=True,
-            tools=[search]
+            llm=agent_llm('researcher', self.agents_config['researcher']),
+            verbose=verbose(),
+            tools=listing_tools
         )
 
     @agent
     def deeper_researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['deeper_researcher'],
-            verbose=True,
-            tools=[search]
+            llm=agent_llm('deeper_researcher', self.agents_config['deeper_researcher']),
+            verbose=verbose(),
+            tools=[knowledge, fetch, search]
         )
 
     @agent
     def cover_letter_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['cover_letter_agent'],
-            verbose=True,
+            llm=agent_llm('cover_letter_agent', self.agents_config['cover_letter_agent']),
+            verbose=verbose(),
             tools=[]
         )
 
@@ -97,10 +97,12 @@ class LatestAiDevelopment():
         # The main listing of professors/labs
         t = Task(
             config=self.tasks_config['research_task'],
-            tools=[search],
+            tools=listing_tools,
         )
         # Ensure JSON matches ResearchInfo model
         t.output_json = ResearchInfo
+        # Repair fenced/truncated JSON locally before asking the LLM to reformat it
+        t.converter_cls = TolerantConverter
         return t
 
     @task
@@ -111,10 +113,24 @@ class LatestAiDevelopment():
         """
         t = Task(
             config=self.tasks_config['professor_research_task'],
-            tools=[search],
+            tools=[knowledge, fetch, search],
         )
         # Now enforce the SpecificProfessorInfo model
         t.output_json = SpecificProfessorInfo
+        t.converter_cls = TolerantConverter
+        return t
+
+    @task
+    def candidate_profile_task(self) -> Task:
+        """
+        Condenses the student's resume into a CandidateProfile, reused by
+        every cover letter written for them.
+        """
+        t = Task(
+            config=self.tasks_config['candidate_profile_task'],
+        )
+        t.output_json = CandidateProfile
+        t.converter_cls = TolerantConverter
         return t
 
     @task
@@ -128,6 +144,7 @@ class LatestAiDevelopment():
         )
         # Enforce the CoverLetterOutput model
         t.output_json = CoverLetterOutput
+        t.converter_cls = TolerantConverter
         return t
 
     @crew
@@ -145,5 +162,5 @@ class LatestAiDevelopment():
                 self.cover_letter_task(),
             ],
             process=Process.sequential,
-            verbose=True,
+            verbose=verbose(),
         )
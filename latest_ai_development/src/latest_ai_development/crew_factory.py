@@ -0,0 +1,121 @@
+# crew_factory.py
+
+"""
+Process-wide factory for ready-to-run crews, agents and tasks.
+
+Building LatestAiDevelopment() parses config/agents.yaml and config/tasks.yaml
+and constructs every Agent/Task/LLM from scratch. The factory does that once
+per version of the YAML files, validates the configs, and afterwards hands out
+copies of the prebuilt prototype, so each caller gets isolated instances that
+can run concurrently with the others.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Tuple
+
+from latest_ai_development.crew import LatestAiDevelopment
+
+REQUIRED_AGENT_KEYS = ("role", "goal", "backstory")
+REQUIRED_TASK_KEYS = ("description", "expected_output", "agent")
+
+
+def validate_configs(agents_config: dict, tasks_config: dict) -> None:
+    """
+    Raise ValueError if an agent/task definition is missing required keys or
+    a task refers to an agent that is not defined.
+    """
+    problems = []
+    for name, config in (agents_config or {}).items():
+        missing = [key for key in REQUIRED_AGENT_KEYS if not (config or {}).get(key)]
+        if missing:
+            problems.append(f"agent '{name}' is missing {', '.join(missing)}")
+    for name, config in (tasks_config or {}).items():
+        missing = [key for key in REQUIRED_TASK_KEYS if not (config or {}).get(key)]
+        if missing:
+            problems.append(f"task '{name}' is missing {', '.join(missing)}")
+        agent = (config or {}).get("agent")
+        if agent and agent not in (agents_config or {}):
+            problems.append(f"task '{name}' refers to unknown agent '{agent}'")
+    if problems:
+        raise ValueError("Invalid crew configuration: " + "; ".join(problems))
+
+
+class CrewFactory:
+    """
+    Hands out independent copies of a prototype LatestAiDevelopment crew.
+    The prototype is rebuilt when the YAML configs change on disk (checked at
+    most every `check_interval` seconds).
+    """
+
+    def __init__(self, crew_class=LatestAiDevelopment, check_interval: float = 2.0):
+        self.crew_class = crew_class
+        self.check_interval = check_interval
+        self.builds = 0
+        self._lock = threading.Lock()
+        self._state = None  # (prototype LatestAiDevelopment, its crew, task name -> agent name)
+        self._signature = None
+        self._checked_at = 0.0
+
+    def config_paths(self) -> Tuple[Path, Path]:
+        base = Path(self.crew_class.base_directory)
+        return (
+            base / self.crew_class.original_agents_config_path,
+            base / self.crew_class.original_tasks_config_path,
+        )
+
+    def _config_signature(self):
+        return tuple((path.stat().st_mtime_ns, path.stat().st_size) for path in self.config_paths())
+
+    def _build(self) -> None:
+        # Validate the raw YAML before CrewBase maps names to objects
+        agents_path, tasks_path = self.config_paths()
+        tasks_config = self.crew_class.load_yaml(tasks_path)
+        validate_configs(self.crew_class.load_yaml(agents_path), tasks_config)
+        task_agents = {name: config["agent"] for name, config in tasks_config.items()}
+        prototype = self.crew_class()
+        self._state = (prototype, prototype.crew(), task_agents)
+        self.builds += 1
+
+    def _current(self):
+        state = self._state
+        if state is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return state
+        with self._lock:
+            signature = self._config_signature()
+            if self._state is None or signature != self._signature:
+                self._build()
+                self._signature = signature
+            self._checked_at = time.monotonic()
+            return self._state
+
+    def warm_up(self) -> None:
+        self._current()
+
+    def crew(self):
+        """A fresh copy of the full crew, with its own agents and tasks."""
+        _, prototype_crew, _ = self._current()
+        return prototype_crew.copy()
+
+    def agent(self, name: str):
+        """A fresh copy of one agent, e.g. factory.agent('researcher')."""
+        prototype, _, _ = self._current()
+        return getattr(prototype, name)().copy()
+
+    def task(self, name: str):
+        """
+        A fresh (task, agent) pair for running one configured task outside a crew.
+        """
+        prototype, _, _ = self._current()
+        prototype_task = getattr(prototype, name)()
+        agent = prototype_task.agent.copy()
+        return prototype_task.copy([agent], {}), agent
+
+    def agent_name(self, task_name: str) -> str:
+        """Config name of the agent assigned to a task, e.g. 'researcher'."""
+        _, _, task_agents = self._current()
+        return task_agents.get(task_name, "")
+
+
+crew_factory = CrewFactory(check_interval=float(os.getenv("CREW_CONFIG_CHECK_INTERVAL", "2")))
@@ -0,0 +1,173 @@
+# deadlines.py
+
+"""
+End-to-end deadlines and cancellation for crew runs.
+
+A run (a web job, a Streamlit or CLI kickoff, a batch record) executes under
+a Deadline installed with `scope()`. Everything the run does below it looks
+the deadline up in its context and honors it:
+
+  - each task checks it before it starts (pipeline.py)
+  - each LLM call checks it, and gets at most the remaining time as its
+    request timeout (llm.py)
+  - search and page fetches check it, cap their timeouts to it, and wait
+    for rate limits, politeness delays and retry backoffs with `sleep()`,
+    which wakes up as soon as the run is cancelled
+  - fan-out threads inherit it (see `propagate`)
+
+When the deadline passes, or the run is cancelled, the next check raises
+DeadlineExceeded or Cancelled. Both derive from Interrupted, a BaseException
+like asyncio.CancelledError, so crewai's generic error handling (agent
+retries, tool errors handed back to the model) lets it through and the run
+unwinds at once; the pipeline then returns what completed, marked
+"truncated" (see pipeline.py).
+
+Configured from the environment:
+  - RUN_DEADLINE: seconds a run may take, from when it starts executing
+    (default: 900; "0" means no limit, runs can still be cancelled)
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional, Tuple, Union
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class Interrupted(BaseException):
+    """The run was stopped before it finished; `reason` is "deadline" or "cancelled"."""
+
+    reason = "interrupted"
+
+
+class DeadlineExceeded(Interrupted):
+    reason = "deadline"
+
+
+class Cancelled(Interrupted):
+    reason = "cancelled"
+
+
+class Deadline:
+    """
+    A point in time a run must finish by (none for `seconds=None`), and a
+    flag to cancel it earlier. Safe to share between threads.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at: Optional[float] = None
+        self._cancelled = threading.Event()
+        self.start(seconds)
+
+    def start(self, seconds: Optional[float]) -> None:
+        """(Re)start the clock: the run has `seconds` from now (no limit for None or 0)."""
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (0 once passed), or None without a time limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def check(self) -> None:
+        """Raise Cancelled or DeadlineExceeded if the run must stop."""
+        if self.cancelled:
+            raise Cancelled("The run was cancelled")
+        if self.expired:
+            raise DeadlineExceeded("The run's deadline has passed")
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep, but raise as soon as the run is cancelled or its deadline passes."""
+        self.check()
+        remaining = self.remaining()
+        self._cancelled.wait(seconds if remaining is None else min(seconds, remaining))
+        self.check()
+
+    def timeout(self, default: Optional[Timeout]) -> Optional[Timeout]:
+        """
+        `default` (seconds, or a (connect, read) pair) capped to the time
+        left; raises if there is none.
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if default is None:
+            return remaining
+        if isinstance(default, tuple):
+            return tuple(min(part, remaining) for part in default)
+        return min(default, remaining)
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("run_deadline", default=None)
+
+
+@contextmanager
+def scope(deadline: Deadline):
+    """Run the enclosed code (and what it propagates to) under `deadline`."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+
+def check() -> None:
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def sleep(seconds: float) -> None:
+    deadline = _current.get()
+    if deadline is None:
+        time.sleep(seconds)
+    else:
+        deadline.sleep(seconds)
+
+
+def timeout(default: Optional[Timeout]) -> Optional[Timeout]:
+    """`default` capped to the current run's remaining time (see Deadline.timeout)."""
+    deadline = _current.get()
+    return default if deadline is None else deadline.timeout(default)
+
+
+def propagate(fn: Callable) -> Callable:
+    """
+    `fn` bound to a copy of the current context, for running in another
+    thread (executor.submit(propagate(fn), ...)): the deadline, and any
+    other context-local state, follow it there.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return run
+
+
+def default_seconds() -> Optional[float]:
+    seconds = float(os.getenv("RUN_DEADLINE", "900"))
+    return seconds if seconds > 0 else None
+
+
+def run_deadline(seconds: Optional[float] = None) -> Deadline:
+    """A Deadline of `seconds`, or RUN_DEADLINE when not given, starting now."""
+    return Deadline(default_seconds() if seconds is None else seconds)
@@ -0,0 +1,473 @@
+# entities.py
+
+"""
+Entity resolution for the professors and labs the agents return.
+
+The same professor often comes back several times, in one listing or across
+runs: "Chaudhuri, Swarat", "Dr. Swarat Chaudhuri" and "S. Chaudhuri", with
+http:// and https://www. variants of their page, or with and without an email.
+Every duplicate would get its own deep research and cover letter. Entries are
+compared through keys:
+  - the canonical URL (lowercase host without "www.", no scheme, fragment,
+    tracking parameters, index page or trailing slash), unless it is a bare
+    host such as a university home page
+  - the email address, unless it is a generic one (info@, contact@, ...)
+  - for professors, the last name and first initial ("block:chaudhuri:s")
+  - for labs, the normalized name ("name:autonomous systems lab")
+
+Only entries sharing a key are compared (the keys are the blocking index),
+and professors sharing one are the same person only if their names agree:
+same last name, and first names that are equal, one an initial of the other,
+or missing. Labs sharing only a URL must share a distinctive word of their
+names. So a department directory URL listed for two professors, or
+"Sam Chaudhuri" next to "Swarat Chaudhuri", does not merge them. Entries with
+different emails, or with pages on different hosts, are never merged, and
+entries sharing only a name key must be at the same university (the domain
+of their URL or email): two Wei Wangs at UCLA and UT Dallas stay apart.
+
+Duplicates inside a listing are merged into the first entry (empty fields are
+filled in, differing research interests are joined), then each entry is
+resolved against the registry of entities seen in earlier runs, which gives
+it a canonical id ("professor:1f0c3a9e2b4d") and its first-seen name, and
+its first-seen URL when the entry's is only a variant of it (same canonical
+URL). Downstream tasks use those as cache keys, so deep research or a cover
+letter for a variant of a known professor is served from the checkpoints.
+
+Configured from the environment:
+  - ENTITY_RESOLUTION: "0" leaves listings as the agents returned them
+    (default: "1")
+  - ENTITY_REGISTRY: "0" resolves duplicates within each listing only, with
+    ids derived from the entry itself (default: "1")
+  - ENTITY_REGISTRY_PATH: the registry database (default: entities.sqlite3
+    in the data directory)
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from latest_ai_development import metrics
+from latest_ai_development.storage import connect, data_dir
+
+# ResearchInfo collection -> entity kind
+COLLECTIONS = {"professors": "professor", "labs": "lab"}
+
+_TITLES = {"prof", "professor", "dr", "phd", "mr", "mrs", "ms", "jr", "sr", "ii", "iii", "iv", "md"}
+_LAB_WORDS = {"the": "", "laboratory": "lab", "labs": "lab"}
+_TRACKING_PREFIXES = ("utm_", "mc_")
+_TRACKING_PARAMS = {"fbclid", "gclid", "ref"}
+_INDEX_PAGES = ("index.html", "index.htm", "index.php", "index.shtml", "default.aspx")
+_GENERIC_MAILBOXES = {"info", "contact", "admin", "office", "webmaster", "noreply", "no-reply", "help"}
+# Fields whose differing values are joined when duplicates in a listing merge
+_JOINED_FIELDS = ("research_interests", "focus")
+# Words that do not tell two labs apart
+_LAB_GENERIC = {"lab", "group", "research", "center", "centre", "institute", "of", "for", "and", "in", "on"}
+# Second-level labels under country domains: the university of "cs.ox.ac.uk" is "ox.ac.uk"
+_SECOND_LEVEL = {"ac", "edu", "co", "com", "org", "net", "gov"}
+
+
+def _ascii(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def name_tokens(name: Optional[str]) -> List[str]:
+    """
+    Lowercase ASCII words of a person's name in "first ... last" order,
+    without titles or parentheticals: "Chaudhuri, Swarat (PI)" -> ["swarat", "chaudhuri"].
+    """
+    text = re.sub(r"\(.*?\)", " ", _ascii(name or "").lower())
+    if text.count(",") == 1:
+        last, first = text.split(",")
+        first_words = re.findall(r"[a-z0-9]+", first)
+        # "Chaudhuri, Swarat", but not "Swarat Chaudhuri, PhD"
+        if first_words and not all(word in _TITLES for word in first_words):
+            text = f"{first} {last}"
+    return [word for word in re.findall(r"[a-z0-9]+", text) if word not in _TITLES]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    return " ".join(name_tokens(name))
+
+
+def normalize_lab_name(name: Optional[str]) -> str:
+    """ "The Autonomous Systems Laboratory (ASL)" -> "autonomous systems lab" """
+    text = re.sub(r"\(.*?\)", " ", _ascii(name or "").lower())
+    words = (_LAB_WORDS.get(word, word) for word in re.findall(r"[a-z0-9]+", text))
+    return " ".join(word for word in words if word)
+
+
+def canonical_url(url: Optional[str]) -> str:
+    """
+    `url` without what does not identify the page:
+    "HTTP://www.CS.utexas.edu/~swarat/index.html?utm_source=x#bio" -> "cs.utexas.edu/~swarat".
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        # "https://[lab page]": the entry is just not keyed by its URL
+        return ""
+    if host.startswith("www."):
+        host = host[len("www."):]
+    if not host:
+        return ""
+    path = re.sub(r"/{2,}", "/", parts.path)
+    for page in _INDEX_PAGES:
+        if path.lower().endswith("/" + page):
+            path = path[:-len(page)]
+    path = path.rstrip("/")
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PREFIXES) and key.lower() not in _TRACKING_PARAMS
+    )
+    query = urlencode(params)
+    return f"{host}{path}" + (f"?{query}" if query else "")
+
+
+def canonical_email(email: Optional[str]) -> str:
+    email = (email or "").strip().lower()
+    if email.startswith("mailto:"):
+        email = email[len("mailto:"):]
+    mailbox, at, domain = email.partition("@")
+    if not at or not mailbox or "." not in domain or mailbox in _GENERIC_MAILBOXES:
+        return ""
+    return email
+
+
+def url_host(url: Optional[str]) -> str:
+    """Host of the canonical URL: "https://www.cs.ucla.edu/~wei" -> "cs.ucla.edu"."""
+    return re.split(r"[/?]", canonical_url(url), 1)[0]
+
+
+def entity_domain(record: dict) -> str:
+    """
+    The university (or other organization) domain of a record, from its URL
+    or else its email: "cs.ucla.edu/~wei" and "wei@ucla.edu" -> "ucla.edu".
+    """
+    host = url_host(record.get("url")) or canonical_email(record.get("contact_email")).partition("@")[2]
+    labels = host.split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def entity_keys(kind: str, record: dict) -> Set[str]:
+    """Blocking keys of a professor or lab record (see the module docstring)."""
+    keys = set()
+    url = canonical_url(record.get("url"))
+    if "/" in url:
+        keys.add(f"url:{url}")
+    if kind == "lab":
+        name = normalize_lab_name(record.get("name"))
+        if name:
+            keys.add(f"name:{name}")
+        return keys
+    email = canonical_email(record.get("contact_email"))
+    if email:
+        keys.add(f"email:{email}")
+    tokens = name_tokens(record.get("name"))
+    if len(tokens) >= 2:
+        keys.add(f"block:{tokens[-1]}:{tokens[0][0]}")
+    return keys
+
+
+def names_compatible(a: Optional[str], b: Optional[str]) -> bool:
+    """
+    Whether two professor names can be the same person: the same words in any
+    order, or the same last name with equal, initial-matching or missing first names.
+    """
+    tokens_a, tokens_b = name_tokens(a), name_tokens(b)
+    if not tokens_a or not tokens_b:
+        return False
+    if sorted(tokens_a) == sorted(tokens_b):
+        return True
+    if tokens_a[-1] != tokens_b[-1]:
+        return False
+    first_a = tokens_a[0] if len(tokens_a) > 1 else ""
+    first_b = tokens_b[0] if len(tokens_b) > 1 else ""
+    if not first_a or not first_b or first_a == first_b:
+        return True
+    return (len(first_a) == 1 and first_b.startswith(first_a)) or (len(first_b) == 1 and first_a.startswith(first_b))
+
+
+def lab_names_compatible(a: Optional[str], b: Optional[str]) -> bool:
+    """Whether two lab names can be the same lab: one is missing, or they share a distinctive word."""
+    words_a = set(normalize_lab_name(a).split()) - _LAB_GENERIC
+    words_b = set(normalize_lab_name(b).split()) - _LAB_GENERIC
+    return not words_a or not words_b or bool(words_a & words_b)
+
+
+def conflicting(a: dict, b: dict) -> bool:
+    """Whether two records have different emails, or pages on different hosts."""
+    email_a, email_b = canonical_email(a.get("contact_email")), canonical_email(b.get("contact_email"))
+    if email_a and email_b and email_a != email_b:
+        return True
+    host_a, host_b = url_host(a.get("url")), url_host(b.get("url"))
+    return bool(host_a and host_b and host_a != host_b)
+
+
+def same_entity(kind: str, a: dict, b: dict, known_domain: bool = False) -> bool:
+    """
+    Whether records `a` and `b` are the same professor or lab (see the module
+    docstring). With `known_domain`, records sharing only a name key match
+    only if both domains are known; otherwise a missing domain does not
+    stop them (entries of one listing come from the same university).
+    """
+    shared = entity_keys(kind, a) & entity_keys(kind, b)
+    if not shared or conflicting(a, b):
+        return False
+    if all(key.startswith(("block:", "name:")) for key in shared):
+        domain_a, domain_b = entity_domain(a), entity_domain(b)
+        if (domain_a and domain_b and domain_a != domain_b) or (known_domain and not (domain_a and domain_b)):
+            return False
+    if kind == "lab":
+        # A shared research page alone does not make two differently named labs one
+        return any(key.startswith("name:") for key in shared) or lab_names_compatible(a.get("name"), b.get("name"))
+    return names_compatible(a.get("name"), b.get("name"))
+
+
+def entity_id(kind: str, record: dict) -> str:
+    """Id of an entity first seen as `record`: derived from its normalized name (or URL)."""
+    name = normalize_lab_name(record.get("name")) if kind == "lab" else normalize_name(record.get("name"))
+    basis = name or canonical_url(record.get("url"))
+    return f"{kind}:{hashlib.sha1(f'{kind}:{basis}'.encode('utf-8')).hexdigest()[:12]}"
+
+
+def merge_records(into: dict, other: dict, join: bool = True) -> dict:
+    """
+    `into` with the empty fields filled in from `other`, and (with `join`)
+    differing research interests / focus of `other` appended.
+    """
+    merged = dict(into)
+    for field, value in other.items():
+        if field == "id" or value in (None, ""):
+            continue
+        current = merged.get(field)
+        if current in (None, ""):
+            merged[field] = value
+        elif join and field in _JOINED_FIELDS and isinstance(value, str) and value.lower() not in str(current).lower():
+            merged[field] = f"{current}; {value}"
+    return merged
+
+
+class _Index:
+    """In-memory blocking index over the records of one listing."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.records: List[dict] = []
+        self._blocks: Dict[str, List[int]] = {}
+
+    def add(self, record: dict) -> bool:
+        """Add `record`, merging it into an earlier match. Returns whether it was a duplicate."""
+        keys = entity_keys(self.kind, record)
+        candidates = sorted({position for key in keys for position in self._blocks.get(key, ())})
+        position = next((p for p in candidates if same_entity(self.kind, record, self.records[p])), None)
+        duplicate = position is not None
+        if duplicate:
+            self.records[position] = merge_records(self.records[position], record)
+        else:
+            position = len(self.records)
+            self.records.append(dict(record))
+        for key in keys | entity_keys(self.kind, self.records[position]):
+            if position not in self._blocks.setdefault(key, []):
+                self._blocks[key].append(position)
+        return duplicate
+
+
+class EntityRegistry:
+    """
+    SQLite registry of the professors and labs seen so far, with their
+    blocking keys (the `entity_keys` table) and merged fields.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or data_dir() / "entities.sqlite3"
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entities (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    seen_count INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entity_keys (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    entity_id TEXT NOT NULL,
+                    PRIMARY KEY (kind, key, entity_id)
+                )
+                """
+            )
+
+    def _match(self, kind: str, record: dict, keys: Set[str]):
+        if not keys:
+            return None
+        placeholders = ", ".join("?" for _ in keys)
+        rows = self._conn.execute(
+            f"""
+            SELECT DISTINCT e.id, e.data, e.first_seen FROM entity_keys k JOIN entities e ON e.id = k.entity_id
+            WHERE k.kind = ? AND k.key IN ({placeholders}) ORDER BY e.first_seen
+            """,
+            (kind, *sorted(keys)),
+        ).fetchall()
+        for row_id, data, _ in rows:
+            data = json.loads(data)
+            # The registry spans universities: a shared name alone is not enough
+            if same_entity(kind, record, data, known_domain=True):
+                return row_id, data
+        return None
+
+    def lookup(self, kind: str, record: dict) -> Optional[dict]:
+        """The known entity `record` refers to (its fields and "id"), or None."""
+        with self._lock:
+            match = self._match(kind, record, entity_keys(kind, record))
+        return {**match[1], "id": match[0]} if match else None
+
+    def resolve(self, kind: str, record: dict) -> dict:
+        """
+        Register `record` (a new entity, or a sighting of a known one) and
+        return the entity: its first-seen name and URL, the other fields
+        filled in from every sighting, and its "id".
+        """
+        keys = entity_keys(kind, record)
+        now = time.time()
+        with self._lock, self._conn:
+            match = self._match(kind, record, keys)
+            if match is None:
+                found_id = new_id = entity_id(kind, record)
+                suffix = 1
+                # Another entity first seen under the same name (or URL)
+                while self._conn.execute("SELECT 1 FROM entities WHERE id = ?", (new_id,)).fetchone():
+                    suffix += 1
+                    new_id = f"{found_id}-{suffix}"
+                found_id = new_id
+                data = {field: value for field, value in record.items() if field != "id"}
+                self._conn.execute(
+                    "INSERT INTO entities (id, kind, data, first_seen, last_seen, seen_count) VALUES (?, ?, ?, ?, ?, 1)",
+                    (found_id, kind, json.dumps(data), now, now),
+                )
+            else:
+                found_id, known = match
+                data = merge_records(known, record, join=False)
+                self._conn.execute(
+                    "UPDATE entities SET data = ?, last_seen = ?, seen_count = seen_count + 1 WHERE id = ?",
+                    (json.dumps(data), now, found_id),
+                )
+                metrics.ENTITY_DUPLICATES.inc(kind=kind, source="registry")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entity_keys (kind, key, entity_id) VALUES (?, ?, ?)",
+                [(kind, key, found_id) for key in keys | entity_keys(kind, data)],
+            )
+        return {**data, "id": found_id}
+
+    def get(self, id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, data, first_seen, last_seen, seen_count FROM entities WHERE id = ?", (id,)
+            ).fetchone()
+        if row is None:
+            return None
+        kind, data, first_seen, last_seen, seen_count = row
+        return {**json.loads(data), "id": id, "kind": kind, "first_seen": first_seen,
+                "last_seen": last_seen, "seen_count": seen_count}
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, COUNT(*), SUM(seen_count) FROM entities GROUP BY kind").fetchall()
+        return {kind: {"entities": count, "sightings": sightings} for kind, count, sightings in rows}
+
+
+def resolve_research_info(research_info: dict, registry: Optional[EntityRegistry] = None) -> dict:
+    """
+    A ResearchInfo payload with duplicate professors and labs merged, and an
+    "id" on every entry; resolved against `registry` when given (see the
+    module docstring). Other keys and non-dict entries are kept as they are.
+    """
+    resolved = dict(research_info)
+    for collection, kind in COLLECTIONS.items():
+        entries = research_info.get(collection)
+        if not isinstance(entries, list):
+            continue
+        index = _Index(kind)
+        others = []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                others.append(entry)
+            elif index.add(entry):
+                metrics.ENTITY_DUPLICATES.inc(kind=kind, source="listing")
+
+        # Entries the registry knows as one entity, though they share no key
+        # with each other here, are merged too
+        merged: Dict[str, dict] = {}
+        for record in index.records:
+            if registry is not None:
+                entity = registry.resolve(kind, record)
+                record = {**merge_records(record, entity, join=False),
+                          "name": entity.get("name") or record.get("name"),
+                          "url": _known_url(record.get("url"), entity.get("url")),
+                          "id": entity["id"]}
+            else:
+                record = {**record, "id": record.get("id") or entity_id(kind, record)}
+            if record["id"] in merged:
+                merged[record["id"]] = merge_records(merged[record["id"]], record)
+            else:
+                merged[record["id"]] = record
+        resolved[collection] = list(merged.values()) + others
+    return resolved
+
+
+def _known_url(url: Optional[str], known: Optional[str]) -> Optional[str]:
+    """`known` (the registry's first-seen URL) if `url` is missing or a variant of it, else `url`."""
+    if not url or (known and canonical_url(url) == canonical_url(known)):
+        return known or url
+    return url
+
+
+def canonical_entity(kind: str, name: str, url: str, registry: Optional[EntityRegistry] = None) -> dict:
+    """
+    {"id", "name", "url"} of the entity `name`/`url` refers to: the
+    registry's first-seen name (and URL, if the given one is missing or a
+    variant of it) when it is known, else the given ones (with surrounding
+    whitespace removed). The registry is not written to.
+    """
+    record = {"name": (name or "").strip(), "url": (url or "").strip()}
+    known = registry.lookup(kind, record) if registry is not None else None
+    if known is None:
+        return {**record, "id": entity_id(kind, record)}
+    return {"id": known["id"], "name": known.get("name") or record["name"],
+            "url": _known_url(record["url"], known.get("url")) or ""}
+
+
+def create_entity_registry() -> Optional[EntityRegistry]:
+    """
+    Configured by ENTITY_RESOLUTION / ENTITY_REGISTRY ("1" by default, "0"
+    disables) and ENTITY_REGISTRY_PATH.
+    """
+    if not enabled() or os.getenv("ENTITY_REGISTRY", "1") == "0":
+        return None
+    return EntityRegistry(path=os.getenv("ENTITY_REGISTRY_PATH") or None)
+
+
+def enabled() -> bool:
+    return os.getenv("ENTITY_RESOLUTION", "1") != "0"
+
+
+entity_registry = create_entity_registry()
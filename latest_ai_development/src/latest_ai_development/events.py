@@ -0,0 +1,105 @@
+# events.py
+
+"""
+Progress events emitted while a crew or agent phase runs.
+
+Producers call `emit(type, **data)`; consumers either register a listener
+(called synchronously in the producer's thread) or iterate the stream, which
+blocks until new events arrive. Event types used by the pipeline:
+
+  task_started    {task, agent}
+  task_finished   {task, agent, duration, output_chars, tokens}
+  task_failed     {task, agent, error}
+  tool_call       {task, tool, input}
+  tool_result     {task, tool, result_chars}
+  partial_result  {task, key, payload}   parsed JSON of a finished task
+  job_finished / job_failed              emitted by jobs.Job
+"""
+import json
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+
+
+class EventStream:
+    """
+    Append-only, thread-safe event log that can be replayed and followed.
+    """
+
+    def __init__(self):
+        self._events: List[dict] = []
+        self._listeners: List[Callable[[dict], None]] = []
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def emit(self, type: str, **data) -> dict:
+        with self._cond:
+            event = {"seq": len(self._events) + 1, "type": type, "time": time.time(), **data}
+            self._events.append(event)
+            listeners = list(self._listeners)
+            self._cond.notify_all()
+        for listener in listeners:
+            listener(event)
+        return event
+
+    def bind(self, **fields) -> "BoundEmitter":
+        """
+        Emitter that adds `fields` (e.g. entity=<professor name>) to every event.
+        """
+        return BoundEmitter(self, fields)
+
+    def subscribe(self, listener: Callable[[dict], None]) -> None:
+        with self._cond:
+            self._listeners.append(listener)
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def events(self) -> List[dict]:
+        with self._cond:
+            return list(self._events)
+
+    def follow(self, after: int = 0, heartbeat: Optional[float] = None) -> Iterator[Optional[dict]]:
+        """
+        Yield events with seq > `after`, waiting for new ones until the stream
+        is closed. If `heartbeat` is set, yields None after that many idle seconds.
+        """
+        position = after
+        while True:
+            with self._cond:
+                while position >= len(self._events) and not self.closed:
+                    if not self._cond.wait(timeout=heartbeat):
+                        break
+                pending = self._events[position:]
+                finished = self.closed and not pending
+            if finished:
+                return
+            if not pending:
+                yield None
+                continue
+            for event in pending:
+                yield event
+            position += len(pending)
+
+
+class BoundEmitter:
+    def __init__(self, stream: EventStream, fields: dict):
+        self._stream = stream
+        self._fields = fields
+
+    def emit(self, type: str, **data) -> dict:
+        return self._stream.emit(type, **{**self._fields, **data})
+
+    def bind(self, **fields) -> "BoundEmitter":
+        return BoundEmitter(self._stream, {**self._fields, **fields})
+
+
+def format_sse(event: Optional[dict]) -> str:
+    """
+    Serialize an event for a text/event-stream response (None -> keep-alive comment).
+    """
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
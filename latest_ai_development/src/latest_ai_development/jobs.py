@@ -0,0 +1,287 @@
+# jobs.py
+
+"""
+Background job subsystem for crew runs.
+
+Web handlers submit work with `job_manager.submit(...)` and return the job id
+at once; the work is admitted and ordered by a Scheduler (global concurrency
+cap, bounded queue, per-user fair share and priorities by job kind, see
+scheduler.py) and clients poll the job for status, per-task progress and the
+final payloads, or follow `job.events`.
+
+Each job runs under its own deadline (RUN_DEADLINE, or the `deadline` given
+to submit; see deadlines.py), counted from when it starts. A job whose run
+was truncated by it still succeeds, with the partial result; one that had
+nothing to show for it fails. `cancel` withdraws a queued job, or stops a
+running one and frees its worker at once (within the scheduler's allowance
+of cancelled runs still unwinding, see scheduler.py).
+
+A job is the root span of its run's trace, with its queue wait (see tracing.py).
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from latest_ai_development import deadlines, metrics, tracing
+from latest_ai_development.deadlines import Cancelled, Deadline, Interrupted
+from latest_ai_development.events import EventStream
+from latest_ai_development.scheduler import BULK, HIGH, NORMAL, PREFETCH, PRIORITY_NAMES, QueueFull, Scheduler
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Job kind -> scheduling priority: cheap single-agent phases go first
+KIND_PRIORITIES = {
+    "cover_letter": HIGH,
+    "cover_letters": NORMAL,
+    "deeper_research": NORMAL,
+    "researcher": BULK,
+    "crew": BULK,
+    "fanout": BULK,
+    "prefetch": PREFETCH,
+}
+
+
+class Job:
+    """
+    One unit of background work (a crew kickoff or a single agent phase).
+    """
+
+    def __init__(self, kind: str, user_id: Optional[str] = None, priority: int = NORMAL,
+                 deadline_seconds: Optional[float] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.user_id = user_id
+        self.priority = priority
+        self.ticket = None
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress: List[dict] = []
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.deadline_seconds = deadline_seconds
+        # Starts counting when the job starts; cancellable before that too
+        self.deadline = Deadline()
+        self.events = EventStream()
+        self._lock = threading.Lock()
+        self.events.subscribe(self._record_progress)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    def _record_progress(self, event: dict) -> None:
+        """
+        Keep one progress entry per task (and fan-out entity) from its events.
+        """
+        status = {
+            "task_started": RUNNING,
+            "task_finished": "finished",
+            "task_failed": FAILED,
+            "task_interrupted": "interrupted",
+        }.get(event["type"])
+        if status is None:
+            return
+        task = event["task"]
+        if event.get("entity"):
+            task = f"{task}[{event['entity']}]"
+        with self._lock:
+            for entry in self.progress:
+                if entry["task"] == task:
+                    entry["status"] = status
+                    entry["updated_at"] = event["time"]
+                    return
+            self.progress.append({"task": task, "status": status, "updated_at": event["time"]})
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "priority": PRIORITY_NAMES.get(self.priority, str(self.priority)),
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "deadline_seconds": self.deadline_seconds,
+                "progress": [dict(entry) for entry in self.progress],
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobManager:
+    """
+    Runs jobs through a Scheduler with `max_workers` workers and keeps
+    finished jobs around for `retention_seconds` so clients can fetch their
+    results.
+    """
+
+    def __init__(self, max_workers: int = 4, retention_seconds: float = 3600, scheduler: Optional[Scheduler] = None):
+        self.retention_seconds = retention_seconds
+        self.max_workers = max_workers
+        self.scheduler = scheduler or Scheduler("crew-job", max_concurrency=max_workers)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable, *args, user_id: Optional[str] = None, priority: Optional[int] = None,
+               deadline: Optional[float] = None, **kwargs) -> Job:
+        """
+        Schedule `fn(job, *args, **kwargs)`; its return value becomes job.result.
+        `priority` defaults to KIND_PRIORITIES[kind], and `deadline` (seconds
+        the job may run) to RUN_DEADLINE. Raises QueueFull (with
+        `retry_after`) when the scheduler cannot admit the job.
+        """
+        job = Job(
+            kind, user_id=user_id, priority=KIND_PRIORITIES.get(kind, NORMAL) if priority is None else priority,
+            deadline_seconds=deadlines.default_seconds() if deadline is None else deadline,
+        )
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        try:
+            job.ticket = self.scheduler.submit(
+                lambda: self._run(job, fn, args, kwargs),
+                user=user_id, priority=job.priority, on_cancel=lambda: self._cancelled(job),
+            )
+        except QueueFull:
+            with self._lock:
+                del self._jobs[job.id]
+            raise
+        return job
+
+    def finished(self, kind: str, result: dict, user_id: Optional[str] = None) -> Job:
+        """
+        A job that already succeeded with `result`, without running anything
+        (e.g. a result served from the artifact store); tracked like any other.
+        """
+        job = Job(kind, user_id=user_id, priority=KIND_PRIORITIES.get(kind, NORMAL))
+        job.started_at = job.finished_at = job.created_at
+        job.result, job.status = result, SUCCEEDED
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.events.emit("job_finished", job=job.id, truncated=False, stored=True)
+        job.events.close()
+        return job
+
+    def cancel(self, job_id: str, running: bool = True) -> bool:
+        """
+        Cancel a job: withdraw it if it is queued, otherwise (unless
+        `running` is False) interrupt it at its next deadline check and give
+        its worker back to the scheduler right away if its allowance of
+        unwinding runs permits (Scheduler.release). Returns False if the
+        job is unknown or already done, or running and `running` is False.
+        """
+        job = self.get(job_id)
+        if job is None or job.ticket is None:
+            return False
+        if self.scheduler.cancel(job.ticket):
+            return True
+        if not running or job.done:
+            return False
+        job.deadline.cancel()
+        self.scheduler.release(job.ticket)
+        return self._cancelled(job)
+
+    def _cancelled(self, job: Job) -> bool:
+        with job._lock:
+            if job.done:
+                return False
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        job.events.emit("job_cancelled", job=job.id)
+        job.events.close()
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, user_id: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if user_id is not None:
+            jobs = [job for job in jobs if job.user_id == user_id]
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def _run(self, job: Job, fn: Callable, args, kwargs) -> None:
+        with job._lock:
+            if job.done:
+                # Cancelled between leaving the queue and starting
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+        metrics.JOB_WAIT.observe(job.started_at - job.created_at, kind=job.kind)
+        job.deadline.start(job.deadline_seconds)
+        result, error, status = None, None, SUCCEEDED
+        try:
+            with deadlines.scope(job.deadline), \
+                    tracing.span("job", "job", job=job.id, kind=job.kind, wait=job.started_at - job.created_at):
+                result = fn(job, *args, **kwargs)
+        except Interrupted as e:
+            error, status = str(e), CANCELLED if isinstance(e, Cancelled) else FAILED
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            error, status = str(e), FAILED
+        finished_at = time.time()
+        metrics.JOB_DURATION.observe(finished_at - job.started_at, kind=job.kind, status=status)
+        with job._lock:
+            if job.done:
+                # Cancelled while running: the caller has moved on
+                return
+            job.result, job.error, job.status, job.finished_at = result, error, status, finished_at
+        if status == SUCCEEDED:
+            truncated = isinstance(result, dict) and result.get("status") == "truncated"
+            job.events.emit("job_finished", job=job.id, truncated=truncated)
+        elif status == CANCELLED:
+            job.events.emit("job_cancelled", job=job.id)
+        else:
+            job.events.emit("job_failed", job=job.id, error=error)
+        job.events.close()
+
+    def stats(self) -> dict:
+        """Number of tracked jobs by status."""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)}
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+def create_job_manager() -> JobManager:
+    """
+    JobManager configured from the environment:
+      - JOB_WORKERS: crew executions running at once (default: 4)
+      - JOB_QUEUE_SIZE: jobs allowed to wait before new ones get 429 (default: 32)
+      - JOB_QUEUE_PER_USER: waiting jobs allowed per user (default: 3)
+      - JOB_BACKGROUND_SLOTS: workers prefetch jobs may use (default: 1)
+    """
+    max_workers = int(os.getenv("JOB_WORKERS", "4"))
+    return JobManager(max_workers=max_workers, scheduler=Scheduler(
+        "crew-job",
+        max_concurrency=max_workers,
+        max_queue=int(os.getenv("JOB_QUEUE_SIZE", "32")),
+        max_queued_per_user=int(os.getenv("JOB_QUEUE_PER_USER", "3")),
+        background_slots=int(os.getenv("JOB_BACKGROUND_SLOTS", "1")),
+    ))
+
+
+job_manager = create_job_manager()
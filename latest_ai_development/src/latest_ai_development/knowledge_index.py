@@ -0,0 +1,371 @@
+# knowledge_index.py
+
+"""
+Local retrieval index over the project's knowledge/ files and the search
+results already fetched by the crew, so agents (deeper_researcher) can answer
+from what is on disk before going to the web.
+
+Documents are split into passages and stored in one SQLite file:
+  - BM25 postings (term -> passage, term frequency), always
+  - dense vectors (hashed bag of words and bigrams, L2-normalized, float32),
+    only when NumPy is installed; scores are then a blend of both
+
+Updates are incremental: `sync()` re-indexes knowledge/ files whose content
+changed, drops files that were removed, adds search cache entries written
+since the last sync and drops those the cache has evicted or expired. Other
+sources (e.g. fetched pages) can be fed with `add_document`; `sync()` keeps
+only the `max_pages` most recently indexed pages.
+
+Configured from the environment:
+  - KNOWLEDGE_DIR: directory of text files to index (default: knowledge)
+  - KNOWLEDGE_INDEX_PATH: SQLite file (default: <LAD_DATA_DIR>/knowledge.sqlite3)
+  - KNOWLEDGE_DENSE: "0" disables the dense vectors even if NumPy is installed
+  - KNOWLEDGE_MAX_PAGES: fetched pages kept in the index (default: 500)
+
+    python -m latest_ai_development.knowledge_index [--rebuild] [--query "robotics publications"]
+"""
+import argparse
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from latest_ai_development.storage import connect, data_dir
+
+try:
+    import numpy as np
+except ImportError:  # dense retrieval is optional
+    np = None
+
+TEXT_SUFFIXES = {".txt", ".md", ".markdown", ".json", ".csv", ".html", ".htm", ".rst"}
+CHUNK_CHARS = 1000
+DENSE_DIM = 512
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_PASSAGE_BREAK = re.compile(r"\n\s*\n|\n-{3,}\s*\n")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the their this to was were which with"
+    .split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def chunk_text(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """Split on blank lines / '---' separators and pack the pieces into passages."""
+    chunks, current = [], ""
+    for piece in _PASSAGE_BREAK.split(text):
+        piece = piece.strip()
+        if not piece:
+            continue
+        while len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            cut = piece.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(piece[:cut].strip())
+            piece = piece[cut:].strip()
+        if current and len(current) + len(piece) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def embed(tokens: List[str]):
+    """Hashed bag of words and bigrams, L2-normalized (NumPy only)."""
+    vector = np.zeros(DENSE_DIM, dtype=np.float32)
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        digest = zlib.crc32(feature.encode("utf-8"))
+        vector[digest % DENSE_DIM] += 1.0 if digest & 0x80000000 else -1.0
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class KnowledgeIndex:
+    """
+    On-disk BM25 (plus optional dense) index of passages, grouped by document.
+    A document is identified by `doc_id` (e.g. "file:user_preference.txt",
+    "search:<cache key>") and re-indexed only when its fingerprint changes.
+    """
+
+    def __init__(self, path=None, knowledge_dir=None, dense: Optional[bool] = None, max_pages: int = 500):
+        self.path = path or data_dir() / "knowledge.sqlite3"
+        self.knowledge_dir = Path(knowledge_dir or "knowledge")
+        self.max_pages = max_pages
+        self.dense = np is not None if dense is None else dense and np is not None
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        # Dense matrix of all passages, reloaded after writes
+        self._matrix = None
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    indexed_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY,
+                    doc_id TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    length INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS chunks_doc ON chunks (doc_id);
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    chunk_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, chunk_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS postings_chunk ON postings (chunk_id);
+                CREATE TABLE IF NOT EXISTS vectors (
+                    chunk_id INTEGER PRIMARY KEY,
+                    vector BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                """
+            )
+
+    # -- writes --------------------------------------------------------------
+
+    def add_document(self, doc_id: str, text: str, source: str, title: str = "",
+                     fingerprint: Optional[str] = None) -> bool:
+        """
+        Index `text` under `doc_id`, replacing its previous passages.
+        Returns False (and does nothing) when the fingerprint is unchanged.
+        """
+        fingerprint = fingerprint or hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT fingerprint FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+            if row is not None and row[0] == fingerprint:
+                return False
+            self._delete(doc_id)
+            self._conn.execute(
+                "INSERT INTO documents (doc_id, source, title, fingerprint, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (doc_id, source, title or doc_id, fingerprint, time.time()),
+            )
+            for passage in chunk_text(text):
+                tokens = tokenize(passage)
+                if not tokens:
+                    continue
+                chunk_id = self._conn.execute(
+                    "INSERT INTO chunks (doc_id, text, length) VALUES (?, ?, ?)", (doc_id, passage, len(tokens))
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)",
+                    [(term, chunk_id, tf) for term, tf in Counter(tokens).items()],
+                )
+                if self.dense:
+                    self._conn.execute(
+                        "INSERT INTO vectors (chunk_id, vector) VALUES (?, ?)",
+                        (chunk_id, embed(tokens).tobytes()),
+                    )
+            self._matrix = None
+        return True
+
+    def remove_document(self, doc_id: str) -> None:
+        with self._lock, self._conn:
+            self._delete(doc_id)
+            self._matrix = None
+
+    def _delete(self, doc_id: str) -> None:
+        chunk_ids = "SELECT id FROM chunks WHERE doc_id = ?"
+        self._conn.execute(f"DELETE FROM postings WHERE chunk_id IN ({chunk_ids})", (doc_id,))
+        self._conn.execute(f"DELETE FROM vectors WHERE chunk_id IN ({chunk_ids})", (doc_id,))
+        self._conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+
+    def sync(self, search_cache=None) -> dict:
+        """
+        Bring the index up to date with knowledge/ and, if given, the search
+        cache (tools/cached_search_tool.SearchCache), and drop the pages past
+        `max_pages`, least recently indexed first. Returns counts of
+        documents added/updated, unchanged and removed.
+        """
+        counts = {"indexed": 0, "unchanged": 0, "removed": 0}
+        seen = set()
+        if self.knowledge_dir.is_dir():
+            for path in sorted(self.knowledge_dir.rglob("*")):
+                if not path.is_file() or path.suffix.lower() not in TEXT_SUFFIXES:
+                    continue
+                doc_id = f"file:{path.relative_to(self.knowledge_dir).as_posix()}"
+                seen.add(doc_id)
+                text = path.read_text(encoding="utf-8", errors="replace")
+                counts["indexed" if self.add_document(doc_id, text, "knowledge", path.name) else "unchanged"] += 1
+        with self._lock:
+            stale = [
+                doc_id for (doc_id,) in self._conn.execute("SELECT doc_id FROM documents WHERE source = 'knowledge'")
+                if doc_id not in seen
+            ]
+
+        if search_cache is not None:
+            watermark = float(self._meta("search_watermark") or 0)
+            for key, query, value, created_at in search_cache.entries_since(watermark):
+                if isinstance(value, str) and self.add_document(f"search:{key}", value, "search", query):
+                    counts["indexed"] += 1
+                watermark = max(watermark, created_at)
+            self._set_meta("search_watermark", repr(watermark))
+            # Results the cache no longer has (evicted or expired) leave the index too
+            live = search_cache.keys()
+            with self._lock:
+                stale += [
+                    doc_id for (doc_id,) in self._conn.execute("SELECT doc_id FROM documents WHERE source = 'search'")
+                    if doc_id[len("search:"):] not in live
+                ]
+        with self._lock:
+            stale += [doc_id for (doc_id,) in self._conn.execute(
+                "SELECT doc_id FROM documents WHERE source = 'page' ORDER BY indexed_at DESC LIMIT -1 OFFSET ?",
+                (self.max_pages,),
+            )]
+        for doc_id in stale:
+            self.remove_document(doc_id)
+            counts["removed"] += 1
+        return counts
+
+    def rebuild(self, search_cache=None) -> dict:
+        with self._lock, self._conn:
+            for table in ("postings", "vectors", "chunks", "documents", "meta"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._matrix = None
+        return self.sync(search_cache)
+
+    def _meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # -- reads ---------------------------------------------------------------
+
+    def search(self, query: str, k: int = 5, dense_weight: float = 0.5) -> List[dict]:
+        """
+        The `k` best passages for `query`:
+        [{"doc_id", "source", "title", "text", "score"}], best first.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            total, avg_length = self._conn.execute("SELECT COUNT(*), AVG(length) FROM chunks").fetchone()
+            if not total:
+                return []
+            rows = self._conn.execute(
+                f"""
+                SELECT p.term, p.chunk_id, p.tf, c.length FROM postings p JOIN chunks c ON c.id = p.chunk_id
+                WHERE p.term IN ({",".join("?" * len(terms))})
+                """,
+                terms,
+            ).fetchall()
+
+            document_frequency = Counter(term for term, _, _, _ in rows)
+            scores = {}
+            for term, chunk_id, tf, length in rows:
+                df = document_frequency[term]
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                norm = tf + K1 * (1 - B + B * length / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (K1 + 1) / norm
+
+            if self.dense and dense_weight:
+                scores = self._blend(scores, terms, dense_weight, k)
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            results = []
+            for chunk_id, score in best:
+                row = self._conn.execute(
+                    """
+                    SELECT c.doc_id, d.source, d.title, c.text FROM chunks c JOIN documents d ON d.doc_id = c.doc_id
+                    WHERE c.id = ?
+                    """,
+                    (chunk_id,),
+                ).fetchone()
+                if row is not None:
+                    doc_id, source, title, text = row
+                    results.append({"doc_id": doc_id, "source": source, "title": title, "text": text,
+                                    "score": round(score, 4)})
+        return results
+
+    def _blend(self, scores: dict, terms: List[str], dense_weight: float, k: int) -> dict:
+        # BM25 scaled to [0, 1] plus weighted cosine similarity; the dense side
+        # can bring in passages that share no exact term with the query
+        if self._matrix is None:
+            rows = self._conn.execute("SELECT chunk_id, vector FROM vectors ORDER BY chunk_id").fetchall()
+            ids = np.array([chunk_id for chunk_id, _ in rows], dtype=np.int64)
+            vectors = np.frombuffer(b"".join(vector for _, vector in rows), dtype=np.float32)
+            self._matrix = (ids, vectors.reshape(len(rows), DENSE_DIM))
+        ids, matrix = self._matrix
+        if not len(ids):
+            return scores
+        similarity = matrix @ embed(terms)
+        top_bm25 = max(scores.values(), default=0.0) or 1.0
+        blended = {chunk_id: score / top_bm25 for chunk_id, score in scores.items()}
+        for index in np.argsort(-similarity)[: k * 4]:
+            if similarity[index] <= 0:
+                break
+            chunk_id = int(ids[index])
+            blended[chunk_id] = blended.get(chunk_id, 0.0) + dense_weight * float(similarity[index])
+        return blended
+
+    def stats(self) -> dict:
+        with self._lock:
+            (documents,) = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+            (chunks,) = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()
+            (terms,) = self._conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()
+        return {"documents": documents, "chunks": chunks, "terms": terms, "dense": self.dense}
+
+
+def create_knowledge_index() -> KnowledgeIndex:
+    return KnowledgeIndex(
+        path=os.getenv("KNOWLEDGE_INDEX_PATH") or None,
+        knowledge_dir=os.getenv("KNOWLEDGE_DIR") or None,
+        dense=False if os.getenv("KNOWLEDGE_DENSE", "1") == "0" else None,
+        max_pages=int(os.getenv("KNOWLEDGE_MAX_PAGES", "500")),
+    )
+
+
+def _format(results: Iterable[dict]) -> str:
+    return "\n\n".join(f"[{r['score']}] {r['title']} ({r['doc_id']})\n{r['text']}" for r in results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="drop the index and re-ingest everything")
+    parser.add_argument("--query", help="print the best passages for this query after syncing")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from latest_ai_development.tools.cached_search_tool import SearchCache
+
+    index = create_knowledge_index()
+    cache = SearchCache(path=os.getenv("SEARCH_CACHE_PATH") or None,
+                        ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL", "86400")))
+    counts = index.rebuild(cache) if args.rebuild else index.sync(cache)
+    print(f"{counts['indexed']} indexed, {counts['unchanged']} unchanged, {counts['removed']} removed; {index.stats()}")
+    if args.query:
+        print(_format(index.search(args.query, k=args.k)) or "No matching passages.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# llm.py
+
+"""
+The LLMs the crew's agents run on.
+
+Same model selection as crewai's default (OPENAI_MODEL_NAME or MODEL, and
+OPENAI_API_BASE / OPENAI_BASE_URL), but every request first takes a token
+from the process-wide LLM rate limit (LLM_RPM, see ratelimit.py).
+
+Agents with an `llm_routing` block in config/agents.yaml get a RoutedLLM:
+
+    llm_routing:
+      primary: gpt-4o          # default: the model above
+      fallback: gpt-4o-mini    # faster/cheaper model to downgrade to
+      max_tokens: 1500         # output tokens per call
+      timeout: 60              # per-call deadline, in seconds
+      slow_after: 20           # a primary call slower than this downgrades
+      cooldown: 120            # how long a downgrade lasts, in seconds
+
+A primary call that is rate-limited (429), times out, or cannot reach the
+provider is retried once on the fallback, and later calls of that agent go
+straight to the fallback until the cooldown has passed; so do calls after a
+primary answer slower than `slow_after` (the provider's time, not the wait
+for the rate limit). Every routing decision is counted in
+lad_llm_routes_total and passed to the listener installed with
+`route_listener` (the pipeline records them per task and run).
+LLM_ROUTING=0 ignores the routing blocks.
+
+Calls made under a run deadline (see deadlines.py) check it first, wait for
+the rate limit no longer than it allows, and get at most the time left as
+their request timeout; a timeout caused by the deadline does not downgrade
+the agent.
+
+Every request is traced as an "llm" span (see tracing.py) with its model,
+prompt and completion sizes and rate-limit wait, never their text.
+"""
+import copy
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+import litellm
+from crewai import LLM
+
+from latest_ai_development import deadlines, metrics, tracing
+from latest_ai_development.ratelimit import llm_limiter
+
+# Provider errors after which the fallback model is used, by reason
+_FAILURES = (
+    ("rate_limited", litellm.RateLimitError),
+    ("timeout", litellm.Timeout),
+    ("unavailable", (litellm.ServiceUnavailableError, litellm.InternalServerError)),
+    ("connection", litellm.APIConnectionError),
+)
+
+_listener: ContextVar[Optional[Callable[[dict], None]]] = ContextVar("llm_route_listener", default=None)
+
+
+@contextmanager
+def route_listener(listener: Callable[[dict], None]):
+    """Send the routing decisions of LLM calls made in this context to `listener`."""
+    token = _listener.set(listener)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+class RateLimitedLLM(LLM):
+    def call(self, messages: List[Dict[str, str]], callbacks: List[Any] = []) -> str:
+        return self._traced_call(messages, callbacks, {})
+
+    def _traced_call(self, messages, callbacks, timing: dict) -> str:
+        """
+        The call, traced; `timing["latency"]` gets how long the provider took
+        (from when the rate-limit token was acquired), whether it answered or failed.
+        """
+        # Sizes only: prompts carry the student's resume
+        with tracing.span("llm_call", "llm", model=self.model, messages=len(messages),
+                          prompt_chars=sum(len(str(message.get("content") or "")) for message in messages)) as span:
+            result = self._call(messages, callbacks, span, timing)
+            span.set(completion_chars=len(result or ""))
+            return result
+
+    def _call(self, messages, callbacks, span, timing: dict) -> str:
+        started = time.perf_counter()
+        deadline = deadlines.current()
+        llm = self
+        if deadline is not None:
+            deadline.check()
+        llm_limiter.acquire()
+        acquired = time.perf_counter()
+        span.set(rate_limit_wait=acquired - started)
+        if deadline is not None:
+            # A copy, so concurrent calls through the same LLM keep their own timeout;
+            # no client-side retries, they would restart the clock past the deadline
+            llm = copy.copy(self)
+            llm.timeout = deadline.timeout(self.timeout)
+            llm.kwargs = {**self.kwargs, "max_retries": 0}
+        try:
+            return LLM.call(llm, messages, callbacks)
+        except Exception:
+            if deadline is not None:
+                # A request cut short by the deadline stops the run, not just the call
+                deadline.check()
+            raise
+        finally:
+            timing["latency"] = time.perf_counter() - acquired
+
+
+class _Health:
+    """Downgrade state of a routed agent, shared by the copies of its LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.until = 0.0
+        self.reason = None
+
+    def degraded(self) -> Optional[str]:
+        with self._lock:
+            return self.reason if time.monotonic() < self.until else None
+
+    def degrade(self, reason: str, seconds: float) -> None:
+        with self._lock:
+            self.until = time.monotonic() + seconds
+            self.reason = reason
+
+
+class RoutedLLM(RateLimitedLLM):
+    """
+    RateLimitedLLM on a primary model, downgrading to `fallback` when the
+    primary is rate-limited, failing or slow (see the module docstring).
+    """
+
+    def __init__(self, model: str, fallback: Optional[str] = None, agent: str = "", slow_after: Optional[float] = None,
+                 cooldown: float = 120.0, **kwargs):
+        if fallback:
+            # Fail over at once instead of letting the client retry the primary
+            kwargs.setdefault("max_retries", 0)
+        super().__init__(model=model, **kwargs)
+        self.fallback = fallback
+        self.agent = agent
+        self.slow_after = slow_after
+        self.cooldown = cooldown
+        self.health = _Health()
+
+    def call(self, messages: List[Dict[str, str]], callbacks: List[Any] = []) -> str:
+        if not self.fallback:
+            return self._timed(self, "primary", None, messages, callbacks)
+        reason = self.health.degraded()
+        if reason is not None:
+            return self._timed(self._fallback_llm(), "downgraded", reason, messages, callbacks)
+
+        # Provider time only: waiting for the rate limit is not the primary being slow
+        timing = {}
+        try:
+            result = self._traced_call(messages, callbacks, timing)
+        except Exception as e:
+            reason = next((name for name, types in _FAILURES if isinstance(e, types)), None)
+            if reason is None:
+                raise
+            # Out of time for the whole run, not a slow provider
+            deadlines.check()
+            self._record(self.model, "failed", reason, timing.get("latency", 0.0))
+            self.health.degrade(reason, self.cooldown)
+            return self._timed(self._fallback_llm(), "fallback", reason, messages, callbacks)
+        latency = timing["latency"]
+        self._record(self.model, "primary", None, latency)
+        if self.slow_after and latency > self.slow_after:
+            self.health.degrade("slow", self.cooldown)
+        return result
+
+    def _fallback_llm(self) -> LLM:
+        # Same settings (including the stop words crewai sets on the agent's
+        # LLM), another model, and the client's own retries
+        fallback = copy.copy(self)
+        fallback.model = self.fallback
+        fallback.kwargs = {key: value for key, value in self.kwargs.items() if key != "max_retries"}
+        return fallback
+
+    def _timed(self, llm: LLM, route: str, reason: Optional[str], messages, callbacks) -> str:
+        timing = {}
+        result = RateLimitedLLM._traced_call(llm, messages, callbacks, timing)
+        self._record(llm.model, route, reason, timing["latency"])
+        return result
+
+    def _record(self, model: str, route: str, reason: Optional[str], latency: float) -> None:
+        metrics.LLM_ROUTES.inc(agent=self.agent, model=model, route=route)
+        listener = _listener.get()
+        if listener is not None:
+            listener({"agent": self.agent, "model": model, "route": route, "reason": reason,
+                      "latency": round(latency, 3)})
+
+
+def _default_model() -> str:
+    return os.getenv("OPENAI_MODEL_NAME") or os.getenv("MODEL") or "gpt-4o-mini"
+
+
+def _base_url() -> Optional[str]:
+    return os.getenv("OPENAI_API_BASE") or os.getenv("OPENAI_BASE_URL")
+
+
+def default_llm() -> RateLimitedLLM:
+    return RateLimitedLLM(model=_default_model(), base_url=_base_url())
+
+
+def agent_llm(agent: str, agent_config: dict) -> RateLimitedLLM:
+    """The LLM for `agent`, routed per its `llm_routing` config block if it has one."""
+    routing = agent_config.get("llm_routing")
+    if not routing or os.getenv("LLM_ROUTING", "1") == "0":
+        return default_llm()
+    return RoutedLLM(
+        model=routing.get("primary") or _default_model(),
+        fallback=routing.get("fallback"),
+        agent=agent,
+        slow_after=routing.get("slow_after"),
+        cooldown=float(routing.get("cooldown", 120)),
+        max_tokens=routing.get("max_tokens"),
+        timeout=routing.get("timeout"),
+        base_url=_base_url(),
+    )
@@ -2,8 +2,6 @@
 import sys
 import warnings
 
-from latest_ai_development.crew import LatestAiDevelopment
-
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 
@@ -23,9 +21,72 @@ def run():
         'resume': resume,
     }
     
-    # Kick off your AI dev crew with these inputs
-    LatestAiDevelopment().crew().kickoff(inputs=inputs)
+    from latest_ai_development import deadlines
+    from latest_ai_development.pipeline import run_crew
+
+    # Kick off your AI dev crew with these inputs; unchanged tasks are reused from checkpoints
+    with deadlines.scope(deadlines.run_deadline()):
+        result = run_crew(inputs)
+    _print_result(result)
+
+
+def _print_result(result):
+    print(result["raw_result"])
+    if result["status"] == "truncated":
+        print(f"Stopped early ({result['interrupted']}); run again to resume from the completed tasks")
+    else:
+        print(f"Run id: {result['run_id']}")
+
+
+def replay():
+    """
+    Replay the crew execution from a specific task.
+    Usage: replay <task_id> [run_id]  (defaults to the most recent run)
+    """
+    from latest_ai_development import deadlines
+    from latest_ai_development.checkpoints import checkpoint_store
+    from latest_ai_development.pipeline import run_crew
+
+    try:
+        if checkpoint_store is None:
+            raise ValueError("checkpoints are disabled (CHECKPOINTS=0)")
+        if len(sys.argv) < 2:
+            raise ValueError("usage: replay <task_id> [run_id]")
+        task_id = sys.argv[1]
+        run = checkpoint_store.get_run(sys.argv[2] if len(sys.argv) > 2 else None)
+        if run is None:
+            raise ValueError("no recorded run to replay")
+
+        with deadlines.scope(deadlines.run_deadline()):
+            result = run_crew(run["inputs"], replay_from=task_id)
+        _print_result(result)
+    except Exception as e:
+        raise Exception(f"An error occurred while replaying the crew: {e}")
+
+
+def batch():
+    """
+    Run the crew for every student of a JSONL file, concurrently.
+    Usage: batch <input.jsonl> <output.jsonl> [--workers N] [--llm-rpm N] [--search-rpm N]
+    """
+    from latest_ai_development.batch import main as run_batch
+
+    run_batch(sys.argv[1:])
+
+
+def test():
+    """
+    Run the offline benchmark suite (fake LLM and search endpoint, no API keys needed).
+    Usage: test [--iterations N] [--json results.json] [--compare baseline.json] ...
+    """
+    # The suite configures the environment before the crew modules are loaded,
+    # which is why run() and replay() import them lazily too
+    from latest_ai_development.bench.suite import main as run_suite
 
+    try:
+        run_suite(sys.argv[1:])
+    except Exception as e:
+        raise Exception(f"An error occurred while testing the crew: {e}")
 
 
 if __name__ == '__main__':
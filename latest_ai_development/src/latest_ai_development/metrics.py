@@ -0,0 +1,277 @@
+# metrics.py
+
+"""
+In-process metrics for the crew and the web app, rendered in the Prometheus
+text exposition format (served by webapp.py at /metrics).
+
+Recorded on the hot paths:
+  - task and agent latency (lad_task_duration_seconds{task, agent})
+  - tasks by outcome, including checkpoint hits (lad_tasks_total{task, status})
+  - LLM prompt/completion/cached tokens and requests per agent, and model
+    routing decisions (primary, fallback, downgraded)
+  - tool calls, and search calls / latency by cache outcome
+  - searches and agent tasks collapsed into identical in-flight ones
+  - JSON parse failures of task outputs
+  - trace spans exported and dropped (see tracing.py)
+  - web requests answered from the artifact store (see artifacts.py)
+  - HTTP request latency per endpoint, background job queue wait and run time
+Gauges such as the session-store and artifact-store sizes are computed when /metrics is scraped.
+
+No dependency on prometheus_client: counters, gauges and histograms here are
+small thread-safe dicts keyed by label values.
+"""
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds: agents run for seconds to minutes, searches for milliseconds to seconds
+TASK_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+SEARCH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        ...
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(v)}" for key, v in values.items()]
+
+
+class Gauge(_Metric):
+    """
+    Either set explicitly, or computed at render time by `set_function`,
+    whose callable returns a number or a {label values tuple: number} dict.
+    """
+    type = "gauge"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[tuple, float] = {}
+        self._function: Optional[Callable] = None
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable) -> None:
+        self._function = function
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                values = self._function()
+            except Exception:
+                values = {}
+            if not isinstance(values, dict):
+                values = {(): values}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(v)}" for key, v in values.items()]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=TASK_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: list(entry) for key, entry in self._values.items()}
+        lines = []
+        for key, entry in values.items():
+            for bound, count in zip(self.buckets, entry):
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(entry[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {entry[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=TASK_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+TASK_DURATION = REGISTRY.histogram(
+    "lad_task_duration_seconds", "Duration of executed crew tasks.", ("task", "agent"))
+TASKS = REGISTRY.counter(
+    "lad_tasks_total", "Crew tasks by outcome (succeeded, failed, interrupted, cached, coalesced).", ("task", "status"))
+LLM_TOKENS = REGISTRY.counter(
+    "lad_llm_tokens_total", "LLM tokens by agent and type (prompt, completion, cached_prompt).", ("agent", "type"))
+LLM_REQUESTS = REGISTRY.counter(
+    "lad_llm_requests_total", "Successful LLM requests by agent.", ("agent",))
+LLM_ROUTES = REGISTRY.counter(
+    "lad_llm_routes_total",
+    "Routed LLM calls by agent, model and route (primary, failed, fallback, downgraded).",
+    ("agent", "model", "route"))
+TOOL_CALLS = REGISTRY.counter(
+    "lad_tool_calls_total", "Tool calls made by agents.", ("tool",))
+SEARCH_CALLS = REGISTRY.counter(
+    "lad_search_calls_total", "Search tool calls by cache outcome (hit, miss, coalesced, error).", ("cache",))
+SEARCH_DURATION = REGISTRY.histogram(
+    "lad_search_duration_seconds", "Search tool latency by cache outcome.", ("cache",), SEARCH_BUCKETS)
+BATCH_SEARCH_RESULTS = REGISTRY.counter(
+    "lad_batch_search_results_total",
+    "Results of multi-query searches, kept or dropped as a duplicate of another query's result.", ("outcome",))
+SEARCH_RETRIES = REGISTRY.counter(
+    "lad_search_retries_total", "Search API requests retried, by reason (HTTP status or network error).", ("reason",))
+SINGLEFLIGHT_CALLS = REGISTRY.counter(
+    "lad_singleflight_calls_total",
+    "Coalescable calls by group (search, task) and outcome (executed, or collapsed into an in-flight call).",
+    ("group", "outcome"))
+SINGLEFLIGHT_IN_FLIGHT = REGISTRY.gauge(
+    "lad_singleflight_in_flight", "Coalescable executions currently in flight, by group.", ("group",))
+JSON_PARSE_FAILURES = REGISTRY.counter(
+    "lad_json_parse_failures_total", "Task outputs that did not fully parse and validate.", ("task",))
+PAGE_FETCHES = REGISTRY.counter(
+    "lad_page_fetches_total", "Page fetches by cache outcome (hit, revalidated, miss, stale, error).", ("cache",))
+PAGE_FETCH_DURATION = REGISTRY.histogram(
+    "lad_page_fetch_duration_seconds", "Page fetch latency by cache outcome.", ("cache",), SEARCH_BUCKETS)
+PAGE_BYTES = REGISTRY.counter(
+    "lad_page_bytes_downloaded_total", "Page body bytes downloaded (excluding revalidations).")
+KNOWLEDGE_QUERIES = REGISTRY.counter(
+    "lad_knowledge_queries_total", "Local knowledge lookups by outcome (hit, empty).", ("outcome",))
+HTTP_DURATION = REGISTRY.histogram(
+    "lad_http_request_duration_seconds", "Web app request latency.", ("method", "endpoint", "status"), HTTP_BUCKETS)
+SESSION_STORE_SESSIONS = REGISTRY.gauge(
+    "lad_session_store_sessions", "Sessions held by the session store.")
+SESSION_STORE_BYTES = REGISTRY.gauge(
+    "lad_session_store_bytes", "Encoded size of the sessions held by the session store.")
+ARTIFACT_STORE_RUNS = REGISTRY.gauge(
+    "lad_artifact_store_runs", "Runs held by the artifact store.")
+ARTIFACT_STORE_BYTES = REGISTRY.gauge(
+    "lad_artifact_store_bytes", "Size of the artifact files of the runs held by the artifact store.")
+STORED_RUNS_SERVED = REGISTRY.counter(
+    "lad_stored_runs_served_total", "Web requests answered with a stored run instead of running the agents.",
+    ("kind",))
+JOBS = REGISTRY.gauge(
+    "lad_jobs", "Background jobs currently tracked, by status.", ("status",))
+SCHEDULER_QUEUE = REGISTRY.gauge(
+    "lad_scheduler_queued", "Jobs waiting for a worker, by priority.", ("priority",))
+SCHEDULER_REJECTIONS = REGISTRY.counter(
+    "lad_scheduler_rejections_total", "Jobs refused with 429, by reason (queue_full, user_limit).", ("reason",))
+PREFETCHES = REGISTRY.counter(
+    "lad_prefetches_total",
+    "Speculative deep research by outcome (started, served, joined, cancelled, skipped).", ("outcome",))
+RATE_LIMIT_WAIT = REGISTRY.counter(
+    "lad_rate_limit_wait_seconds_total", "Time spent waiting on the LLM and search rate limits.", ("limiter",))
+ENTITY_DUPLICATES = REGISTRY.counter(
+    "lad_entity_duplicates_total",
+    "Professor/lab entries merged into an earlier one, by kind and where it was seen (listing, registry).",
+    ("kind", "source"))
+TRACE_SPANS = REGISTRY.counter(
+    "lad_trace_spans_total", "Trace spans written to the trace file, or dropped (buffer full, write failed).",
+    ("outcome",))
+JOB_WAIT = REGISTRY.histogram(
+    "lad_job_wait_seconds", "Time background jobs spent queued for a worker.", ("kind",), HTTP_BUCKETS + (10, 30, 60))
+JOB_DURATION = REGISTRY.histogram(
+    "lad_job_duration_seconds", "Run time of background jobs.", ("kind", "status"))
+
+
+def record_task(task: str, agent: str, duration: float, tokens: dict) -> None:
+    """
+    Record one executed task: its latency and the LLM usage of its agent
+    (`agent` is its config name, `tokens` a UsageMetrics delta as produced by
+    the pipeline).
+    """
+    TASKS.inc(task=task, status="succeeded")
+    TASK_DURATION.observe(duration, task=task, agent=agent)
+    for usage_key, token_type in (
+        ("prompt_tokens", "prompt"),
+        ("completion_tokens", "completion"),
+        ("cached_prompt_tokens", "cached_prompt"),
+    ):
+        if tokens.get(usage_key):
+            LLM_TOKENS.inc(tokens[usage_key], agent=agent, type=token_type)
+    if tokens.get("successful_requests"):
+        LLM_REQUESTS.inc(tokens["successful_requests"], agent=agent)
+
+
+def render() -> str:
+    return REGISTRY.render()
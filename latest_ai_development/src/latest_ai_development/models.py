@@ -0,0 +1,102 @@
+# models.py
+
+"""
+Pydantic models of the crew's task outputs and of the results built from them.
+
+Kept free of crewai imports, so the web apps and tools can validate payloads
+without loading the agent stack; crew.py re-exports them.
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+# Existing Pydantic models for the main listing
+class Professor(BaseModel):
+    name: str
+    research_interests: str
+    contact_email: str
+    url: str
+
+class Lab(BaseModel):
+    name: str
+    focus: str
+    url: str
+
+class ResearchInfo(BaseModel):
+    professors: List[Professor]
+    labs: List[Lab]
+
+# --- NEW MODELS BELOW ---
+
+class Publication(BaseModel):
+    title: str
+    summary: str
+
+class Project(BaseModel):
+    name: str
+    description: str
+
+class SpecificProfessorInfo(BaseModel):
+    """
+    For deeper professor/lab research.
+    """
+    publications: List[Publication]
+    projects: List[Project]
+    courses: List[str]
+
+class CoverLetterOutput(BaseModel):
+    """
+    For email subject/body + cover letter.
+    """
+    email_subject: str
+    email_body: str
+    cover_letter: str
+
+class CandidateProfile(BaseModel):
+    """
+    Compact profile of the student, extracted once from the resume and
+    shared by all of their cover letters.
+    """
+    name: str
+    education: List[str]
+    research_interests: List[str]
+    skills: List[str]
+    experience: List[str]
+    publications: List[str]
+    summary: str
+
+class CoverLetterResult(BaseModel):
+    """
+    The cover letter for one professor or lab of a batch.
+    `letter` is None and `error` is set when that entry failed.
+    """
+    name: str
+    url: str
+    letter: Optional[CoverLetterOutput] = None
+    error: Optional[str] = None
+
+class CoverLetterBatch(BaseModel):
+    """
+    Cover letters for several professors/labs, written from one candidate profile.
+    """
+    candidate_profile: Optional[CandidateProfile] = None
+    results: List[CoverLetterResult]
+
+class EntityResearch(BaseModel):
+    """
+    Deeper research on one professor or lab from a fan-out run.
+    `info` is None and `error` is set when that entity failed.
+    """
+    kind: str  # "professor" or "lab"
+    name: str
+    url: str
+    info: Optional[SpecificProfessorInfo] = None
+    error: Optional[str] = None
+
+class FanOutResearchInfo(BaseModel):
+    """
+    A ResearchInfo listing merged with the deeper research of each entry.
+    """
+    research_info: ResearchInfo
+    results: List[EntityResearch]
@@ -0,0 +1,251 @@
+# output_parser.py
+
+"""
+Tolerant parsing of agent output into the crew's Pydantic models.
+
+Agents do not always answer with bare JSON: they wrap it in Markdown fences,
+add prose around it, leave trailing commas, use typographic quotes, or get
+cut off mid-array when they hit the token limit. Throwing such answers away
+(or paying for another LLM call to reformat them) wastes the whole task, so
+`parse_output` instead:
+
+  1. extracts the JSON value from the text (fenced block or first {...} / [...])
+  2. repairs it: trailing commas, smart quotes, and truncation (the incomplete
+     last element is dropped and open brackets are closed)
+  3. validates it against the model; when that fails, keeps every field and
+     list item that is valid on its own and reports the others as
+     field-level errors
+
+TolerantConverter plugs the same logic into crewai's output conversion, so a
+task only falls back to the LLM-based converter when nothing can be salvaged.
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple, Type, get_args, get_origin
+
+from crewai.utilities.converter import Converter
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+_FENCE = re.compile(r"```[ \t]*(?:json|JSON|javascript|js)?[ \t]*\n?(.*?)(?:```|\Z)", re.DOTALL)
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'"})
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class ParsedOutput:
+    """
+    Result of parse_output:
+      - data: the validated payload, or the valid part of it
+      - value: the model instance when the whole payload validated, else None
+      - errors: [{"loc": "professors.2.url", "msg": "..."}] for what was dropped
+      - repairs: what had to be fixed to read the JSON (e.g. "fenced", "truncated")
+    """
+
+    def __init__(self, data: dict, value: Optional[BaseModel] = None, errors: Optional[List[dict]] = None,
+                 repairs: Optional[List[str]] = None):
+        self.data = data
+        self.value = value
+        self.errors = errors or []
+        self.repairs = repairs or []
+
+    @property
+    def valid(self) -> bool:
+        return self.value is not None
+
+    def to_dict(self) -> dict:
+        return {"data": self.data, "valid": self.valid, "errors": self.errors, "repairs": self.repairs}
+
+
+def _strip_trailing(out: List[str], repairs: List[str]) -> None:
+    # Drop whitespace and a dangling comma before a closing bracket
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+        if "trailing_comma" not in repairs:
+            repairs.append("trailing_comma")
+        while out and out[-1].isspace():
+            out.pop()
+
+
+def repair_json(text: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Cut the first JSON object/array out of `text` and repair it.
+    Returns (json text, repairs), or (None, repairs) if there is no JSON value.
+    """
+    repairs = []
+    translated = text.translate(_SMART_QUOTES)
+    if translated != text:
+        repairs.append("smart_quotes")
+    starts = [index for index in (translated.find("{"), translated.find("[")) if index != -1]
+    if not starts:
+        return None, repairs
+    start = min(starts)
+    if translated[:start].strip():
+        repairs.append("prose")
+
+    out: List[str] = []
+    # Open brackets: [bracket, length of `out` after its last complete value, expecting "key"/"value"]
+    frames: List[list] = []
+    in_string = escaped = False
+    end = None
+    for index in range(start, len(translated)):
+        char = translated[index]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                if frames[-1][0] == "[" or frames[-1][2] == "value":
+                    frames[-1][1] = len(out)
+            elif char == "\n":
+                out[-1] = "\\n"
+            continue
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in "{[":
+            out.append(char)
+            frames.append([char, len(out), "key"])
+        elif char in "}]":
+            _strip_trailing(out, repairs)
+            out.append(_CLOSERS[frames.pop()[0]])
+            if not frames:
+                end = index
+                break
+            if frames[-1][0] == "[" or frames[-1][2] == "value":
+                frames[-1][1] = len(out)
+        elif char == ":":
+            out.append(char)
+            frames[-1][2] = "value"
+        elif char == ",":
+            frames[-1][1] = len(out)
+            out.append(char)
+            frames[-1][2] = "key"
+        else:
+            out.append(char)
+
+    if end is None:
+        # Truncated: keep what the innermost bracket had completed, then close everything
+        repairs.append("truncated")
+        del out[frames[-1][1]:]
+        while frames:
+            _strip_trailing(out, repairs)
+            out.append(_CLOSERS[frames.pop()[0]])
+    elif translated[end + 1:].strip() and "prose" not in repairs:
+        repairs.append("prose")
+    return "".join(out), repairs
+
+
+def extract_json(text: str) -> Tuple[Any, List[str]]:
+    """
+    The JSON value in an agent's answer, and the repairs it needed.
+    Returns (None, repairs) if nothing could be read.
+    """
+    if not isinstance(text, str):
+        return None, []
+    stripped = text.strip()
+    try:
+        return json.loads(stripped), []
+    except json.JSONDecodeError:
+        pass
+
+    candidates = [(match.group(1), ["fenced"]) for match in _FENCE.finditer(stripped)]
+    candidates.append((stripped, []))
+    for candidate, repairs in candidates:
+        repaired, more = repair_json(candidate)
+        if repaired is None:
+            continue
+        try:
+            return json.loads(repaired, strict=False), repairs + more
+        except json.JSONDecodeError:
+            continue
+    return None, []
+
+
+def _unwrap(data: Any, model: Type[BaseModel]) -> Any:
+    # {"ResearchInfo": {...}} or {"result": {...}} around the expected object
+    fields = set(model.model_fields)
+    if isinstance(data, dict) and len(data) == 1 and not fields & set(data):
+        inner = next(iter(data.values()))
+        if isinstance(inner, dict) and fields & set(inner):
+            return inner
+    return data
+
+
+def _errors(error: ValidationError, prefix: str) -> List[dict]:
+    return [
+        {"loc": ".".join([prefix] + [str(part) for part in detail["loc"]]), "msg": detail["msg"]}
+        for detail in error.errors()
+    ]
+
+
+def _salvage(data: dict, model: Type[BaseModel]) -> Tuple[dict, List[dict]]:
+    """Validate field by field (and list item by list item), keeping what is valid."""
+    partial, errors = {}, []
+    for name, field in model.model_fields.items():
+        if name not in data:
+            if field.is_required():
+                errors.append({"loc": name, "msg": "Field required"})
+            continue
+        value = data[name]
+        if get_origin(field.annotation) in (list, List) and isinstance(value, list):
+            adapter = TypeAdapter(get_args(field.annotation)[0])
+            items = []
+            for index, item in enumerate(value):
+                try:
+                    items.append(adapter.dump_python(adapter.validate_python(item), mode="json"))
+                except ValidationError as e:
+                    errors.extend(_errors(e, f"{name}.{index}"))
+            partial[name] = items
+        else:
+            adapter = TypeAdapter(field.annotation)
+            try:
+                partial[name] = adapter.dump_python(adapter.validate_python(value), mode="json")
+            except ValidationError as e:
+                errors.extend(_errors(e, name))
+    return partial, errors
+
+
+def parse_output(text: str, model: Type[BaseModel]) -> ParsedOutput:
+    """
+    Extract, repair and validate `text` against `model`; never raises.
+    """
+    data, repairs = extract_json(text)
+    return validate_payload(data, model, repairs)
+
+
+def validate_payload(data: Any, model: Type[BaseModel], repairs: Optional[List[str]] = None) -> ParsedOutput:
+    """
+    Validate already-decoded JSON against `model`, salvaging the valid part.
+    """
+    data = _unwrap(data, model)
+    if not isinstance(data, dict):
+        return ParsedOutput({}, errors=[{"loc": "", "msg": "No JSON object found in the output"}], repairs=repairs)
+    try:
+        value = model.model_validate(data)
+    except ValidationError:
+        partial, errors = _salvage(data, model)
+        return ParsedOutput(partial, errors=errors, repairs=repairs)
+    return ParsedOutput(value.model_dump(mode="json"), value=value, repairs=repairs)
+
+
+class TolerantConverter(Converter):
+    """
+    crewai output converter (Task.converter_cls) that repairs the agent's
+    answer locally and only asks the LLM to reformat it when that fails.
+    """
+
+    def to_pydantic(self, current_attempt=1):
+        parsed = parse_output(self.text, self.model)
+        if parsed.valid:
+            return parsed.value
+        return super().to_pydantic(current_attempt)
+
+    def to_json(self, current_attempt=1):
+        parsed = parse_output(self.text, self.model)
+        if parsed.valid:
+            return parsed.data
+        return super().to_json(current_attempt)
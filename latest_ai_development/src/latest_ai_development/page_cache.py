@@ -0,0 +1,369 @@
+# page_cache.py
+
+"""
+Fetching of professor and lab pages through an on-disk, content-addressed
+page cache, so deeper research does not download and re-read the same
+faculty pages on every run.
+
+  - Page bodies are stored zlib-compressed under the sha256 of their content;
+    URLs point at a content hash, so identical pages are stored once.
+  - HTML is converted to text once per content hash and stored next to the
+    body; agents get that trimmed text instead of raw HTML. A page's previous
+    content is deleted when it changes, unless another URL still has it.
+  - Entries younger than the TTL are served without any request. Older ones
+    are revalidated with a conditional GET (If-None-Match / If-Modified-Since);
+    a 304 only refreshes the entry.
+  - Requests are polite: at most FETCH_DOMAIN_CONCURRENCY at once per domain,
+    started at least FETCH_DOMAIN_INTERVAL seconds apart, and concurrent
+    fetches of the same URL share one request.
+
+Configured from the environment:
+  - PAGE_CACHE_PATH: SQLite file (default: <LAD_DATA_DIR>/page_cache.sqlite3)
+  - PAGE_CACHE_TTL: seconds before an entry is revalidated (default: one day)
+  - FETCH_DOMAIN_INTERVAL (1.0), FETCH_DOMAIN_CONCURRENCY (2)
+  - FETCH_TIMEOUT: read timeout in seconds (10); FETCH_MAX_BYTES: body size cap (2000000)
+"""
+import codecs
+import hashlib
+import os
+import re
+import threading
+import time
+import zlib
+from html.parser import HTMLParser
+from typing import Dict, Optional, Tuple
+from urllib.parse import urldefrag, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from latest_ai_development import deadlines, metrics
+from latest_ai_development.singleflight import SingleFlight
+from latest_ai_development.storage import connect, data_dir
+
+USER_AGENT = "latest-ai-development/0.1 (research assistant; polite fetcher)"
+TEXT_TYPES = ("text/", "application/xhtml", "application/xml", "application/json")
+
+_SKIP_TAGS = {"script", "style", "noscript", "svg", "template", "iframe", "nav", "footer", "form", "button"}
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "aside", "br", "li", "ul", "ol", "table", "tr",
+    "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote", "dd", "dt", "hr",
+}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.title = ""
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> Tuple[str, str]:
+    """(title, readable text) of an HTML document; scripts, styles and navigation are dropped."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    text = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+    return " ".join(parser.title.split()), text
+
+
+def _charset(content_type: str) -> str:
+    """The charset of a Content-Type header, or utf-8 if it has none Python knows."""
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type or "")
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def _extract(body: bytes, content_type: str) -> Tuple[str, str]:
+    decoded = body.decode(_charset(content_type), errors="replace")
+    if "html" in (content_type or "") or decoded.lstrip()[:1] == "<":
+        return html_to_text(decoded)
+    return "", decoded.strip()
+
+
+def normalize_url(url: str) -> str:
+    return urldefrag((url or "").strip())[0]
+
+
+class PageCache:
+    """
+    SQLite store of fetched pages: `pages` maps a URL to a content hash and
+    its validators, `contents` holds each distinct body (compressed) with its
+    extracted text.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or data_dir() / "page_cache.sqlite3"
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_type TEXT,
+                    fetched_at REAL NOT NULL,
+                    validated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS contents (
+                    hash TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    text BLOB NOT NULL,
+                    title TEXT NOT NULL,
+                    size INTEGER NOT NULL
+                );
+                """
+            )
+
+    def lookup(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT p.content_hash, p.etag, p.last_modified, p.validated_at, c.title, c.text
+                FROM pages p JOIN contents c ON c.hash = p.content_hash WHERE p.url = ?
+                """,
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        content_hash, etag, last_modified, validated_at, title, text = row
+        return {
+            "url": url, "content_hash": content_hash, "etag": etag, "last_modified": last_modified,
+            "validated_at": validated_at, "title": title, "text": zlib.decompress(text).decode("utf-8"),
+        }
+
+    def store(self, url: str, body: bytes, headers) -> dict:
+        """
+        Point `url` at `body`, extracting its text unless that content is
+        already stored, and drop the content it pointed at before if no
+        other URL does. Returns the entry as `lookup` would.
+        """
+        content_hash = hashlib.sha256(body).hexdigest()
+        content_type = headers.get("Content-Type", "")
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT title, text FROM contents WHERE hash = ?", (content_hash,)).fetchone()
+        if row is None:
+            title, text = _extract(body, content_type)
+            compressed = zlib.compress(text.encode("utf-8"))
+        else:
+            title, compressed = row
+            text = zlib.decompress(compressed).decode("utf-8")
+        with self._lock, self._conn:
+            previous = self._conn.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO contents (hash, body, text, title, size) VALUES (?, ?, ?, ?, ?)",
+                    (content_hash, zlib.compress(body), compressed, title, len(body)),
+                )
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO pages
+                    (url, content_hash, etag, last_modified, content_type, fetched_at, validated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, content_hash, headers.get("ETag"), headers.get("Last-Modified"), content_type, now, now),
+            )
+            if previous is not None and previous[0] != content_hash:
+                self._conn.execute(
+                    "DELETE FROM contents WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM pages WHERE content_hash = ?)",
+                    (previous[0], previous[0]),
+                )
+        return {
+            "url": url, "content_hash": content_hash, "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"), "validated_at": now, "title": title, "text": text,
+        }
+
+    def touch(self, url: str, headers) -> None:
+        """Record a successful revalidation (304), keeping any new validators."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE pages SET validated_at = ?, etag = COALESCE(?, etag),
+                    last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+                """,
+                (time.time(), headers.get("ETag"), headers.get("Last-Modified"), url),
+            )
+
+    def prune(self) -> int:
+        """
+        Delete contents no URL points at any more (left over from before
+        `store` dropped replaced contents itself); returns how many.
+        """
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM contents WHERE hash NOT IN (SELECT content_hash FROM pages)"
+            ).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            (pages,) = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+            contents, size, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(body) + LENGTH(text)), 0) FROM contents"
+            ).fetchone()
+        return {"pages": pages, "contents": contents, "body_bytes": size, "stored_bytes": stored}
+
+
+class DomainThrottle:
+    """
+    Per-domain politeness: at most `max_concurrency` requests in flight per
+    domain, and request starts spaced at least `min_interval` seconds apart.
+    """
+
+    def __init__(self, min_interval: float = 1.0, max_concurrency: int = 2):
+        self.min_interval = min_interval
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    def acquire(self, domain: str) -> None:
+        with self._lock:
+            slots = self._slots.setdefault(domain, threading.BoundedSemaphore(self.max_concurrency))
+        slots.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(domain, 0.0))
+            self._next_start[domain] = start + self.min_interval
+        if start > now:
+            try:
+                deadlines.sleep(start - now)
+            except deadlines.Interrupted:
+                slots.release()
+                raise
+
+    def release(self, domain: str) -> None:
+        self._slots[domain].release()
+
+
+# Concurrent fetches of the same URL share one request
+page_flights = SingleFlight("page")
+
+
+class PageFetcher:
+    """
+    Fetches pages through a PageCache. `fetch` does not raise on failures
+    (they come back as {"url", "error", "cache": "error"}), only when the
+    current run is interrupted.
+    """
+
+    def __init__(self, cache: PageCache, throttle: Optional[DomainThrottle] = None, ttl_seconds: float = 86400,
+                 connect_timeout: float = 3.05, read_timeout: float = 10, max_bytes: int = 2_000_000):
+        self.cache = cache
+        self.throttle = throttle or DomainThrottle()
+        self.ttl_seconds = ttl_seconds
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_bytes = max_bytes
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.throttle.max_concurrency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers["User-Agent"] = USER_AGENT
+
+    def fetch(self, url: str) -> dict:
+        """
+        The page at `url` as {"url", "title", "text", "content_hash", "cache"},
+        cache being "hit" (no request), "revalidated" (304), "miss", or
+        "stale" (the cached copy, served because the site failed). Downloads
+        get at most the current run's remaining time (deadlines.py).
+        """
+        url = normalize_url(url)
+        started = time.perf_counter()
+        if urlsplit(url).scheme not in ("http", "https"):
+            return self._record({"url": url, "error": "Only http(s) URLs can be fetched", "cache": "error"}, started)
+        entry = self.cache.lookup(url)
+        if entry is not None and time.time() - entry["validated_at"] < self.ttl_seconds:
+            return self._record(dict(entry, cache="hit"), started)
+        try:
+            page, _ = page_flights.do(url, lambda: self._download(url, entry))
+        except requests.RequestException as e:
+            # An unreachable site still gets its last known content
+            page = dict(entry, cache="stale") if entry is not None else {
+                "url": url, "error": f"{type(e).__name__}: {e}", "cache": "error"}
+        return self._record(page, started)
+
+    def _download(self, url: str, entry: Optional[dict]) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        domain = urlsplit(url).netloc.lower()
+        self.throttle.acquire(domain)
+        try:
+            timeout = deadlines.timeout(self.timeout)
+            with self._session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+                if response.status_code == 304 and entry is not None:
+                    self.cache.touch(url, response.headers)
+                    return dict(entry, cache="revalidated")
+                if response.status_code >= 500 and entry is not None:
+                    return dict(entry, cache="stale")
+                if response.status_code != 200:
+                    return {"url": url, "error": f"HTTP {response.status_code}", "cache": "error"}
+                content_type = response.headers.get("Content-Type", "")
+                if content_type and not content_type.startswith(TEXT_TYPES):
+                    return {"url": url, "error": f"Not a text page ({content_type})", "cache": "error"}
+                body = bytearray()
+                for block in response.iter_content(65536):
+                    body += block
+                    if len(body) >= self.max_bytes:
+                        del body[self.max_bytes:]
+                        break
+                headers = response.headers
+        finally:
+            self.throttle.release(domain)
+        metrics.PAGE_BYTES.inc(len(body))
+        return dict(self.cache.store(url, bytes(body), headers), cache="miss")
+
+    @staticmethod
+    def _record(page: dict, started: float) -> dict:
+        metrics.PAGE_FETCHES.inc(cache=page["cache"])
+        metrics.PAGE_FETCH_DURATION.observe(time.perf_counter() - started, cache=page["cache"])
+        return page
+
+
+def create_page_fetcher() -> PageFetcher:
+    return PageFetcher(
+        PageCache(path=os.getenv("PAGE_CACHE_PATH") or None),
+        DomainThrottle(
+            min_interval=float(os.getenv("FETCH_DOMAIN_INTERVAL", "1.0")),
+            max_concurrency=int(os.getenv("FETCH_DOMAIN_CONCURRENCY", "2")),
+        ),
+        ttl_seconds=float(os.getenv("PAGE_CACHE_TTL", "86400")),
+        read_timeout=float(os.getenv("FETCH_TIMEOUT", "10")),
+        max_bytes=int(os.getenv("FETCH_MAX_BYTES", "2000000")),
+    )
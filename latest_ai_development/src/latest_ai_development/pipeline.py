@@ -0,0 +1,640 @@
+# pipeline.py
+
+"""
+Entry points that run the crew, or a single phase of it, for one request.
+Shared by the web apps, the CLI and background jobs.
+
+Every function returns a plain dict:
+  - "raw_result": the raw text of the last executed task
+  - "research_info" / "specific_info" / "cover_letter" / "candidate_profile":
+    parsed JSON payloads (matching ResearchInfo / SpecificProfessorInfo /
+    CoverLetterOutput / CandidateProfile)
+  - "parse_errors": for payloads that only partly validated, the field-level
+    errors of what was dropped (see output_parser.py)
+
+Professors and labs of "research_info" are deduplicated and carry the "id"
+of their entity in the registry; deep research and cover letters run on the
+canonical name and URL of their entity, so variants share one checkpoint
+(see entities.py).
+
+Runs honor the deadline (and cancellation) of the run they are part of (see
+deadlines.py): a single phase raises deadlines.Interrupted, while run_crew,
+run_fanout and run_cover_letters return what completed with "status":
+"truncated" (and "interrupted": "deadline" or "cancelled") instead of
+"complete", e.g. a ResearchInfo without the deep research.
+
+Pass `events` (an events.EventStream, or a bound emitter) to receive
+task, tool-call and partial-result events while the run is in progress.
+Task latency, token usage and tool calls are always recorded in `metrics`,
+and the model routing decisions of each task (see llm.py) in its timings.
+Each entry point is traced as a "run" span, each task in it as a "task" span
+(see tracing.py).
+
+The results of run_crew and of the single phases are saved as runs of the
+artifact store (see artifacts.py), under the "run_id" they carry.
+"""
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+from pydantic import ValidationError
+
+from latest_ai_development import deadlines, entities, metrics, tracing
+from latest_ai_development.artifacts import artifact_store
+from latest_ai_development.checkpoints import checkpoint_store, task_key
+from latest_ai_development.crew_factory import crew_factory
+from latest_ai_development.deadlines import Interrupted
+from latest_ai_development.entities import canonical_entity, entity_registry, resolve_research_info
+from latest_ai_development.llm import route_listener
+from latest_ai_development.models import (
+    CandidateProfile,
+    CoverLetterBatch,
+    CoverLetterOutput,
+    CoverLetterResult,
+    EntityResearch,
+    FanOutResearchInfo,
+    Lab,
+    Professor,
+    ResearchInfo,
+    SpecificProfessorInfo,
+)
+from latest_ai_development.output_parser import ParsedOutput, parse_output, validate_payload
+from latest_ai_development.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Identical tasks (same checkpoint key) running concurrently share one execution
+task_flights = SingleFlight("task")
+
+# Crew task name -> key of its payload in the result dict
+TASK_RESULT_KEYS = {
+    "research_task": "research_info",
+    "professor_research_task": "specific_info",
+    "candidate_profile_task": "candidate_profile",
+    "cover_letter_task": "cover_letter",
+}
+
+# Crew task name -> model its output is validated against
+TASK_MODELS = {
+    "research_task": ResearchInfo,
+    "professor_research_task": SpecificProfessorInfo,
+    "candidate_profile_task": CandidateProfile,
+    "cover_letter_task": CoverLetterOutput,
+}
+
+
+def _parse_json(raw) -> dict:
+    try:
+        parsed = json.loads(raw)
+    except (TypeError, json.JSONDecodeError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _parse(task_output) -> ParsedOutput:
+    """
+    The task's JSON payload: crewai's converted output when it has one,
+    otherwise extracted and repaired from the raw answer.
+    """
+    model = TASK_MODELS.get(task_output.name)
+    if model is None:
+        return ParsedOutput(task_output.json_dict or _parse_json(task_output.raw))
+    if task_output.json_dict:
+        return validate_payload(task_output.json_dict, model)
+    return parse_output(task_output.raw, model)
+
+
+def _payload(task_output) -> dict:
+    return _parse(task_output).data
+
+
+def _resolved(key: str, data: dict, register: bool = True) -> dict:
+    """`data` with its entities resolved, for a research_info payload (see entities.py)."""
+    if key != "research_info" or not entities.enabled():
+        return data
+    return resolve_research_info(data, entity_registry if register else None)
+
+
+def _canonical(kind: str, name: str, url: str) -> dict:
+    if not entities.enabled():
+        return {"id": None, "name": name, "url": url}
+    return canonical_entity(kind, name, url, entity_registry)
+
+
+def _phase_result(task_output) -> dict:
+    parsed = _parse(task_output)
+    key = TASK_RESULT_KEYS[task_output.name]
+    result = {"raw_result": task_output.raw, key: _resolved(key, parsed.data)}
+    if parsed.errors:
+        result["parse_errors"] = {key: parsed.errors}
+    return result
+
+
+def _completion(interrupted: Optional[Interrupted]) -> dict:
+    """The "status" (and "interrupted" reason) of a run that may have been cut short."""
+    if interrupted is None:
+        return {"status": "complete"}
+    return {"status": "truncated", "interrupted": interrupted.reason}
+
+
+def _stored(kind: str, inputs: dict, result: dict, run_id: Optional[str] = None) -> dict:
+    """`result`, saved in the artifact store as a `kind` run on `inputs`, with its "run_id"."""
+    if artifact_store is not None:
+        result["run_id"] = artifact_store.save(kind, inputs, result, run_id=run_id)
+    return result
+
+
+def _token_usage(agent) -> dict:
+    token_process = getattr(agent, "_token_process", None)
+    if token_process is None:
+        return {}
+    return token_process.get_summary().model_dump()
+
+
+class _Reporter:
+    """
+    Turns crewai callbacks into events on `events` (no-op when it is None)
+    and metrics, and keeps a per-task timing breakdown of the run.
+    """
+
+    def __init__(self, events=None):
+        self.events = events
+        self.timings = []
+        self.task = None
+        self._started_at = None
+        self._tokens_before = {}
+        self._routes = []
+
+    def emit(self, type: str, **data) -> None:
+        if self.events is not None:
+            self.events.emit(type, **data)
+
+    def task_started(self, task, agent) -> None:
+        self.task = task.name
+        self._started_at = time.perf_counter()
+        self._tokens_before = _token_usage(agent)
+        self._routes = []
+        self.emit("task_started", task=task.name, agent=agent.role)
+
+    def task_finished(self, task, agent, output) -> None:
+        tokens_after = _token_usage(agent)
+        tokens = {
+            key: value - self._tokens_before.get(key, 0)
+            for key, value in tokens_after.items()
+        }
+        duration = time.perf_counter() - self._started_at
+        metrics.record_task(task.name, crew_factory.agent_name(task.name) or agent.role, duration, tokens)
+        self.timings.append({"task": task.name, "agent": agent.role, "duration": duration,
+                             "tokens": tokens, "cached": False, "routing": self._routes})
+        tracing.annotate(outcome="executed", tokens=tokens, output_chars=len(output.raw or ""))
+        self.emit(
+            "task_finished",
+            task=task.name,
+            agent=agent.role,
+            duration=duration,
+            output_chars=len(output.raw or ""),
+            tokens=tokens,
+        )
+        parsed = _parse(output)
+        if parsed.errors:
+            metrics.JSON_PARSE_FAILURES.inc(task=task.name)
+        key = TASK_RESULT_KEYS.get(task.name)
+        if key:
+            self.emit("partial_result", task=task.name, key=key, payload=parsed.data, errors=parsed.errors)
+
+    def task_cached(self, task, agent, output) -> None:
+        metrics.TASKS.inc(task=task.name, status="cached")
+        tracing.annotate(outcome="cached")
+        self.timings.append({"task": task.name, "agent": agent.role, "duration": 0.0, "tokens": {}, "cached": True})
+        self.emit("task_started", task=task.name, agent=agent.role, cached=True)
+        self.emit("task_finished", task=task.name, agent=agent.role, duration=0.0,
+                  output_chars=len(output.raw or ""), tokens={}, cached=True)
+        key = TASK_RESULT_KEYS.get(task.name)
+        if key:
+            self.emit("partial_result", task=task.name, key=key, payload=_payload(output))
+
+    def task_joined(self, task, agent) -> None:
+        # An identical task is already running for another request; wait for it
+        self._started_at = time.perf_counter()
+        self.emit("task_started", task=task.name, agent=agent.role, coalesced=True)
+
+    def task_coalesced(self, task, agent, output) -> None:
+        duration = time.perf_counter() - self._started_at
+        metrics.TASKS.inc(task=task.name, status="coalesced")
+        tracing.annotate(outcome="coalesced")
+        self.timings.append({"task": task.name, "agent": agent.role, "duration": duration, "tokens": {},
+                             "cached": False, "coalesced": True})
+        self.emit("task_finished", task=task.name, agent=agent.role, duration=duration,
+                  output_chars=len(output.raw or ""), tokens={}, coalesced=True)
+        key = TASK_RESULT_KEYS.get(task.name)
+        if key:
+            self.emit("partial_result", task=task.name, key=key, payload=_payload(output))
+
+    def task_failed(self, task, agent, error) -> None:
+        metrics.TASKS.inc(task=task.name, status="failed")
+        self.emit("task_failed", task=task.name, agent=agent.role, error=str(error))
+
+    def task_interrupted(self, task, agent, error: Interrupted) -> None:
+        metrics.TASKS.inc(task=task.name, status="interrupted")
+        self.emit("task_interrupted", task=task.name, agent=agent.role, reason=error.reason)
+
+    def llm_routed(self, decision: dict) -> None:
+        # Called by RoutedLLM for each model call of the running task
+        self._routes.append(decision)
+        if decision["route"] != "primary":
+            self.emit("llm_route", task=self.task, **decision)
+
+    def step_callback(self, step) -> None:
+        # AgentAction steps carry the tool call and its result; AgentFinish does not
+        tool = getattr(step, "tool", None)
+        if tool is None:
+            return
+        metrics.TOOL_CALLS.inc(tool=tool)
+        self.emit("tool_call", task=self.task, tool=tool, input=step.tool_input)
+        self.emit("tool_result", task=self.task, tool=tool, result_chars=len(str(step.result or "")))
+
+
+def _cached_output(task, agent, key: str) -> Optional[TaskOutput]:
+    if checkpoint_store is None:
+        return None
+    checkpoint = checkpoint_store.get(key)
+    if checkpoint is None:
+        return None
+    return TaskOutput(
+        name=task.name,
+        description=task.description,
+        expected_output=task.expected_output,
+        raw=checkpoint["raw"],
+        json_dict=checkpoint["json_dict"],
+        agent=agent.role,
+        output_format=OutputFormat.JSON if checkpoint["json_dict"] is not None else OutputFormat.RAW,
+    )
+
+
+def _run_checkpointed(task, agent, context=None, reporter=None, force=False):
+    """
+    Execute `task` (already interpolated), or serve its output from the
+    checkpoint store when nothing it depends on has changed. If an identical
+    task is already executing (for another session), wait for its output
+    instead of running it again. Raises Interrupted, instead of starting
+    the task, once the run is out of time or cancelled. Traced as a "task"
+    span, with its outcome (executed, cached or coalesced).
+    Returns (output, checkpoint key, cached).
+    """
+    reporter = reporter or _Reporter()
+    with tracing.span(task.name, "task", agent=crew_factory.agent_name(task.name) or agent.role):
+        key = task_key(task, agent, context)
+        cached = None if force else _cached_output(task, agent, key)
+        if cached is not None:
+            reporter.task_cached(task, agent, cached)
+            return cached, key, True
+
+        def execute():
+            deadlines.check()
+            agent.step_callback = reporter.step_callback
+            reporter.task_started(task, agent)
+            with route_listener(reporter.llm_routed):
+                output = task.execute_sync(agent=agent, context=context)
+            reporter.task_finished(task, agent, output)
+            parsed = _parse(output)
+            # A malformed answer is not replayed: running again gets a fresh one
+            if checkpoint_store is not None and parsed.valid:
+                checkpoint_store.put(key, task.name, output.raw, parsed.data or None)
+            return output
+
+        try:
+            output, shared = task_flights.do(key, execute, on_wait=lambda: reporter.task_joined(task, agent))
+        except Interrupted as e:
+            reporter.task_interrupted(task, agent, e)
+            raise
+        except Exception as e:
+            reporter.task_failed(task, agent, e)
+            raise
+        if shared:
+            reporter.task_coalesced(task, agent, output)
+        return output, key, False
+
+
+def _execute_task(task, agent, inputs=None, context=None, events=None):
+    """
+    Run a single configured task with its agent, outside of a Crew.
+    `inputs` fill the {placeholders} in the YAML configs, `context` is extra
+    text handed to the agent (e.g. the selected professor).
+    """
+    if inputs:
+        agent.interpolate_inputs(inputs)
+        task.interpolate_inputs(inputs)
+
+    output, _, _ = _run_checkpointed(task, agent, context=context, reporter=_Reporter(events))
+    return output
+
+
+@tracing.traced("run")
+def run_crew(inputs: dict, events=None, replay_from: Optional[str] = None) -> dict:
+    """
+    Run the full sequential crew (research -> deeper research -> cover letter).
+    Besides the task payloads, the result has "tasks" (name, agent, raw output
+    and whether it came from a checkpoint), "token_usage" for the whole run,
+    "timings" (duration, tokens and model routing of each task) and the
+    "run_id" it was recorded and stored under (with each task's routing
+    decisions; see checkpoints.py and artifacts.py).
+
+    Tasks whose config, inputs and upstream outputs are unchanged are served
+    from the checkpoint store; `replay_from` (a task name) forces that task
+    and every task after it to execute again.
+
+    A run interrupted by its deadline or cancellation returns the payloads of
+    the tasks that completed, with "status": "truncated"; it is stored but not
+    recorded for replay, and running it again resumes from the checkpoints of
+    those tasks.
+    """
+    crew = crew_factory.crew()
+    tasks = list(crew.tasks)
+    names = [task.name for task in tasks]
+    if replay_from is not None and replay_from not in names:
+        raise ValueError(f"Unknown task '{replay_from}', expected one of {', '.join(names)}")
+
+    for agent in crew.agents:
+        agent.interpolate_inputs(inputs)
+    for task in tasks:
+        task.interpolate_inputs(inputs)
+
+    reporter = _Reporter(events)
+    outputs, recorded = [], []
+    force = False
+    interrupted = None
+    for task in tasks:
+        force = force or task.name == replay_from
+        # Same context a sequential kickoff hands to each task: the previous task's output
+        context = aggregate_raw_outputs_from_task_outputs(outputs[-1:])
+        try:
+            output, key, cached = _run_checkpointed(task, task.agent, context=context, reporter=reporter, force=force)
+        except Interrupted as e:
+            interrupted = e
+            break
+        outputs.append(output)
+        recorded.append({"task": task.name, "key": key, "cached": cached,
+                         "routing": reporter.timings[-1].get("routing", [])})
+
+    run_id = None
+    if checkpoint_store is not None and interrupted is None:
+        run_id = checkpoint_store.record_run(inputs, recorded)
+    payloads = {
+        **_completion(interrupted),
+        "run_id": run_id,
+        "raw_result": outputs[-1].raw if outputs else "",
+        "tasks": [
+            {"name": output.name, "agent": output.agent, "raw": output.raw, "cached": entry["cached"]}
+            for output, entry in zip(outputs, recorded)
+        ],
+        "token_usage": crew.calculate_usage_metrics().model_dump(),
+        "timings": reporter.timings,
+    }
+    for output in outputs:
+        parsed = _parse(output)
+        key = TASK_RESULT_KEYS.get(output.name, output.name)
+        payloads[key] = _resolved(key, parsed.data)
+        if parsed.errors:
+            payloads.setdefault("parse_errors", {})[key] = parsed.errors
+    return _stored("crew", inputs, payloads, run_id=run_id)
+
+
+@tracing.traced("run")
+def run_researcher(topic: str, university: str, resume: str = "", events=None) -> dict:
+    """
+    Run only the 'researcher' agent on research_task.
+    """
+    task, agent = crew_factory.task("research_task")
+    inputs = {"topic": topic, "university": university, "resume": resume}
+    output = _execute_task(task, agent, inputs=inputs, events=events)
+    return _stored("researcher", inputs, _phase_result(output))
+
+
+@tracing.traced("run")
+def run_deeper_research(prof_name: str, prof_url: str, events=None, kind: str = "professor") -> dict:
+    """
+    Run only the 'deeper_researcher' agent for one professor or lab (`kind`),
+    on the canonical name and URL of its entity. The result's "entity" is
+    that {id, name, url}.
+    """
+    entity = _canonical(kind, prof_name, prof_url)
+    task, agent = crew_factory.task("professor_research_task")
+    context = json.dumps({"prof_name": entity["name"], "prof_url": entity["url"]})
+    output = _execute_task(task, agent, context=context, events=events)
+    return _stored("deeper_research", {"name": prof_name, "url": prof_url, "kind": kind},
+                   {**_phase_result(output), "entity": entity})
+
+
+@tracing.traced("run")
+def run_candidate_profile(resume: str, events=None) -> dict:
+    """
+    Run only candidate_profile_task: condense a resume into a CandidateProfile.
+    A resume seen before is served from the task checkpoints.
+    """
+    task, agent = crew_factory.task("candidate_profile_task")
+    output = _execute_task(task, agent, inputs={"resume": resume}, events=events)
+    return _phase_result(output)
+
+
+def student_background(resume: str, events=None) -> Tuple[str, Optional[dict]]:
+    """
+    What cover letters are written from: the candidate profile of `resume`
+    as compact JSON, extracted once per resume (see run_candidate_profile).
+    Resumes shorter than PROFILE_MIN_CHARS (default 2000) are used as they
+    are, and so is any resume whose profile cannot be extracted.
+    Returns (background text, profile payload or None).
+    """
+    if len(resume) < int(os.getenv("PROFILE_MIN_CHARS", "2000")):
+        return resume, None
+    try:
+        profile = CandidateProfile.model_validate(run_candidate_profile(resume, events=events)["candidate_profile"])
+    except Exception as e:
+        logger.warning("Could not extract a candidate profile, using the full resume: %s", e)
+        return resume, None
+    background = profile.model_dump_json()
+    if len(background) >= len(resume):
+        return resume, profile.model_dump()
+    return background, profile.model_dump()
+
+
+def _cover_letter(prof_name: str, prof_url: str, background: str, events=None) -> dict:
+    # The professor goes into the context, which crewai appends after the task
+    # description: every letter for the same student shares one prompt prefix
+    # (system prompt, instructions, background), which providers cache.
+    # Callers pass the entity's canonical name and URL
+    task, agent = crew_factory.task("cover_letter_task")
+    context = json.dumps({"prof_name": prof_name, "prof_url": prof_url})
+    output = _execute_task(task, agent, inputs={"resume": background}, context=context, events=events)
+    return _phase_result(output)
+
+
+@tracing.traced("run")
+def run_cover_letter(prof_name: str, prof_url: str, resume: str, events=None, kind: str = "professor") -> dict:
+    """
+    Run only the 'cover_letter_agent' for one professor or lab (`kind`), from
+    the student's background (see student_background).
+    """
+    entity = _canonical(kind, prof_name, prof_url)
+    background, _ = student_background(resume, events=events)
+    return _stored("cover_letter", {"name": prof_name, "url": prof_url, "resume": resume, "kind": kind},
+                   _cover_letter(entity["name"], entity["url"], background, events=events))
+
+
+def _letter_for(entity: dict, background: str, events=None) -> CoverLetterResult:
+    name = entity.get("name", "")
+    url = entity.get("url", "")
+    try:
+        result = _cover_letter(name, url, background, events=events.bind(entity=name) if events else None)
+        letter = CoverLetterOutput.model_validate(result["cover_letter"])
+        return CoverLetterResult(name=name, url=url, letter=letter)
+    except Exception as e:
+        # One failed letter must not fail the whole batch
+        logger.warning("Cover letter failed for %r: %s", name, e)
+        return CoverLetterResult(name=name, url=url, error=str(e))
+
+
+@tracing.traced("run")
+def run_cover_letters(entities: List[dict], resume: str, max_concurrency: Optional[int] = None,
+                      events=None) -> dict:
+    """
+    Write a cover letter for each {name, url} entry of `entities` (with an
+    optional `kind`, "professor" by default), once per entity, all from one
+    candidate profile of `resume`, at most `max_concurrency` at a time
+    (default: COVER_LETTER_CONCURRENCY, or 4). Events of each letter carry
+    `entity`.
+
+    The first letter is written alone, so the provider has cached the shared
+    prompt prefix by the time the others are sent.
+
+    Returns {"status", "cover_letters": <CoverLetterBatch as dict>}; entries
+    that failed, or were not written before the run was interrupted, carry
+    an `error` instead of `letter`.
+    """
+    unique = {}
+    for entity in entities:
+        if not entity.get("name"):
+            continue
+        canonical = _canonical(entity.get("kind") or "professor", entity["name"], entity.get("url", ""))
+        unique.setdefault(canonical["id"] or (canonical["name"], canonical["url"]), canonical)
+    entities = list(unique.values())
+
+    results = []
+    profile = None
+    interrupted = None
+    try:
+        if entities:
+            background, profile = student_background(resume, events=events)
+            results.append(_letter_for(entities[0], background, events))
+            rest = entities[1:]
+            if rest:
+                max_concurrency = max(1, max_concurrency or int(os.getenv("COVER_LETTER_CONCURRENCY", "4")))
+                with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="letters") as executor:
+                    futures = [
+                        executor.submit(deadlines.propagate(_letter_for), entity, background, events)
+                        for entity in rest
+                    ]
+                    for entity, future in zip(rest, futures):
+                        try:
+                            results.append(future.result())
+                        except Interrupted as e:
+                            interrupted = interrupted or e
+                            results.append(CoverLetterResult(name=entity["name"], url=entity["url"], error=str(e)))
+    except Interrupted as e:
+        interrupted = e
+    # Letters the run did not get to
+    results += [
+        CoverLetterResult(name=entity["name"], url=entity["url"], error=str(interrupted))
+        for entity in entities[len(results):]
+    ]
+
+    batch = CoverLetterBatch(candidate_profile=profile, results=results)
+    return _stored("cover_letters", {"entities": entities, "resume": resume},
+                   {**_completion(interrupted), "cover_letters": batch.model_dump()})
+
+
+def _valid_entries(model, entries) -> list:
+    valid = []
+    for entry in entries or []:
+        try:
+            valid.append(model.model_validate(entry))
+        except ValidationError as e:
+            logger.warning("Skipping invalid %s entry %r: %s", model.__name__, entry, e)
+    return valid
+
+
+def _research_entity(kind: str, entity: dict, events=None) -> EntityResearch:
+    name = entity.get("name", "")
+    url = entity.get("url", "")
+    try:
+        result = run_deeper_research(name, url, events=events.bind(entity=name) if events else None, kind=kind)
+        info = SpecificProfessorInfo.model_validate(result["specific_info"])
+        return EntityResearch(kind=kind, name=name, url=url, info=info)
+    except Exception as e:
+        # One bad professor must not fail the whole batch
+        logger.warning("Deeper research failed for %s %r: %s", kind, name, e)
+        return EntityResearch(kind=kind, name=name, url=url, error=str(e))
+
+
+@tracing.traced("run")
+def run_fanout(research_info: dict, max_concurrency: Optional[int] = None, include_labs: bool = True,
+               events=None) -> dict:
+    """
+    Run professor_research_task for every professor (and lab) of a ResearchInfo
+    payload concurrently, at most `max_concurrency` at a time
+    (default: FANOUT_CONCURRENCY, or 4). Events of each entity carry `entity`.
+
+    Duplicate entries of the listing are researched once.
+
+    Returns {"status", "fanout": <FanOutResearchInfo as dict>}; entities that
+    failed, or were not researched before the run was interrupted, carry an
+    `error` instead of `info`.
+    """
+    # Listings from run_researcher are registered already: only merge here
+    research_info = _resolved("research_info", research_info, register=False)
+    listing = ResearchInfo(
+        professors=_valid_entries(Professor, research_info.get("professors", [])),
+        labs=_valid_entries(Lab, research_info.get("labs", [])),
+    )
+    entities = [("professor", professor.model_dump()) for professor in listing.professors]
+    if include_labs:
+        entities += [("lab", lab.model_dump()) for lab in listing.labs]
+
+    max_concurrency = max(1, max_concurrency or int(os.getenv("FANOUT_CONCURRENCY", "4")))
+    results = []
+    interrupted = None
+    if entities:
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="fanout") as executor:
+            futures = [
+                executor.submit(deadlines.propagate(_research_entity), kind, entity, events)
+                for kind, entity in entities
+            ]
+            for (kind, entity), future in zip(entities, futures):
+                try:
+                    results.append(future.result())
+                except Interrupted as e:
+                    interrupted = interrupted or e
+                    results.append(EntityResearch(kind=kind, name=entity["name"], url=entity["url"], error=str(e)))
+
+    merged = FanOutResearchInfo(research_info=listing, results=results)
+    return _stored("fanout", {"research_info": research_info, "include_labs": include_labs},
+                   {**_completion(interrupted), "fanout": merged.model_dump()})
+
+
+@tracing.traced("run")
+def run_research_fanout(topic: str, university: str, resume: str = "", max_concurrency: Optional[int] = None,
+                        include_labs: bool = True, events=None) -> dict:
+    """
+    research_task, then deeper research on every entity it returned (see run_fanout).
+    """
+    result = run_researcher(topic, university, resume, events=events)
+    result.update(run_fanout(
+        result["research_info"], max_concurrency=max_concurrency,
+        include_labs=include_labs, events=events,
+    ))
+    return result
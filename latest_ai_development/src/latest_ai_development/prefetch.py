@@ -0,0 +1,156 @@
+# prefetch.py
+
+"""
+Speculative deep research for the top-ranked professors of a listing.
+
+After research_task has produced a ResearchInfo list, users almost always
+open one of its first entries next. With prefetching on, `start` queues deep
+research on the first `top_k` entries as PREFETCH jobs: they run only on the
+scheduler's background slots, are dropped first when the queue fills up, and
+never exceed `max_in_flight` across all users (the budget cap).
+
+When the user then asks for one of them, `claim` hands back the prefetch
+job: already finished, its result is stored at once; still running, the
+result is stored when it completes; still queued, it is cancelled and the
+request runs as a normal job. A new listing for the same user cancels the
+queued prefetches of the previous one (running ones finish and only warm the
+task checkpoints and caches).
+
+Configured from the environment:
+  - PREFETCH: "1" turns prefetching on (default: off)
+  - PREFETCH_TOP_K: entries prefetched per listing (default: 3)
+  - PREFETCH_MAX_IN_FLIGHT: queued + running prefetches, all users together (default: 4)
+  - PREFETCH_TTL: seconds an unclaimed result is kept (default: 1800)
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from latest_ai_development import agent_stack, metrics
+from latest_ai_development.jobs import CANCELLED, FAILED, QUEUED, Job, JobManager
+from latest_ai_development.scheduler import QueueFull
+
+
+class _Prefetch:
+    def __init__(self):
+        self.job: Optional[Job] = None
+        self.result: Optional[dict] = None
+        self.on_claim: Optional[Callable[[dict], None]] = None
+
+
+class Prefetcher:
+    def __init__(self, jobs: JobManager, enabled: bool = False, top_k: int = 3, max_in_flight: int = 4,
+                 ttl_seconds: float = 1800):
+        self.jobs = jobs
+        self.enabled = enabled
+        self.top_k = top_k
+        self.max_in_flight = max_in_flight
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # user id -> {(name, url): prefetch}
+        self._entries: Dict[str, Dict[Tuple[str, str], _Prefetch]] = {}
+        self._active: List[Job] = []
+
+    def start(self, user_id: str, research_info: dict) -> int:
+        """
+        Queue deep research on the first entries of `research_info` for
+        `user_id`, replacing that user's earlier prefetches. Returns how many
+        were queued.
+        """
+        if not self.enabled:
+            return 0
+        self.prune()
+        self.cancel(user_id)
+        entities = [("professor", entity) for entity in research_info.get("professors") or []]
+        entities += [("lab", entity) for entity in research_info.get("labs") or []]
+        started = 0
+        for kind, entity in entities[:self.top_k]:
+            name, url = entity.get("name") or "", entity.get("url") or ""
+            if not name:
+                continue
+            with self._lock:
+                self._active = [job for job in self._active if not job.done]
+                if len(self._active) >= self.max_in_flight:
+                    metrics.PREFETCHES.inc(outcome="skipped")
+                    break
+            entry = _Prefetch()
+            try:
+                entry.job = self.jobs.submit("prefetch", self._run, entry, name, url, kind, user_id=user_id)
+            except QueueFull:
+                metrics.PREFETCHES.inc(outcome="skipped")
+                break
+            with self._lock:
+                self._active.append(entry.job)
+                self._entries.setdefault(user_id, {})[(name, url)] = entry
+            metrics.PREFETCHES.inc(outcome="started")
+            started += 1
+        return started
+
+    def _run(self, job: Job, entry: _Prefetch, name: str, url: str, kind: str) -> dict:
+        result = agent_stack.pipeline().run_deeper_research(name, url, events=job.events, kind=kind)
+        with self._lock:
+            entry.result = result
+            on_claim = entry.on_claim
+        if on_claim is not None:
+            on_claim(result)
+        return result
+
+    def claim(self, user_id: str, name: str, url: str, on_result: Callable[[dict], None]) -> Optional[Job]:
+        """
+        The prefetch job for this entry, if there is a usable one. `on_result`
+        gets its result, now if it is ready or else when the job finishes.
+        Returns None when the caller should run the research itself.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id, {}).pop((name, url), None)
+        if entry is None:
+            return None
+        job = entry.job
+        if job.status == QUEUED and self.jobs.cancel(job.id, running=False):
+            # Not started yet: run it as a regular job at the user's priority
+            metrics.PREFETCHES.inc(outcome="cancelled")
+            return None
+        if job.status in (FAILED, CANCELLED):
+            return None
+        with self._lock:
+            result = entry.result
+            if result is None:
+                entry.on_claim = on_result
+        if result is not None:
+            metrics.PREFETCHES.inc(outcome="served")
+            on_result(result)
+        else:
+            metrics.PREFETCHES.inc(outcome="joined")
+        return job
+
+    def cancel(self, user_id: str) -> None:
+        """Drop the user's prefetches: queued ones are cancelled, results forgotten."""
+        with self._lock:
+            entries = self._entries.pop(user_id, {})
+        for entry in entries.values():
+            # Running ones finish: they still warm the checkpoints
+            if self.jobs.cancel(entry.job.id, running=False):
+                metrics.PREFETCHES.inc(outcome="cancelled")
+
+    def prune(self) -> None:
+        """Forget unclaimed results older than the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            for user_id in list(self._entries):
+                entries = self._entries[user_id]
+                for key in [key for key, entry in entries.items()
+                            if entry.job.done and entry.job.finished_at < cutoff]:
+                    del entries[key]
+                if not entries:
+                    del self._entries[user_id]
+
+
+def create_prefetcher(jobs: JobManager) -> Prefetcher:
+    return Prefetcher(
+        jobs,
+        enabled=os.getenv("PREFETCH", "0") == "1",
+        top_k=int(os.getenv("PREFETCH_TOP_K", "3")),
+        max_in_flight=int(os.getenv("PREFETCH_MAX_IN_FLIGHT", "4")),
+        ttl_seconds=float(os.getenv("PREFETCH_TTL", "1800")),
+    )
@@ -0,0 +1,72 @@
+# ratelimit.py
+
+"""
+Process-wide rate limits for the external APIs, shared by every crew running
+in the process (web jobs, fan-outs, batch workers):
+
+  - llm_limiter: LLM requests, configured by LLM_RPM
+  - search_limiter: upstream search requests (cache misses), configured by SEARCH_RPM
+
+Both are in requests per minute; 0 (the default) means unlimited. Waits
+end early when the current run is cancelled or out of time (deadlines.py).
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+from latest_ai_development import deadlines, metrics
+
+
+class TokenBucket:
+    """
+    Blocking token bucket: `acquire` waits until a token is available.
+    Refills at `rate` tokens per second up to `burst` tokens.
+    """
+
+    def __init__(self, name: str, rate: float = 0.0, burst: Optional[float] = None):
+        self.name = name
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+
+    def configure(self, rate: float, burst: Optional[float] = None) -> None:
+        with self._lock:
+            self.rate = rate
+            self.capacity = burst or max(1.0, rate)
+            self._tokens = self.capacity
+            self._updated = time.monotonic()
+
+    def configure_per_minute(self, per_minute: float) -> None:
+        self.configure(per_minute / 60.0)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Take `tokens`, waiting as needed. Returns False if that would take
+        longer than `timeout` seconds; raises deadlines.Interrupted if the
+        current run is stopped while waiting.
+        """
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                if self.rate <= 0:
+                    return True
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    waited = now - started
+                    if waited:
+                        metrics.RATE_LIMIT_WAIT.inc(waited, limiter=self.name)
+                    return True
+                delay = (tokens - self._tokens) / self.rate
+            if timeout is not None and time.monotonic() - started + delay > timeout:
+                return False
+            deadlines.sleep(delay)
+
+
+llm_limiter = TokenBucket("llm", float(os.getenv("LLM_RPM", "0")) / 60.0)
+search_limiter = TokenBucket("search", float(os.getenv("SEARCH_RPM", "0")) / 60.0)
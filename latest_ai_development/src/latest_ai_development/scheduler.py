@@ -0,0 +1,272 @@
+# scheduler.py
+
+"""
+Admission control and fair-share scheduling for crew executions.
+
+Work is queued with a priority and the submitting user, and run on at most
+`max_concurrency` worker threads:
+
+  - The queue is bounded. When it is full (or the user already has
+    `max_queued_per_user` entries waiting), `submit` raises QueueFull at once
+    with a Retry-After estimate instead of letting the backlog grow; the web
+    app answers 429. Queued PREFETCH work is dropped to make room for users.
+  - The next entry is the one with the best priority (HIGH for cheap
+    cover letters, NORMAL for single-professor research, BULK for full
+    research runs, PREFETCH for speculative work), then whose user has the
+    fewest entries running, then whose user was served least recently
+    (round robin), then the oldest, so one user re-submitting cannot starve
+    the others. Waiting entries gain one priority level per
+    `aging_seconds`, so BULK work is delayed but never starved.
+  - PREFETCH work never takes more than `background_slots` workers.
+  - A running entry that was told to stop (its job was cancelled) can be
+    released: it stops counting against the limits and a new worker takes
+    its place at once, while the old one finishes unwinding on its own (its
+    LLM or tool call cannot be interrupted). At most `max_unwinding` such
+    threads (default: `max_concurrency`) run on top of the workers; past
+    that, a released entry keeps its worker until it returns, so cancelling
+    and resubmitting cannot run more than that many extra agent runs.
+"""
+import atexit
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from latest_ai_development import metrics
+
+logger = logging.getLogger(__name__)
+
+HIGH = 0
+NORMAL = 1
+BULK = 2
+PREFETCH = 3
+
+PRIORITY_NAMES = {HIGH: "high", NORMAL: "normal", BULK: "bulk", PREFETCH: "prefetch"}
+
+
+class QueueFull(Exception):
+    """The scheduler cannot take more work now; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A queued unit of work; pass it to Scheduler.cancel to withdraw it."""
+
+    def __init__(self, seq: int, fn: Callable[[], None], user: Optional[str], priority: int,
+                 on_cancel: Optional[Callable[[], None]]):
+        self.seq = seq
+        self.fn = fn
+        self.user = user
+        self.priority = priority
+        self.on_cancel = on_cancel
+        self.enqueued_at = time.monotonic()
+        self.state = "queued"  # queued, running, done, cancelled, released
+        # Released, and a new worker took its place
+        self.replaced = False
+
+
+class Scheduler:
+    def __init__(self, name: str, max_concurrency: int = 4, max_queue: int = 64, max_queued_per_user: int = 4,
+                 background_slots: int = 1, aging_seconds: float = 60.0, max_unwinding: Optional[int] = None):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_unwinding = max_concurrency if max_unwinding is None else max_unwinding
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self.background_slots = background_slots
+        self.aging_seconds = aging_seconds
+        self._cond = threading.Condition()
+        self._queue: List[Ticket] = []
+        self._running: Counter = Counter()  # user -> running entries
+        self._last_started: Dict[Optional[str], float] = {}
+        self._running_background = 0
+        # Released entries still running on a worker that was replaced
+        self._unwinding = 0
+        self._seq = itertools.count()
+        self._worker_seq = itertools.count()
+        self._workers: List[threading.Thread] = []
+        self._stopping = False
+        # Moving average of run time, for Retry-After estimates
+        self._avg_duration = 30.0
+
+    def submit(self, fn: Callable[[], None], user: Optional[str] = None, priority: int = NORMAL,
+               on_cancel: Optional[Callable[[], None]] = None) -> Ticket:
+        """
+        Queue `fn()`; `on_cancel` is called instead if the entry is cancelled
+        or dropped before it starts. Raises QueueFull when it cannot be admitted.
+        """
+        dropped = None
+        with self._cond:
+            if priority < PREFETCH and user is not None:
+                queued = sum(1 for ticket in self._queue if ticket.user == user and ticket.priority < PREFETCH)
+                if queued >= self.max_queued_per_user:
+                    metrics.SCHEDULER_REJECTIONS.inc(reason="user_limit")
+                    raise QueueFull("Too many of your requests are waiting", self._retry_after(queued))
+            if len(self._queue) >= self.max_queue:
+                dropped = self._drop_prefetch() if priority < PREFETCH else None
+                if dropped is None:
+                    metrics.SCHEDULER_REJECTIONS.inc(reason="queue_full")
+                    raise QueueFull("The service is busy", self._retry_after(len(self._queue)))
+            ticket = Ticket(next(self._seq), fn, user, priority, on_cancel)
+            self._queue.append(ticket)
+            self._start_workers()
+            self._cond.notify()
+        if dropped is not None:
+            self._cancelled(dropped)
+        return ticket
+
+    def cancel(self, ticket: Ticket) -> bool:
+        """Withdraw a queued entry. Returns False if it already started."""
+        with self._cond:
+            if ticket.state != "queued":
+                return False
+            self._queue.remove(ticket)
+            ticket.state = "cancelled"
+        self._cancelled(ticket)
+        return True
+
+    def release(self, ticket: Ticket) -> bool:
+        """
+        Hand back the worker of a running entry without waiting for it to
+        return, unless `max_unwinding` released entries are already
+        unwinding (see the module docstring). Returns False if it is not running.
+        """
+        with self._cond:
+            if ticket.state != "running":
+                return False
+            ticket.state = "released"
+            self._finished(ticket)
+            if self._unwinding < self.max_unwinding:
+                # The released entry's thread exits when it returns
+                ticket.replaced = True
+                self._unwinding += 1
+                self._spawn_worker()
+            self._cond.notify_all()
+        return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "running": sum(self._running.values()),
+                "unwinding": self._unwinding,
+                "queued": len(self._queue),
+                "queued_by_priority": {
+                    name: sum(1 for ticket in self._queue if ticket.priority == priority)
+                    for priority, name in PRIORITY_NAMES.items()
+                },
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+            }
+
+    def shutdown(self) -> None:
+        """
+        Stop taking work and wait for running entries; queued ones are dropped.
+        Called at interpreter exit.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            workers = list(self._workers)
+        for worker in workers:
+            worker.join()
+
+    def _drop_prefetch(self) -> Optional[Ticket]:
+        # The newest speculative entry makes room for real work
+        for ticket in reversed(self._queue):
+            if ticket.priority >= PREFETCH:
+                self._queue.remove(ticket)
+                ticket.state = "cancelled"
+                return ticket
+        return None
+
+    @staticmethod
+    def _cancelled(ticket: Ticket) -> None:
+        if ticket.on_cancel is not None:
+            try:
+                ticket.on_cancel()
+            except Exception:
+                logger.exception("Cancel callback failed")
+
+    def _retry_after(self, waiting: int) -> int:
+        estimate = (waiting + 1) / self.max_concurrency * self._avg_duration
+        return max(1, min(300, math.ceil(estimate)))
+
+    def _start_workers(self) -> None:
+        if not self._workers:
+            atexit.register(self.shutdown)
+        while len(self._workers) < self.max_concurrency:
+            self._spawn_worker()
+
+    def _spawn_worker(self) -> None:
+        worker = threading.Thread(target=self._work, name=f"{self.name}-{next(self._worker_seq)}", daemon=True)
+        self._workers.append(worker)
+        worker.start()
+
+    def _finished(self, ticket: Ticket) -> None:
+        # Called with self._cond held
+        self._running[ticket.user] -= 1
+        if not self._running[ticket.user]:
+            del self._running[ticket.user]
+            if not any(queued.user == ticket.user for queued in self._queue):
+                self._last_started.pop(ticket.user, None)
+        if ticket.priority >= PREFETCH:
+            self._running_background -= 1
+
+    def _effective_priority(self, ticket: Ticket, now: float) -> int:
+        if ticket.priority >= PREFETCH:
+            return ticket.priority
+        return max(HIGH, ticket.priority - int((now - ticket.enqueued_at) / self.aging_seconds))
+
+    def _next(self) -> Optional[Ticket]:
+        now = time.monotonic()
+        candidates = [
+            ticket for ticket in self._queue
+            if ticket.priority < PREFETCH or self._running_background < self.background_slots
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda ticket: (
+            self._effective_priority(ticket, now), self._running[ticket.user],
+            self._last_started.get(ticket.user, 0.0), ticket.seq,
+        ))
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                ticket = None if self._stopping else self._next()
+                while ticket is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait()
+                    ticket = None if self._stopping else self._next()
+                self._queue.remove(ticket)
+                ticket.state = "running"
+                self._running[ticket.user] += 1
+                self._last_started[ticket.user] = time.monotonic()
+                if ticket.priority >= PREFETCH:
+                    self._running_background += 1
+
+            started = time.monotonic()
+            try:
+                ticket.fn()
+            except Exception:
+                logger.exception("Scheduled work failed")
+            finally:
+                with self._cond:
+                    released = ticket.state == "released"
+                    ticket.state = "done"
+                    if ticket.replaced:
+                        # Another worker has taken this one's place
+                        self._unwinding -= 1
+                        self._workers.remove(threading.current_thread())
+                        return
+                    if not released:
+                        self._finished(ticket)
+                        self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.monotonic() - started)
+                    self._cond.notify_all()
@@ -0,0 +1,134 @@
+# session_api.py
+
+"""
+Read-only views of a web app session for the JSON API (webapp.py, /api/...).
+
+Instead of the whole page, clients fetch:
+  - a summary: the size of each collection and the current job
+  - one collection (professors, labs, publications, ...) a page at a time,
+    optionally filtered by keywords and projected to a few fields
+  - one document (the raw result, the last cover letter) on its own
+
+Keyword filtering matches every word of `q`, case-insensitively, against the
+descriptive fields of each entry (a professor's name and research interests,
+a lab's name and focus, ...). Cursors are opaque: they carry the offset and a
+fingerprint of the filtered list, so a cursor from an older listing (a new
+run replaced it) or another query is rejected with InvalidCursor instead of
+silently skipping or repeating entries.
+"""
+import base64
+import hashlib
+import json
+import re
+from typing import Iterable, List, Optional
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Collection -> fields keyword filters look at (None: every string value)
+COLLECTIONS = {
+    "professors": ("name", "research_interests"),
+    "labs": ("name", "focus"),
+    "publications": ("title", "summary"),
+    "projects": ("name", "description"),
+    "courses": None,
+    "deep_research": None,
+    "cover_letters": None,
+}
+
+# Document -> session fields it is made of
+DOCUMENTS = {
+    "raw_result": ("raw_result",),
+    "cover_letter": ("email_subject", "email_body", "cover_letter"),
+}
+
+_WORD = re.compile(r"\w+")
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed, or belongs to another listing or query."""
+
+
+def keywords(query: Optional[str]) -> List[str]:
+    return _WORD.findall((query or "").lower())
+
+
+def _strings(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _search_text(collection: str, item) -> str:
+    fields = COLLECTIONS.get(collection)
+    if fields is None or not isinstance(item, dict):
+        return " ".join(_strings(item)).lower()
+    return " ".join(str(item.get(field) or "") for field in fields).lower()
+
+
+def _project(item, fields: Optional[List[str]]):
+    if not fields or not isinstance(item, dict):
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+
+def _fingerprint(items: list, query: List[str]) -> str:
+    canonical = json.dumps([query, items], sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def _encode_cursor(offset: int, fingerprint: str) -> str:
+    raw = json.dumps({"o": offset, "f": fingerprint}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, fingerprint: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(decoded["o"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if decoded.get("f") != fingerprint or offset < 0:
+        raise InvalidCursor("The listing changed since this cursor was issued, start again without it")
+    return offset
+
+
+def page(collection: str, items: list, query: Optional[str] = None, fields: Optional[List[str]] = None,
+         cursor: Optional[str] = None, limit: int = DEFAULT_LIMIT) -> dict:
+    """
+    One page of `items` (the session's `collection`):
+    {"items": [...], "total": <matches>, "next_cursor": <str or None>}.
+    """
+    words = keywords(query)
+    matched = [item for item in items or [] if all(word in _search_text(collection, item) for word in words)]
+    fingerprint = _fingerprint(matched, words)
+    offset = _decode_cursor(cursor, fingerprint) if cursor else 0
+    limit = max(1, min(MAX_LIMIT, limit))
+    end = offset + limit
+    return {
+        "items": [_project(item, fields) for item in matched[offset:end]],
+        "total": len(matched),
+        "next_cursor": _encode_cursor(end, fingerprint) if end < len(matched) else None,
+    }
+
+
+def document(name: str, user_data: dict) -> dict:
+    return {field: user_data.get(field) for field in DOCUMENTS[name]}
+
+
+def summary(user_data: dict, job=None) -> dict:
+    """Sizes of the session's collections and documents, and its current job."""
+    return {
+        "collections": {name: len(user_data.get(name) or []) for name in COLLECTIONS},
+        "documents": {
+            name: sum(len(str(user_data.get(field) or "")) for field in fields)
+            for name, fields in DOCUMENTS.items()
+        },
+        "job": {"id": job.id, "kind": job.kind, "status": job.status} if job is not None else None,
+    }
@@ -0,0 +1,241 @@
+# session_store.py
+
+"""
+Per-user session data for the web app (professors, labs, resume, raw results,
+publications, cover letters...).
+
+Two backends share one interface:
+  - MemorySessionStore: in-process LRU with a TTL and a byte budget
+  - SQLiteSessionStore: on-disk store in WAL mode, shared by several worker processes
+
+Sessions are stored as compact JSON, zlib-compressed once they grow past a
+few hundred bytes (raw results and resumes compress well).
+"""
+import json
+import os
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from latest_ai_development.storage import connect, data_dir
+
+COMPRESS_THRESHOLD = 512
+
+
+def encode_session(data: dict) -> bytes:
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    if len(raw) > COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(raw, 6)
+    return b"j" + raw
+
+
+def decode_session(blob: bytes) -> dict:
+    blob = bytes(blob)
+    if blob[:1] == b"z":
+        return json.loads(zlib.decompress(blob[1:]))
+    return json.loads(blob[1:])
+
+
+class SessionStore(ABC):
+    """
+    Interface of the session backends. `get` returns a copy: changes must be
+    written back with `put` or `update`.
+    """
+
+    @abstractmethod
+    def get(self, user_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def put(self, user_id: str, data: dict) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, user_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, user_id: str, **fields) -> dict:
+        """
+        Merge `fields` into the stored session (created if missing) and return it.
+        """
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """
+    In-memory LRU store: sessions idle for more than `ttl_seconds` expire, and
+    the least recently used ones are evicted once the encoded sessions
+    exceed `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 86400):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._sessions = OrderedDict()  # user_id -> (last_access, blob)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _get_blob(self, user_id: str) -> Optional[bytes]:
+        entry = self._sessions.get(user_id)
+        if entry is None:
+            return None
+        last_access, blob = entry
+        now = time.time()
+        if now - last_access > self.ttl_seconds:
+            self._remove(user_id)
+            return None
+        self._sessions[user_id] = (now, blob)
+        self._sessions.move_to_end(user_id)
+        return blob
+
+    def _put_blob(self, user_id: str, blob: bytes) -> None:
+        self._remove(user_id)
+        self._sessions[user_id] = (time.time(), blob)
+        self._bytes += len(blob)
+        # Never evict the session that was just written
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            oldest = next(iter(self._sessions))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, user_id: str) -> None:
+        entry = self._sessions.pop(user_id, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def get(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            blob = self._get_blob(user_id)
+        return decode_session(blob) if blob is not None else None
+
+    def put(self, user_id: str, data: dict) -> None:
+        blob = encode_session(data)
+        with self._lock:
+            self._put_blob(user_id, blob)
+
+    def delete(self, user_id: str) -> None:
+        with self._lock:
+            self._remove(user_id)
+
+    def update(self, user_id: str, **fields) -> dict:
+        with self._lock:
+            blob = self._get_blob(user_id)
+            data = decode_session(blob) if blob is not None else new_session()
+            data.update(fields)
+            self._put_blob(user_id, encode_session(data))
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store (WAL mode) that several gunicorn workers can share.
+    Sessions idle for more than `ttl_seconds` are treated as missing and purged.
+    """
+
+    def __init__(self, path=None, ttl_seconds: float = 86400):
+        self.path = path or data_dir() / "sessions.sqlite3"
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = connect(self.path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    user_id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at)")
+
+    def _read(self, user_id: str) -> Optional[dict]:
+        row = self._conn.execute(
+            "SELECT data, updated_at FROM sessions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return decode_session(row[0])
+
+    def _write(self, user_id: str, data: dict) -> None:
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sessions (user_id, data, updated_at) VALUES (?, ?, ?)",
+            (user_id, encode_session(data), now),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl_seconds,))
+
+    def get(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._read(user_id)
+
+    def put(self, user_id: str, data: dict) -> None:
+        with self._lock, self._conn:
+            self._write(user_id, data)
+
+    def delete(self, user_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+
+    def update(self, user_id: str, **fields) -> dict:
+        with self._lock, self._conn:
+            # Take the write lock up front so other processes cannot interleave
+            self._conn.execute("BEGIN IMMEDIATE")
+            data = self._read(user_id) or new_session()
+            data.update(fields)
+            self._write(user_id, data)
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions"
+            ).fetchone()
+        return {"backend": "sqlite", "sessions": sessions, "bytes": size}
+
+
+def new_session() -> dict:
+    return {
+        "professors": [],
+        "labs": [],
+        "raw_result": None,
+        "resume": "",
+        "job_id": None,
+    }
+
+
+def create_session_store() -> SessionStore:
+    """
+    Backend selected by SESSION_STORE ("memory", the default, or "sqlite"):
+      - SESSION_TTL: idle seconds before a session expires (default one day)
+      - SESSION_STORE_MAX_BYTES: memory budget of the memory backend (default 64 MiB)
+      - SESSION_STORE_PATH: database file of the sqlite backend
+    """
+    ttl = float(os.getenv("SESSION_TTL", "86400"))
+    if os.getenv("SESSION_STORE", "memory") == "sqlite":
+        return SQLiteSessionStore(path=os.getenv("SESSION_STORE_PATH") or None, ttl_seconds=ttl)
+    return MemorySessionStore(
+        max_bytes=int(os.getenv("SESSION_STORE_MAX_BYTES", str(64 * 1024 * 1024))),
+        ttl_seconds=ttl,
+    )
@@ -0,0 +1,92 @@
+# singleflight.py
+
+"""
+Request coalescing: concurrent calls with the same key share one execution.
+
+The first caller of a key runs the work; callers that arrive while it is in
+flight wait for it and receive the same result (or exception). Used for
+identical search queries (tools/cached_search_tool.py) and identical agent
+tasks, e.g. many students starting /researcher_phase with the same topic and
+university, or deeper research on the same professor (pipeline.py).
+
+Coalescing is per process; across processes the search cache and task
+checkpoints take over once the first execution has finished.
+
+Waiters honor their own run's deadline (deadlines.py) while they wait, and
+when the run executing the call is interrupted (cancelled, or out of time),
+its waiters do not inherit that: one of them executes the call instead.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from latest_ai_development import deadlines, metrics
+
+# How often waiters check their own deadline
+_WAIT_SLICE = 0.25
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+# Every SingleFlight by name, for the in-flight gauge on /metrics
+groups: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    A named group of coalesced calls; `name` labels the
+    lad_singleflight_calls_total metric.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        groups[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], Any], on_wait: Optional[Callable[[], None]] = None) -> Tuple[Any, bool]:
+        """
+        Run `fn()` unless a call with the same key is already in flight, in
+        which case call `on_wait` (if given) and wait for that one.
+        Returns (result, shared), shared being True for the waiters.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                break
+
+            metrics.SINGLEFLIGHT_CALLS.inc(group=self.name, outcome="collapsed")
+            if on_wait is not None:
+                on_wait()
+            deadline = deadlines.current()
+            while not call.done.wait(None if deadline is None else _WAIT_SLICE):
+                deadline.check()
+            if isinstance(call.error, deadlines.Interrupted):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        metrics.SINGLEFLIGHT_CALLS.inc(group=self.name, outcome="executed")
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
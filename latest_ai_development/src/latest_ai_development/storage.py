@@ -0,0 +1,28 @@
+# storage.py
+
+import os
+import sqlite3
+from pathlib import Path
+
+
+def data_dir() -> Path:
+    """
+    Directory for on-disk caches and stores shared by the crew and web apps.
+    Override with the LAD_DATA_DIR environment variable.
+    """
+    path = Path(os.getenv("LAD_DATA_DIR", ".crew_data"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def connect(path) -> sqlite3.Connection:
+    """
+    Open a SQLite database that can be shared between threads and processes.
+    WAL mode lets readers proceed while another connection writes.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,121 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from latest_ai_development import deadlines, metrics, tracing
+from latest_ai_development.entities import canonical_url
+from latest_ai_development.tools.cached_search_tool import normalize_query
+
+# One result entry of the search tool's text (see CustomSerperDevTool)
+_ENTRY = re.compile(r"Title: (?P<title>[^\n]*)\nLink: (?P<link>[^\n]*)\nSnippet: (?P<snippet>.*?)\n---", re.S)
+
+
+class BatchSearchInput(BaseModel):
+    """Input schema for BatchSearchTool."""
+    search_queries: List[str] = Field(
+        ..., description="The search queries to run together, e.g. one per department page, lab or professor"
+    )
+
+
+class BatchSearchTool(BaseTool):
+    """
+    Runs several searches in one tool call, at most `max_concurrency` at a
+    time, each through `search` (the cached search tool: cache, coalescing,
+    rate limit and pooled Serper session) with a budget of
+    `results_per_query` results. Returns one digest of the results merged
+    across queries and deduplicated by URL, so the agent gets in one step
+    what would otherwise take a tool call (and an LLM turn) per query.
+    """
+    name: str = "Search the internet for several queries"
+    description: str = (
+        "Search the internet for several queries at once, given as a list in search_queries "
+        "(for example the department's faculty page, each lab and each professor's name). "
+        "Returns the results of all queries together, without duplicates. Prefer it to "
+        "searching one query at a time."
+    )
+    args_schema: Type[BaseModel] = BatchSearchInput
+    search: Any = None
+    results_per_query: int = 3
+    max_queries: int = 8
+    max_concurrency: int = 4
+    snippet_chars: int = 240
+
+    def _search(self, query: str) -> Any:
+        return self.search._run(search_query=query, n_results=self.results_per_query)
+
+    def _run(self, **kwargs: Any) -> str:
+        queries = kwargs.get("search_queries") or kwargs.get("search_query") or []
+        if isinstance(queries, str):
+            queries = [queries]
+        # Same query spelled twice is searched once
+        unique = list({normalize_query(query): query for query in queries if normalize_query(query)}.values())
+        skipped = unique[self.max_queries:]
+        unique = unique[:self.max_queries]
+        if not unique:
+            return "No search queries given."
+
+        with tracing.span(self.name, "tool", queries=len(unique)) as span:
+            if len(unique) == 1:
+                results = [self._search(unique[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(unique)),
+                                        thread_name_prefix="batch-search") as executor:
+                    futures = [executor.submit(deadlines.propagate(self._search), query) for query in unique]
+                    results = [future.result() for future in futures]
+            digest, kept, duplicates = self._digest(unique, results, skipped)
+            span.set(results=kept, duplicates=duplicates)
+        metrics.BATCH_SEARCH_RESULTS.inc(kept, outcome="kept")
+        metrics.BATCH_SEARCH_RESULTS.inc(duplicates, outcome="duplicate")
+        return digest
+
+    def _digest(self, queries: List[str], results: list, skipped: List[str]):
+        # canonical URL -> [title, link, snippet, numbers of the queries that found it]
+        merged = {}
+        failed = []
+        duplicates = 0
+        for number, (query, result) in enumerate(zip(queries, results), 1):
+            if not isinstance(result, str):
+                failed.append(f'"{query}": {result.get("error", result) if isinstance(result, dict) else result}')
+                continue
+            for match in _ENTRY.finditer(result):
+                # A link canonical_url cannot parse is keyed as it is
+                key = canonical_url(match["link"]) or match["link"]
+                if key in merged:
+                    duplicates += 1
+                    if number not in merged[key][3]:
+                        merged[key][3].append(number)
+                    continue
+                snippet = " ".join(match["snippet"].split())
+                if len(snippet) > self.snippet_chars:
+                    snippet = snippet[:self.snippet_chars].rsplit(" ", 1)[0] + "..."
+                merged[key] = [match["title"], match["link"], snippet, [number]]
+
+        lines = ["Queries: " + "; ".join(f"[{number}] {query}" for number, query in enumerate(queries, 1))]
+        lines.append(f"{len(merged)} results:")
+        for title, link, snippet, numbers in merged.values():
+            lines.append(f"Title: {title}\nLink: {link}\nSnippet: {snippet}\n"
+                         f"Found by: {', '.join(f'[{number}]' for number in numbers)}\n---")
+        if failed:
+            lines.append("Failed: " + "; ".join(failed))
+        if skipped:
+            lines.append(f"Not searched (at most {self.max_queries} queries per call): " + "; ".join(skipped))
+        return "\n".join(lines), len(merged), duplicates
+
+
+def batch_search(search: BaseTool) -> BatchSearchTool:
+    """
+    Build a BatchSearchTool around `search` (a CachedSearchTool), configured from the environment:
+      - SEARCH_BATCH_RESULTS: results per query (default: 3)
+      - SEARCH_BATCH_MAX_QUERIES: queries per call, the rest are reported as not searched (default: 8)
+      - SEARCH_BATCH_CONCURRENCY: queries searched at once (default: 4)
+    """
+    return BatchSearchTool(
+        search=search,
+        results_per_query=int(os.getenv("SEARCH_BATCH_RESULTS", "3")),
+        max_queries=int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "8")),
+        max_concurrency=int(os.getenv("SEARCH_BATCH_CONCURRENCY", "4")),
+    )
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, List, Optional, Set, Tuple, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from latest_ai_development import metrics, tracing
+from latest_ai_development.ratelimit import search_limiter
+from latest_ai_development.singleflight import SingleFlight
+from latest_ai_development.storage import connect, data_dir
+
+
+class SearchQueryInput(BaseModel):
+    """Input schema for the search tools (same shape as SerperDevTool)."""
+    search_query: str = Field(
+        ..., description="Mandatory search query you want to use to search the internet"
+    )
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lower-case the query and collapse whitespace so that trivially
+    different spellings of the same search share one cache entry.
+    """
+    return " ".join((query or "").lower().split())
+
+
+class SearchCache:
+    """
+    Persistent search-result cache stored in SQLite.
+
+    Entries expire after `ttl_seconds`. When more than `max_entries` are
+    stored, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=None, ttl_seconds: float = 86400, max_entries: int = 5000):
+        self.path = path or data_dir() / "search_cache.sqlite3"
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS search_cache_lru ON search_cache (last_access)"
+            )
+
+    @staticmethod
+    def make_key(query: str, params: Optional[dict] = None) -> str:
+        payload = json.dumps(
+            {"q": normalize_query(query), "params": params or {}},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE search_cache SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (now, key),
+            )
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, query: str, value: Any) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO search_cache (key, query, value, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, normalize_query(query), json.dumps(value), now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM search_cache WHERE key IN (
+                    SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def entries_since(self, timestamp: float) -> List[Tuple[str, str, Any, float]]:
+        """(key, query, value, created_at) of entries written after `timestamp`, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, query, value, created_at FROM search_cache WHERE created_at > ? ORDER BY created_at",
+                (timestamp,),
+            ).fetchall()
+        return [(key, query, json.loads(value), created_at) for key, query, value, created_at in rows]
+
+    def keys(self) -> Set[str]:
+        """Keys of the entries that have not expired."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM search_cache WHERE created_at >= ?", (cutoff,)).fetchall()
+        return {key for (key,) in rows}
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM search_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+            }
+
+
+# Identical queries from concurrent agents share one upstream request
+search_flights = SingleFlight("search")
+
+
+class CachedSearchTool(BaseTool):
+    """
+    Wraps a search tool (e.g. SerperDevTool) and serves repeated queries
+    from a persistent SearchCache instead of calling the search API again.
+    Concurrent misses for the same query are coalesced into one request.
+    """
+    name: str = "Search the internet"
+    description: str = (
+        "A tool that can be used to search the internet with a search_query."
+    )
+    args_schema: Type[BaseModel] = SearchQueryInput
+    tool: Any = None
+    cache: Any = None
+
+    def _cache_params(self, kwargs: dict) -> dict:
+        # Anything that changes the upstream response must be part of the key
+        params = {
+            name: getattr(self.tool, name, None)
+            for name in ("search_url", "n_results", "country", "location", "locale")
+        }
+        params.update({k: v for k, v in kwargs.items() if k not in ("search_query", "query")})
+        return params
+
+    def _run(self, **kwargs: Any) -> Any:
+        query = kwargs.get("search_query") or kwargs.get("query") or ""
+        with tracing.span(self.name, "tool", query=query):
+            return self._search(query, kwargs)
+
+    def _search(self, query: str, kwargs: dict) -> Any:
+        key = self.cache.make_key(query, self._cache_params(kwargs))
+
+        started = time.perf_counter()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._record("hit", started)
+            return cached
+
+        try:
+            result, shared = search_flights.do(key, lambda: self._fetch(key, query, kwargs))
+        except Exception:
+            self._record("error", started)
+            raise
+        if shared:
+            self._record("coalesced", started)
+        else:
+            self._record("miss" if isinstance(result, str) else "error", started)
+        return result
+
+    def _fetch(self, key: str, query: str, kwargs: dict) -> Any:
+        search_limiter.acquire()
+        result = self.tool._run(**kwargs)
+        # Only plain-text result pages are cached; dict results are API errors
+        if isinstance(result, str):
+            self.cache.set(key, query, result)
+        return result
+
+    @staticmethod
+    def _record(outcome: str, started: float) -> None:
+        metrics.SEARCH_CALLS.inc(cache=outcome)
+        metrics.SEARCH_DURATION.observe(time.perf_counter() - started, cache=outcome)
+        tracing.annotate(cache=outcome)
+
+
+def cached_search(tool: BaseTool, cache: Optional[SearchCache] = None) -> CachedSearchTool:
+    """
+    Build a CachedSearchTool around `tool`, configured from the environment:
+      - SEARCH_CACHE_PATH: SQLite file (default: <LAD_DATA_DIR>/search_cache.sqlite3)
+      - SEARCH_CACHE_TTL: entry lifetime in seconds (default: one day)
+      - SEARCH_CACHE_MAX_ENTRIES: LRU size bound (default: 5000)
+    """
+    if cache is None:
+        cache = SearchCache(
+            path=os.getenv("SEARCH_CACHE_PATH") or None,
+            ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL", "86400")),
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000")),
+        )
+    return CachedSearchTool(tool=tool, cache=cache)
@@ -1,9 +1,19 @@
 from crewai.tools import BaseTool
-from typing import Type
-from pydantic import BaseModel, Field
+from typing import Any, Optional, Type
+from pydantic import BaseModel, Field, PrivateAttr
+import json
 import os
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from latest_ai_development import deadlines, metrics, tracing
+from latest_ai_development.tools.cached_search_tool import SearchQueryInput
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
 
 class MyCustomToolInput(BaseModel):
     """Input schema for MyCustomTool."""
@@ -20,25 +30,115 @@ class MyCustomTool(BaseTool):
         # Implementation goes here
         return "this is an example of a tool output, ignore it and move along."
 
-# class CustomSerperDevTool(BaseTool):
-#     name: str = "Custom Serper Dev Tool"
-#     description: str = "Search the internet for research labs and professors"
-#     #args_schema: Type[BaseModel] = MyCustomToolInput
-
-#     def _run(self, query: str) -> str:
-#         import http.client
-#         import json
-
-#         conn = http.client.HTTPSConnection("google.serper.dev")
-#         payload = json.dumps({
-#         "q": "query",
-#         "num": 10
-#         })
-#         headers = {
-#         'X-API-KEY': os.getenv("SERPER_API_KEY"),
-#         'Content-Type': 'application/json'
-#         }
-#         conn.request("POST", "/search", payload, headers)
-#         res = conn.getresponse()
-#         url = res.get("link")
-#         print(url.decode("utf-8"))
+class CustomSerperDevTool(BaseTool):
+    """
+    Serper search over a pooled keep-alive session: connections (and their TLS
+    handshakes) are reused across calls and agents, at most `max_in_flight`
+    requests run at once, every request has a connect/read timeout, and
+    429/5xx answers or network errors are retried with exponential backoff
+    (honoring Retry-After), all within the current run's deadline (see
+    deadlines.py). Drop-in replacement for SerperDevTool: same name,
+    arguments and result text; after the last failed attempt the error is
+    returned as a dict, like SerperDevTool does for API errors.
+
+    Defaults come from SERPER_MAX_IN_FLIGHT (8), SERPER_CONNECT_TIMEOUT (3.05),
+    SERPER_TIMEOUT (10) and SERPER_MAX_RETRIES (3).
+    """
+    name: str = "Search the internet"
+    description: str = (
+        "A tool that can be used to search the internet with a search_query."
+    )
+    args_schema: Type[BaseModel] = SearchQueryInput
+    search_url: str = "https://google.serper.dev/search"
+    country: Optional[str] = ""
+    location: Optional[str] = ""
+    locale: Optional[str] = ""
+    n_results: int = 10
+    max_in_flight: int = Field(default_factory=lambda: int(os.getenv("SERPER_MAX_IN_FLIGHT", "8")))
+    connect_timeout: float = Field(default_factory=lambda: float(os.getenv("SERPER_CONNECT_TIMEOUT", "3.05")))
+    read_timeout: float = Field(default_factory=lambda: float(os.getenv("SERPER_TIMEOUT", "10")))
+    max_retries: int = Field(default_factory=lambda: int(os.getenv("SERPER_MAX_RETRIES", "3")))
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+
+    _session: Any = PrivateAttr(default=None)
+    _slots: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def _payload(self, query: str, n_results: int) -> str:
+        payload = {"q": query, "num": n_results}
+        if self.country:
+            payload["gl"] = self.country
+        if self.location:
+            payload["location"] = self.location
+        if self.locale:
+            payload["hl"] = self.locale
+        return json.dumps(payload)
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        # Full jitter, so concurrent agents do not retry in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _post(self, payload: str):
+        headers = {
+            "X-API-KEY": os.environ["SERPER_API_KEY"],
+            "content-type": "application/json",
+        }
+        error = None
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                with self._slots:
+                    response = self._session.post(
+                        self.search_url, headers=headers, data=payload,
+                        timeout=deadlines.timeout((self.connect_timeout, self.read_timeout)),
+                    )
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt < self.max_retries:
+                metrics.SEARCH_RETRIES.inc(reason=error.split(":")[0])
+                deadlines.sleep(self._backoff(attempt, response))
+        return error
+
+    def _run(self, **kwargs: Any) -> Any:
+        query = kwargs.get("search_query") or kwargs.get("query")
+        n_results = kwargs.get("n_results", self.n_results)
+
+        with tracing.span("serper", "tool", query=query) as span:
+            response = self._post(self._payload(query, n_results))
+            span.set(failed=isinstance(response, str))
+        if isinstance(response, str):
+            return {"error": f"Search failed after {self.max_retries + 1} attempts: {response}"}
+        try:
+            results = response.json()
+        except ValueError:
+            return {"error": f"Invalid search response (HTTP {response.status_code})"}
+
+        if "organic" not in results:
+            return results
+        entries = []
+        for result in results["organic"][:n_results]:
+            try:
+                entries.append("\n".join([
+                    f"Title: {result['title']}",
+                    f"Link: {result['link']}",
+                    f"Snippet: {result['snippet']}",
+                    "---",
+                ]))
+            except KeyError:
+                continue
+        content = "\n".join(entries)
+        return f"\nSearch results: {content}\n"
@@ -0,0 +1,58 @@
+import os
+from typing import Any, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from latest_ai_development import tracing
+from latest_ai_development.page_cache import PageFetcher, create_page_fetcher
+
+
+class FetchPageInput(BaseModel):
+    """Input schema for FetchPageTool."""
+    url: str = Field(..., description="Full http(s) URL of the page to read, e.g. a professor's profile page")
+
+
+class FetchPageTool(BaseTool):
+    """
+    Reads a page through the PageFetcher (page_cache.py) and returns its
+    extracted text, trimmed to `max_chars`. Fetched pages are also added to
+    the local knowledge index (`index`), if given.
+    """
+    name: str = "Read a web page"
+    description: str = (
+        "Read the text of a web page, such as a professor's or lab's profile page, given its URL. "
+        "Returns the page title and its readable text without HTML."
+    )
+    args_schema: Type[BaseModel] = FetchPageInput
+    fetcher: Any = None
+    index: Any = None
+    max_chars: int = 8000
+
+    def _run(self, **kwargs: Any) -> str:
+        url = kwargs.get("url") or kwargs.get("search_query") or ""
+        with tracing.span(self.name, "tool", url=url) as span:
+            page = self.fetcher.fetch(url)
+            span.set(failed="error" in page, chars=len(page.get("text") or ""))
+        if "error" in page:
+            return f"Could not read {page['url']}: {page['error']}"
+        if self.index is not None:
+            self.index.add_document(f"page:{page['url']}", page["text"], "page", page["title"] or page["url"],
+                                    fingerprint=page["content_hash"])
+        text = page["text"]
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars].rsplit(" ", 1)[0] + "\n[... truncated]"
+        return f"Title: {page['title']}\nURL: {page['url']}\n\n{text}"
+
+
+def fetch_page(index=None, fetcher: PageFetcher = None) -> FetchPageTool:
+    """
+    Build a FetchPageTool (default fetcher: create_page_fetcher(), see
+    page_cache.py). PAGE_TEXT_MAX_CHARS caps the text handed to the agent
+    (default: 8000 characters).
+    """
+    return FetchPageTool(
+        fetcher=fetcher or create_page_fetcher(),
+        index=index,
+        max_chars=int(os.getenv("PAGE_TEXT_MAX_CHARS", "8000")),
+    )
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from typing import Any, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from latest_ai_development import metrics, tracing
+from latest_ai_development.knowledge_index import KnowledgeIndex, create_knowledge_index
+
+# Syncs write to the index; one at a time is enough
+_sync_lock = threading.Lock()
+
+
+class KnowledgeQueryInput(BaseModel):
+    """Input schema for KnowledgeSearchTool (same argument name as the search tools)."""
+    search_query: str = Field(
+        ..., description="What to look up, e.g. a professor's name with 'publications' or 'projects'"
+    )
+
+
+class KnowledgeSearchTool(BaseTool):
+    """
+    Answers from the local KnowledgeIndex (knowledge/ files and search results
+    fetched earlier), syncing it at most every `sync_interval` seconds.
+    """
+    name: str = "Search local knowledge"
+    description: str = (
+        "Search the local knowledge base (project knowledge files and search results "
+        "already fetched for earlier research) for a query. Use it before searching "
+        "the internet; it returns the most relevant passages with their sources."
+    )
+    args_schema: Type[BaseModel] = KnowledgeQueryInput
+    index: Any = None
+    search_cache: Any = None
+    k: int = 3
+    sync_interval: float = 60.0
+    synced_at: float = 0.0
+
+    def _sync(self) -> None:
+        with _sync_lock:
+            if self.synced_at and time.monotonic() - self.synced_at < self.sync_interval:
+                return
+            self.index.sync(self.search_cache)
+            self.synced_at = time.monotonic()
+
+    def _run(self, **kwargs: Any) -> str:
+        query = kwargs.get("search_query") or kwargs.get("query") or ""
+        with tracing.span(self.name, "tool", query=query) as span:
+            self._sync()
+            results = self.index.search(query, k=self.k)
+            span.set(results=len(results))
+        metrics.KNOWLEDGE_QUERIES.inc(outcome="hit" if results else "empty")
+        if not results:
+            return "No relevant passages in the local knowledge base; search the internet instead."
+        return "\n\n".join(
+            f"Source: {result['title']} ({result['doc_id']})\n{result['text']}\n---" for result in results
+        )
+
+
+def knowledge_search(search_cache=None, index: KnowledgeIndex = None) -> KnowledgeSearchTool:
+    """
+    Build a KnowledgeSearchTool over `index` (default: create_knowledge_index(),
+    see knowledge_index.py) that also ingests `search_cache`. Tuned with:
+      - KNOWLEDGE_TOP_K: passages returned per query (default: 3)
+      - KNOWLEDGE_SYNC_INTERVAL: seconds between incremental syncs (default: 60)
+    """
+    return KnowledgeSearchTool(
+        index=index or create_knowledge_index(),
+        search_cache=search_cache,
+        k=int(os.getenv("KNOWLEDGE_TOP_K", "3")),
+        sync_interval=float(os.getenv("KNOWLEDGE_SYNC_INTERVAL", "60")),
+    )
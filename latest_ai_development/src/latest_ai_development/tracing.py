@@ -0,0 +1,277 @@
+# tracing.py
+
+"""
+Structured traces of crew runs, in place of crewai's verbose console output.
+
+Each job, pipeline run, task, tool call and LLM call is a span: a name, a
+kind ("job", "run", "task", "tool", "llm"), its trace and parent, start time,
+duration, status ("ok", "error" or "interrupted") and a few attributes
+(task and agent, model, prompt and completion sizes, cache outcome, ...).
+Spans nest through a context variable, so fan-out threads started with
+deadlines.propagate stay in their run's trace.
+
+Finished spans go into a bounded in-memory buffer; a background thread
+appends them as JSON lines to the trace file, so the code being traced never
+waits on disk. When the buffer is full new spans are dropped and counted in
+lad_trace_spans_total{outcome="dropped"}.
+
+Whether a trace is kept is decided once, at its root span: a run is traced
+whole or not at all. Attribute values are redacted before they are buffered:
+those named like a resume are replaced by their length, long strings are
+cut, and prompts and answers are never recorded.
+
+Configured from the environment:
+  - TRACING: "0" turns tracing off (default: on)
+  - TRACE_SAMPLE_RATE: fraction of traces kept (default: 1.0)
+  - TRACE_PATH: JSONL file the spans are appended to (default: <LAD_DATA_DIR>/traces.jsonl)
+  - TRACE_BUFFER: spans waiting for export before new ones are dropped (default: 10000)
+  - TRACE_FLUSH_INTERVAL: seconds between writes to the file (default: 1)
+  - TRACE_REDACT: comma-separated extra attribute names to redact
+  - CREW_VERBOSE: "0" turns off crewai's verbose agent and crew output (default: on)
+"""
+import atexit
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
+from latest_ai_development import metrics
+from latest_ai_development.deadlines import Interrupted
+from latest_ai_development.storage import data_dir
+
+# Attribute names whose values are personal data: only their length is kept
+REDACTED = frozenset({"resume", "background", "candidate_profile", "email_body", "cover_letter"})
+MAX_ATTRIBUTE_CHARS = 200
+
+
+def _redact(name: str, value, redacted: frozenset):
+    if name in redacted:
+        return f"<redacted: {len(value) if isinstance(value, (str, list, dict)) else 1}>"
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= MAX_ATTRIBUTE_CHARS else value[:MAX_ATTRIBUTE_CHARS] + "..."
+    if isinstance(value, dict):
+        return {str(key): _redact(str(key), item, redacted) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return f"<{len(value)} items>"
+    return _redact(name, str(value), redacted)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes",
+                 "start", "_started", "duration", "status", "error")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"], attributes: dict):
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+        self.status = "ok"
+        self.error = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self, redacted: frozenset) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": {name: _redact(name, value, redacted) for name, value in self.attributes.items()},
+        }
+
+
+class _NoSpan:
+    """Stands in for the spans of traces that are not kept."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+# The innermost open span, or _NO_SPAN inside a trace that is not kept
+_current: ContextVar = ContextVar("trace_span", default=None)
+
+
+class SpanExporter:
+    """
+    Buffers finished spans and appends them to `path` (default:
+    traces.jsonl in the data directory) from a background thread, every
+    `flush_interval` seconds.
+    """
+
+    def __init__(self, path=None, buffer: int = 10000, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=buffer)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, span: dict) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            metrics.TRACE_SPANS.inc(outcome="dropped")
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="trace-export", daemon=True)
+                self._thread.start()
+
+    def _drain(self) -> List[dict]:
+        spans = []
+        while True:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                return spans
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        spans = self._drain()
+        if not spans:
+            return
+        with self._lock:
+            try:
+                with open(self.path or data_dir() / "traces.jsonl", "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(span, default=str) + "\n" for span in spans))
+            except OSError:
+                metrics.TRACE_SPANS.inc(len(spans), outcome="dropped")
+                return
+        metrics.TRACE_SPANS.inc(len(spans), outcome="exported")
+
+
+class Tracer:
+    def __init__(self, exporter: Optional[SpanExporter], sample_rate: float = 1.0, redacted=REDACTED):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.redacted = frozenset(redacted)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", /, **attributes) -> Iterator:
+        """
+        Time the enclosed code as a span, a child of the current one. Yields
+        the span, for attributes known only at the end (`span.set(...)`).
+        """
+        parent = _current.get()
+        if not self.enabled or parent is _NO_SPAN:
+            yield _NO_SPAN
+            return
+        if parent is None and not self.sampled():
+            token = _current.set(_NO_SPAN)
+            try:
+                yield _NO_SPAN
+            finally:
+                _current.reset(token)
+            return
+
+        span = Span(name, kind, parent, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except Interrupted as e:
+            span.status, span.error = "interrupted", e.reason
+            raise
+        except BaseException as e:
+            span.status, span.error = "error", f"{type(e).__name__}: {e}"[:MAX_ATTRIBUTE_CHARS]
+            raise
+        finally:
+            _current.reset(token)
+            span.duration = time.perf_counter() - span._started
+            self.exporter.export(span.to_dict(self.redacted))
+
+    def flush(self) -> None:
+        if self.exporter is not None:
+            self.exporter.flush()
+
+
+def create_tracer() -> Tracer:
+    exporter = None
+    if os.getenv("TRACING", "1") != "0":
+        exporter = SpanExporter(
+            os.getenv("TRACE_PATH"),
+            buffer=int(os.getenv("TRACE_BUFFER", "10000")),
+            flush_interval=float(os.getenv("TRACE_FLUSH_INTERVAL", "1")),
+        )
+    extra = {name.strip() for name in os.getenv("TRACE_REDACT", "").split(",") if name.strip()}
+    return Tracer(exporter, sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1")), redacted=REDACTED | extra)
+
+
+tracer = create_tracer()
+# Spans still buffered when the process exits are written out
+atexit.register(tracer.flush)
+
+
+def span(name: str, kind: str = "internal", /, **attributes):
+    """A span on the process-wide tracer (see Tracer.span)."""
+    return tracer.span(name, kind, **attributes)
+
+
+def annotate(**attributes) -> None:
+    """Add attributes to the current span (a no-op outside a kept trace)."""
+    current = _current.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def traced(kind: str) -> Callable:
+    """
+    Decorator: run the function in a span named after it, with its
+    arguments as attributes, and the "status" of a dict result as `outcome`.
+    """
+    def decorate(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled or _current.get() is _NO_SPAN:
+                return fn(*args, **kwargs)
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            attributes = {name: value for name, value in arguments.items() if name != "events"}
+            with tracer.span(fn.__name__, kind, **attributes) as current:
+                result = fn(*args, **kwargs)
+                if isinstance(result, dict) and "status" in result:
+                    current.set(outcome=result["status"])
+                return result
+        return wrapper
+    return decorate
+
+
+def verbose() -> bool:
+    """Whether agents and crews print crewai's verbose output (CREW_VERBOSE)."""
+    return os.getenv("CREW_VERBOSE", "1") != "0"
@@ -1,73 +1,143 @@
 # webapp.py
 
+import gzip
+import os
+import time
 import uuid
-import json
-from flask import Flask, render_template, request, session, jsonify
+from dotenv import load_dotenv
+from flask import Flask, Response, g, redirect, render_template, request, session, jsonify, stream_with_context
 from pydantic import ValidationError
-from latest_ai_development.crew import LatestAiDevelopment
+
+# Settings below are read at import; crew.py used to load .env before them
+load_dotenv()
+
+from latest_ai_development import agent_stack, artifacts, deadlines, metrics, session_api, singleflight
+from latest_ai_development.artifacts import artifact_store
+from latest_ai_development.events import format_sse
+from latest_ai_development.jobs import job_manager
+from latest_ai_development.prefetch import create_prefetcher
+from latest_ai_development.scheduler import QueueFull
+from latest_ai_development.session_store import create_session_store, new_session
 
 app = Flask(__name__)
-app.secret_key = "REPLACE_WITH_A_STRONG_SECRET_KEY"
 
-# In-memory store: { user_id: {...} }
-app_data_store = {}
+# crewai and the crew load in the background (see agent_stack.py); job bodies
+# call agent_stack.pipeline(), which waits for them if needed
+agent_stack.warm_up()
+app.secret_key = "REPLACE_WITH_A_STRONG_SECRET_KEY"
 
-@app.route("/", methods=["GET", "POST"])
-def index():
+# Per-user data: { user_id: {...} }, in memory or shared on disk (see SESSION_STORE)
+session_store = create_session_store()
+
+# JSON and HTML responses at least this large are gzipped for clients that accept it
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+# Optional speculative deep research on the top of each listing (see PREFETCH)
+prefetcher = create_prefetcher(job_manager)
+
+# Gauges computed when /metrics is scraped
+metrics.SESSION_STORE_SESSIONS.set_function(lambda: session_store.stats()["sessions"])
+metrics.SESSION_STORE_BYTES.set_function(lambda: session_store.stats()["bytes"])
+if artifact_store is not None:
+    metrics.ARTIFACT_STORE_RUNS.set_function(lambda: artifact_store.stats()["runs"])
+    metrics.ARTIFACT_STORE_BYTES.set_function(lambda: artifact_store.stats()["bytes"])
+metrics.JOBS.set_function(lambda: {(status,): count for status, count in job_manager.stats().items()})
+# Identical searches and agent tasks started by different sessions share one execution
+metrics.SINGLEFLIGHT_IN_FLIGHT.set_function(lambda: {
+    (name,): group.in_flight() for name, group in list(singleflight.groups.items())
+})
+metrics.SCHEDULER_QUEUE.set_function(lambda: {
+    (priority,): count for priority, count in job_manager.scheduler.stats()["queued_by_priority"].items()
+})
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    started = g.get("request_started")
+    if started is not None:
+        metrics.HTTP_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            endpoint=request.url_rule.rule if request.url_rule else "unmatched",
+            status=response.status_code,
+        )
+    return response
+
+
+@app.after_request
+def _compress(response):
+    if (
+        response.mimetype not in ("application/json", "text/html")
+        or response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or not request.accept_encodings.quality("gzip")
+    ):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def _get_user_data(create=True):
     """
-    Main route:
-      - GET: Renders the form for 'topic', 'university', 'resume'.
-      - POST: Calls .kickoff() to run the Crew AI pipeline, then extracts professors/labs from final output.
+    Return (user_id, user_data) for the current session.
+    With create=False, returns (user_id, None) if the session is unknown.
+    user_data is a copy: write changes back with session_store.update().
     """
     user_id = session.get("user_id")
     if not user_id:
+        if not create:
+            return None, None
         user_id = str(uuid.uuid4())
         session["user_id"] = user_id
 
-    if user_id not in app_data_store:
-        app_data_store[user_id] = {
-            "professors": [],
-            "labs": [],
-            "raw_result": None,
-            "resume": "",
-        }
+    user_data = session_store.get(user_id)
+    if user_data is None:
+        if not create:
+            return user_id, None
+        user_data = new_session()
+        session_store.put(user_id, user_data)
 
-    user_data = app_data_store[user_id]
+    return user_id, user_data
 
-    if request.method == "POST":
-        topic = request.form.get("topic", "")
-        university = request.form.get("university", "")
-        resume = request.form.get("resume", "")
 
-        # Store the resume for potential use later (e.g. cover letter)
-        user_data["resume"] = resume
+def _form():
+    """
+    Request fields, from either a JSON body or a regular HTML form.
+    """
+    return request.get_json(silent=True) or request.form
 
-        inputs = {
-            "topic": topic,
-            "university": university,
-            "resume": resume,
-        }
 
-        # Kick off the entire AI crew (unchanged)
-        crew_instance = LatestAiDevelopment().crew()
-        try:
-            result = crew_instance.kickoff(inputs=inputs)
-            user_data["raw_result"] = str(result)
+def _max_concurrency(form, limit_env: str):
+    """
+    The optional 'max_concurrency' field, clamped to 1..`limit_env` (the
+    environment variable of the server's own limit, default 4); None when
+    not given. Raises ValueError when it is not a whole number.
+    """
+    value = str(form.get("max_concurrency") or "").strip()
+    if not value:
+        return None
+    return min(max(int(value), 1), int(os.getenv(limit_env, "4")))
+
 
-            try:
-                professors = result["professors"]
-            except KeyError:
-                professors = []
-            try:
-                labs = result["labs"]
-            except KeyError:
-                labs = []
+def _wants_json():
+    return request.is_json or request.accept_mimetypes.best == "application/json"
 
-            user_data["professors"] = professors
-            user_data["labs"] = labs
 
-        except ValidationError as e:
-            user_data["raw_result"] = f"Error validating AI output: {str(e)}"
+def _render(user_data):
+    # Only hand the page a job to poll while it is pending (or to show its error)
+    job = job_manager.get(user_data.get("job_id") or "")
+    job_id = job.id if job and job.status not in ("succeeded", "cancelled") else None
 
     return render_template(
         "index.html",
@@ -75,9 +145,222 @@ def index():
             "professors": user_data["professors"],
             "labs": user_data["labs"]
         },
-        result=user_data["raw_result"]
+        result=user_data["raw_result"],
+        job_id=job_id,
     )
 
+
+def _deadline():
+    """
+    The run time the client allows, from an optional 'deadline' field (in
+    seconds), never more than RUN_DEADLINE. None for the default.
+    """
+    try:
+        requested = float(_form().get("deadline") or 0)
+    except (TypeError, ValueError):
+        return None
+    if requested <= 0:
+        return None
+    limit = deadlines.default_seconds()
+    return min(requested, limit) if limit else requested
+
+
+def _submit(user_id, kind, fn, *args):
+    """
+    Start `fn` as a background job and answer immediately (see _respond).
+    When the scheduler's queue is full, answer 429 with Retry-After instead.
+    """
+    try:
+        job = job_manager.submit(kind, fn, user_id, *args, user_id=user_id, deadline=_deadline())
+    except QueueFull as e:
+        if _wants_json():
+            response = jsonify({"error": str(e), "retry_after": e.retry_after})
+        else:
+            response = Response(f"{e}, please try again in {e.retry_after} seconds.", mimetype="text/plain")
+        response.status_code = 429
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response
+    return _respond(user_id, job)
+
+
+def _reuse(user_id, kind, inputs, store):
+    """
+    Answer with the latest stored run of `kind` on `inputs`, no older than
+    ARTIFACTS_REUSE, instead of running the agents again (see artifacts.py):
+    its result goes through `store`, as the job's would, and is returned as
+    an already finished job. None when there is no such run.
+    """
+    max_age = artifacts.reuse_seconds()
+    if artifact_store is None or max_age <= 0:
+        return None
+    run_id = artifact_store.find(kind, inputs, max_age=max_age)
+    result = artifact_store.load(run_id) if run_id else None
+    if result is None:
+        return None
+    metrics.STORED_RUNS_SERVED.inc(kind=kind)
+    store(user_id, result)
+    return _respond(user_id, job_manager.finished(kind, result, user_id=user_id))
+
+
+def _respond(user_id, job):
+    """
+    Answer with `job` as the session's current job:
+      - JSON clients get the job description, 202 while it is pending (poll /jobs/<id>)
+      - HTML clients get the page back, which polls the job and reloads
+    """
+    user_data = session_store.update(user_id, job_id=job.id)
+    if _wants_json():
+        response = jsonify(job.to_dict())
+        response.status_code = 200 if job.done else 202
+        response.headers["Location"] = f"/jobs/{job.id}"
+        return response
+    return _render(user_data)
+
+
+########################################
+# Background job bodies: run a pipeline phase and store
+# the parsed output in the user's session data
+########################################
+def _crew_job(job, user_id, inputs):
+    # Show the professor list as soon as research_task is done,
+    # without waiting for the deeper research and cover letter tasks
+    def on_event(event):
+        if event["type"] == "partial_result" and event["key"] == "research_info":
+            session_store.update(
+                user_id,
+                professors=event["payload"].get("professors", []),
+                labs=event["payload"].get("labs", []),
+            )
+            prefetcher.start(user_id, event["payload"])
+
+    job.events.subscribe(on_event)
+    try:
+        result = agent_stack.pipeline().run_crew(inputs, events=job.events)
+    except ValidationError as e:
+        session_store.update(user_id, raw_result=f"Error validating AI output: {str(e)}")
+        raise
+
+    _store_crew_result(user_id, result)
+    return result
+
+
+def _store_crew_result(user_id, result):
+    research_info = result.get("research_info", {})
+    session_store.update(
+        user_id,
+        raw_result=result["raw_result"],
+        professors=research_info.get("professors", []),
+        labs=research_info.get("labs", []),
+    )
+
+
+def _store_reused_crew_result(user_id, result):
+    # A job would have started the prefetches from its partial result
+    _store_crew_result(user_id, result)
+    prefetcher.start(user_id, result.get("research_info") or {})
+
+
+def _researcher_job(job, user_id, topic, university, resume):
+    result = agent_stack.pipeline().run_researcher(topic, university, resume, events=job.events)
+    _store_research(user_id, result)
+    return result
+
+
+def _store_research(user_id, result):
+    research_info = result["research_info"]
+    session_store.update(
+        user_id,
+        professors=research_info.get("professors", []),
+        labs=research_info.get("labs", []),
+        raw_result=result["raw_result"],
+    )
+    prefetcher.start(user_id, research_info)
+
+
+def _store_deeper_research(user_id, result):
+    specific_info = result["specific_info"]
+    session_store.update(
+        user_id,
+        raw_result=result["raw_result"],
+        publications=specific_info.get("publications", []),
+        projects=specific_info.get("projects", []),
+        courses=specific_info.get("courses", []),
+    )
+
+
+def _deeper_research_job(job, user_id, prof_name, prof_url):
+    result = agent_stack.pipeline().run_deeper_research(prof_name, prof_url, events=job.events)
+    _store_deeper_research(user_id, result)
+    return result
+
+
+def _cover_letter_job(job, user_id, prof_name, prof_url, resume):
+    result = agent_stack.pipeline().run_cover_letter(prof_name, prof_url, resume, events=job.events)
+    _store_cover_letter(user_id, result)
+    return result
+
+
+def _store_cover_letter(user_id, result):
+    cover_letter = result["cover_letter"]
+    session_store.update(
+        user_id,
+        raw_result=result["raw_result"],
+        email_subject=cover_letter.get("email_subject", ""),
+        email_body=cover_letter.get("email_body", ""),
+        cover_letter=cover_letter.get("cover_letter", ""),
+    )
+
+
+def _cover_letters_job(job, user_id, entities, resume, max_concurrency):
+    result = agent_stack.pipeline().run_cover_letters(
+        entities, resume, max_concurrency=max_concurrency, events=job.events
+    )
+    session_store.update(user_id, cover_letters=result["cover_letters"]["results"])
+    return result
+
+
+def _fanout_job(job, user_id, research_info, max_concurrency):
+    result = agent_stack.pipeline().run_fanout(research_info, max_concurrency=max_concurrency, events=job.events)
+    session_store.update(user_id, deep_research=result["fanout"]["results"])
+    return result
+
+
+@app.route("/", methods=["GET", "POST"])
+def index():
+    """
+    Main route:
+      - GET: Renders the form for 'topic', 'university', 'resume'.
+      - POST: Starts the full Crew AI pipeline as a background job; the job
+        extracts professors/labs from the research_task output when it finishes.
+        A run on the same inputs stored lately is served from the artifact
+        store instead (so are the single phases below).
+    """
+    user_id, user_data = _get_user_data()
+
+    if request.method == "POST":
+        form = _form()
+        topic = form.get("topic", "")
+        university = form.get("university", "")
+        resume = form.get("resume", "")
+
+        # Store the resume for potential use later (e.g. cover letter)
+        session_store.update(user_id, resume=resume)
+
+        inputs = {
+            "topic": topic,
+            "university": university,
+            "resume": resume,
+        }
+
+        # A new listing supersedes the prefetches of the previous one
+        prefetcher.cancel(user_id)
+
+        # Kick off the entire AI crew in the background, unless it ran on these inputs lately
+        return (_reuse(user_id, "crew", inputs, _store_reused_crew_result)
+                or _submit(user_id, "crew", _crew_job, inputs))
+
+    return _render(user_data)
+
 @app.route("/select", methods=["POST"])
 def select():
     """
@@ -85,8 +368,8 @@ def select():
     we read the hidden fields and display a simple confirmation.
     (Optional) you can integrate deeper research tasks here.
     """
-    user_id = session.get("user_id")
-    if not user_id or user_id not in app_data_store:
+    user_id, user_data = _get_user_data(create=False)
+    if user_data is None:
         return "Session not found, please go back to home."
 
     prof_name = request.form.get("prof_name")
@@ -111,70 +394,27 @@ def select():
 def researcher_phase():
     """
     - GET: Renders a form for topic/university/resume
-    - POST: Runs only the 'researcher' agent (not the entire crew).
+    - POST: Starts a job running only the 'researcher' agent (not the entire crew).
       Expects JSON with 'professors' and 'labs' in the output.
-    - Renders index.html to display the returned data so the user can select.
+    - Renders index.html, which shows the returned data once the job is done.
     """
-    user_id = session.get("user_id")
-    if not user_id:
-        user_id = str(uuid.uuid4())
-        session["user_id"] = user_id
-
-    # Create user data in the in-memory store if missing
-    if user_id not in app_data_store:
-        app_data_store[user_id] = {
-            "professors": [],
-            "labs": [],
-            "raw_result": None,
-            "resume": "",
-        }
-
-    user_data = app_data_store[user_id]
+    user_id, user_data = _get_user_data()
 
     if request.method == "POST":
-        topic = request.form.get("topic", "")
-        university = request.form.get("university", "")
-        resume = request.form.get("resume", "")
-
-        user_data["resume"] = resume  # store resume for later
-
-        # We'll pass these as JSON to the researcher agent
-        user_input = json.dumps({
-            "topic": topic,
-            "university": university,
-            "resume": resume
-        })
-
-        # 1) Only get the 'researcher' agent
-        researcher_agent = LatestAiDevelopment().researcher()
+        form = _form()
+        topic = form.get("topic", "")
+        university = form.get("university", "")
+        resume = form.get("resume", "")
 
-        # 2) Call agent.run(...)
-        raw_result = researcher_agent.run(user_input)
+        session_store.update(user_id, resume=resume)  # store resume for later
+        prefetcher.cancel(user_id)
 
-        # 3) Attempt to parse JSON for { "professors": [...], "labs": [...] }
-        try:
-            parsed_json = json.loads(raw_result)
-        except json.JSONDecodeError:
-            # If not valid JSON, just store the raw result
-            parsed_json = {}
-
-        professors = parsed_json.get("professors", [])
-        labs = parsed_json.get("labs", [])
-
-        # 4) Store in memory
-        user_data["professors"] = professors
-        user_data["labs"] = labs
-        user_data["raw_result"] = raw_result
+        inputs = {"topic": topic, "university": university, "resume": resume}
+        return (_reuse(user_id, "researcher", inputs, _store_research)
+                or _submit(user_id, "researcher", _researcher_job, topic, university, resume))
 
     # Render same template to display the data
-    return render_template(
-        "index.html",
-        data={
-            "professors": user_data["professors"],
-            "labs": user_data["labs"]
-        },
-        result=user_data["raw_result"]
-    )
+    return _render(user_data)
 
 
 ########################################
@@ -184,52 +424,26 @@ def researcher_phase():
 def run_deeper_research():
     """
     Trigger the deeper_researcher agent for additional info on a selected professor (or lab).
+    The result (matching SpecificProfessorInfo) is stored in the session by the job.
+    With prefetching on, a prefetched result is served at once, and a running
+    prefetch for the same entry is returned as the job instead of starting another.
     """
-    user_id = session.get("user_id")
-    if not user_id or user_id not in app_data_store:
+    user_id, user_data = _get_user_data(create=False)
+    if user_data is None:
         return "Session not found, please go back to home."
 
-    user_data = app_data_store[user_id]
-
-    prof_name = request.form.get("prof_name", "")
-    prof_url = request.form.get("prof_url", "")
-
-    # Prepare input JSON for deeper researcher
-    deeper_input = json.dumps({
-        "prof_name": prof_name,
-        "prof_url": prof_url,
-    })
+    form = _form()
+    prof_name = form.get("prof_name", "")
+    prof_url = form.get("prof_url", "")
 
-    deeper_agent = LatestAiDevelopment().deeper_researcher()
-    raw_result = deeper_agent.run(deeper_input)
-
-    # The deeper_researcher is supposed to return JSON matching SpecificProfessorInfo:
-    # {
-    #    "publications": [...],
-    #    "projects": [...],
-    #    "courses": [...]
-    # }
-    try:
-        parsed_json = json.loads(raw_result)
-    except json.JSONDecodeError:
-        parsed_json = {}
-
-    # Optionally, store deeper info in user_data if you want to display it
-    user_data["raw_result"] = raw_result
-    user_data["publications"] = parsed_json.get("publications", [])
-    user_data["projects"] = parsed_json.get("projects", [])
-    user_data["courses"] = parsed_json.get("courses", [])
-
-    # Rerender index.html (or a new template) to show deeper info
-    return render_template(
-        "index.html",
-        data={
-            "professors": user_data["professors"],
-            "labs": user_data["labs"]
-            # If you want to display deeper info, you'd pass it here or create a new template
-        },
-        result=user_data["raw_result"]
+    prefetched = prefetcher.claim(
+        user_id, prof_name, prof_url, lambda result: _store_deeper_research(user_id, result)
     )
+    if prefetched is not None:
+        return _respond(user_id, prefetched)
+    inputs = {"name": prof_name, "url": prof_url, "kind": "professor"}
+    return (_reuse(user_id, "deeper_research", inputs, _store_deeper_research)
+            or _submit(user_id, "deeper_research", _deeper_research_job, prof_name, prof_url))
 
 
 ########################################
@@ -240,55 +454,262 @@ def run_cover_letter():
     """
     Trigger the cover_letter_agent for a selected professor (or lab),
     using the user's stored resume to generate a cover letter.
+    The result (matching CoverLetterOutput) is stored in the session by the job.
     """
-    user_id = session.get("user_id")
-    if not user_id or user_id not in app_data_store:
+    user_id, user_data = _get_user_data(create=False)
+    if user_data is None:
         return "Session not found, please go back to home."
 
-    user_data = app_data_store[user_id]
+    form = _form()
+    prof_name = form.get("prof_name", "")
+    prof_url = form.get("prof_url", "")
+    resume = user_data.get("resume", "")
+    # The user has picked a professor; the other prefetches are no longer needed
+    prefetcher.cancel(user_id)
+
+    inputs = {"name": prof_name, "url": prof_url, "resume": resume, "kind": "professor"}
+    return (_reuse(user_id, "cover_letter", inputs, _store_cover_letter)
+            or _submit(user_id, "cover_letter", _cover_letter_job, prof_name, prof_url, resume))
+
+
+def _selected_entities(form, user_data):
+    """
+    The professors/labs picked for a batch: {name, url[, kind]} objects under
+    'entities' in a JSON body, or 'entry' checkboxes of the page
+    ("professor:<index>" / "lab:<index>" into the stored listing).
+    """
+    if request.is_json:
+        return [
+            {"name": str(entity.get("name") or ""), "url": str(entity.get("url") or ""),
+             "kind": "lab" if entity.get("kind") == "lab" else "professor"}
+            for entity in form.get("entities") or [] if isinstance(entity, dict)
+        ]
+    listings = {"professor": user_data.get("professors") or [], "lab": user_data.get("labs") or []}
+    entities = []
+    for entry in form.getlist("entry"):
+        kind, _, index = entry.partition(":")
+        listing = listings.get(kind, [])
+        if index.isdigit() and int(index) < len(listing):
+            entity = listing[int(index)]
+            entities.append({"name": entity.get("name", ""), "url": entity.get("url", ""), "kind": kind})
+    return entities
+
+
+@app.route("/run_cover_letters", methods=["POST"])
+def run_cover_letters():
+    """
+    Write cover letters for several selected professors/labs at once, from
+    one candidate profile of the stored resume (see pipeline.run_cover_letters).
+    Optional 'max_concurrency' caps how many are written at the same time.
+    The results (CoverLetterResult list) are stored in the session by the job.
+    """
+    user_id, user_data = _get_user_data(create=False)
+    if user_data is None:
+        return "Session not found, please go back to home."
 
-    prof_name = request.form.get("prof_name", "")
-    prof_url = request.form.get("prof_url", "")
+    form = _form()
+    entities = _selected_entities(form, user_data)
+    if not entities:
+        return "No professors or labs selected.", 400
+    try:
+        max_concurrency = _max_concurrency(form, "COVER_LETTER_CONCURRENCY")
+    except ValueError:
+        return "max_concurrency must be a whole number.", 400
     resume = user_data.get("resume", "")
+    prefetcher.cancel(user_id)
+
+    return _submit(user_id, "cover_letters", _cover_letters_job, entities, resume, max_concurrency)
+
+
+########################################
+# 3) Route to run the deeper_researcher agent on every
+# professor and lab of the current listing, concurrently
+########################################
+@app.route("/run_fanout_research", methods=["POST"])
+def run_fanout_research():
+    """
+    Fan professor_research_task out over all stored professors/labs.
+    Optional 'max_concurrency' caps how many run at the same time.
+    The merged result (FanOutResearchInfo) is stored in the session by the job.
+    """
+    user_id, user_data = _get_user_data(create=False)
+    if user_data is None:
+        return "Session not found, please go back to home."
 
-    # Prepare JSON for cover letter agent
-    cover_input = json.dumps({
-        "prof_name": prof_name,
-        "prof_url": prof_url,
-        "resume": resume
-    })
-
-    cover_agent = LatestAiDevelopment().cover_letter_agent()
-    raw_result = cover_agent.run(cover_input)
-
-    # The cover_letter_agent should return JSON matching CoverLetterOutput:
-    # {
-    #    "email_subject": "...",
-    #    "email_body": "...",
-    #    "cover_letter": "..."
-    # }
+    form = _form()
     try:
-        parsed_json = json.loads(raw_result)
-    except json.JSONDecodeError:
-        parsed_json = {}
+        max_concurrency = _max_concurrency(form, "FANOUT_CONCURRENCY")
+    except ValueError:
+        return "max_concurrency must be a whole number.", 400
+    research_info = {"professors": user_data["professors"], "labs": user_data["labs"]}
 
-    user_data["raw_result"] = raw_result
-    user_data["email_subject"] = parsed_json.get("email_subject", "")
-    user_data["email_body"]    = parsed_json.get("email_body", "")
-    user_data["cover_letter"]  = parsed_json.get("cover_letter", "")
+    return _submit(user_id, "fanout", _fanout_job, research_info, max_concurrency)
 
-    # You can create a new template to display the subject/body/cover_letter,
-    # or just reuse index.html for demonstration:
-    return render_template(
-        "index.html",
-        data={
-            "professors": user_data["professors"],
-            "labs": user_data["labs"]
-        },
-        result=user_data["raw_result"]
+
+########################################
+# JSON API over the session data: a summary, and each listing
+# or document on its own (see session_api.py)
+########################################
+def _conditional_json(payload):
+    """
+    JSON response with an ETag; 304 Not Modified when the client already has it.
+    The ETag is weak, so it also holds for the gzipped body.
+    """
+    response = jsonify(payload)
+    response.add_etag(weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+
+@app.route("/app", methods=["GET"])
+def api_client():
+    """
+    Lightweight front-end over the JSON API: fetches pages of the listings
+    and only refetches what changed.
+    """
+    return render_template("app.html")
+
+
+@app.route("/api/session", methods=["GET"])
+def api_session():
+    """
+    Sizes of the session's listings and documents, and its current job.
+    """
+    _, user_data = _get_user_data(create=False)
+    if user_data is None:
+        return jsonify({"error": "session not found"}), 404
+    job = job_manager.get(user_data.get("job_id") or "")
+    return _conditional_json(session_api.summary(user_data, job))
+
+
+@app.route("/api/session/<name>", methods=["GET"])
+def api_session_part(name):
+    """
+    A document (raw_result, cover_letter), or a page of a listing
+    (professors, labs, publications, ...) with optional query parameters:
+      - q: keywords every returned entry must contain (e.g. research interests)
+      - fields: comma-separated fields to return of each entry
+      - limit: entries per page (default 20, at most 100)
+      - cursor: the next_cursor of the previous page
+    """
+    _, user_data = _get_user_data(create=False)
+    if user_data is None:
+        return jsonify({"error": "session not found"}), 404
+    if name in session_api.DOCUMENTS:
+        return _conditional_json(session_api.document(name, user_data))
+    if name not in session_api.COLLECTIONS:
+        return jsonify({"error": f"unknown listing '{name}'"}), 404
+
+    fields = [field.strip() for field in request.args.get("fields", "").split(",") if field.strip()]
+    try:
+        limit = int(request.args.get("limit") or session_api.DEFAULT_LIMIT)
+        payload = session_api.page(
+            name, user_data.get(name) or [], query=request.args.get("q"), fields=fields,
+            cursor=request.args.get("cursor"), limit=limit,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _conditional_json(payload)
+
+
+########################################
+# Job status endpoints
+########################################
+@app.route("/jobs", methods=["GET"])
+def list_jobs():
+    """
+    All jobs started from the current session.
+    """
+    user_id = session.get("user_id")
+    return jsonify([job.to_dict() for job in job_manager.list(user_id=user_id or "")])
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    Status, per-task progress and (once finished) the result payloads of one job.
+    """
+    job = job_manager.get(job_id)
+    if job is None or job.user_id != session.get("user_id"):
+        return jsonify({"error": "job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    """
+    Cancel one of the session's jobs: a queued job is withdrawn, a running one
+    stops at its next deadline check and its worker is freed at once.
+    409 if the job is already over.
+    """
+    job = job_manager.get(job_id)
+    if job is None or job.user_id != session.get("user_id"):
+        return jsonify({"error": "job not found"}), 404
+    cancelled = job_manager.cancel(job_id)
+    if not _wants_json():
+        return redirect("/")
+    if not cancelled:
+        return jsonify({"error": f"job is already {job.status}", "job": job.to_dict()}), 409
+    return jsonify(job.to_dict())
+
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """
+    Server-sent events for one job: task started/finished, tool calls,
+    partial JSON results and token counts, as they happen.
+    Reconnecting clients resume after the Last-Event-ID they received.
+    """
+    job = job_manager.get(job_id)
+    if job is None or job.user_id != session.get("user_id"):
+        return jsonify({"error": "job not found"}), 404
+
+    # A malformed id replays from the start rather than failing the stream
+    try:
+        after = max(int(request.headers.get("Last-Event-ID") or request.args.get("after") or 0), 0)
+    except ValueError:
+        after = 0
+
+    def stream():
+        for event in job.events.follow(after=after, heartbeat=15):
+            yield format_sse(event)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+########################################
+# Liveness and readiness probes
+########################################
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: answers as soon as the app is up, without loading the agent stack."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: 200 once the agent stack is loaded, 503 while it is not."""
+    status = agent_stack.status()
+    response = jsonify(status)
+    response.status_code = 200 if status["state"] == "ready" else 503
+    return response
+
+
+########################################
+# Prometheus metrics
+########################################
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """
+    Task/agent latency, token, search and job metrics in the Prometheus text format.
+    """
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 # Main entry point
 if __name__ == "__main__":
     app.run(debug=True)